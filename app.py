@@ -4,6 +4,7 @@ from flask_login import LoginManager
 from flask_cors import CORS  # ✅ Added CORS
 from dotenv import load_dotenv
 import os
+import threading
 
 # ✅ Load environment variables
 load_dotenv()
@@ -29,9 +30,23 @@ login_manager.init_app(app)
 # ✅ Import and register models AFTER initializing db
 from models import User
 
-# ✅ Create tables if not existing
-with app.app_context():
-    db.create_all()
+# ✅ Create tables if not existing: deferred to the first request so importing the app stays fast
+_db_ready = False
+_db_lock = threading.Lock()
+
+def init_db():
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_lock:
+        if not _db_ready:
+            with app.app_context():
+                db.create_all()
+            _db_ready = True
+
+@app.before_request
+def ensure_db():
+    init_db()
 
 # ✅ Register routes
 from routes import setup_routes
@@ -44,4 +59,5 @@ def hello():
 
 # ✅ Run the app
 if __name__ == "__main__":
+    init_db()
     app.run(debug=True)
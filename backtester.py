@@ -0,0 +1,265 @@
+"""
+Bar-level backtester for the decide_trade rules on bar-store history.
+
+Each symbol's M15 history is turned once into parameter-independent arrays
+(prepare): higher timeframes aggregated locally, cumulative sums of their
+closes and ranges, engulfing flags, body ratios, order-block and S/R
+levels. A parameter set then only costs a few vectorized passes to find
+its signal bars (signals) plus one exit search per trade taken (simulate).
+
+Decisions are taken at the close of each M15 bar and filled at the next
+bar's open. Only higher-timeframe bars that had closed by then are used,
+so a decision never sees later data (live, get_candles also includes the
+forming bar). Stops and targets follow get_sl_tp_by_smc without the S/R
+index; a level on the wrong side of the entry is rejected like the broker
+would. When SL and TP fall in the same bar the SL is assumed hit first.
+
+Open trades follow the live rules: at most MAX_TRADES_AT_ONCE positions,
+one per symbol, and the best score wins when several symbols signal on the
+same bar. Results are in R multiples of the initial stop distance.
+"""
+import heapq
+
+import numpy as np
+import MetaTrader5 as mt5
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import settings
+    from config import BACKTEST_MAX_HOLD_BARS, RESAMPLE_DAY_OFFSET_HOURS
+    from bar_store import get_series
+    from resampler import aggregate, bucket_starts
+except ImportError:
+    from backend import settings
+    from backend.config import BACKTEST_MAX_HOLD_BARS, RESAMPLE_DAY_OFFSET_HOURS
+    from backend.bar_store import get_series
+    from backend.resampler import aggregate, bucket_starts
+
+BAR_SECONDS = 900
+HIGHER_TIMEFRAMES = (("H1", 3600), ("H4", 14400), ("D1", 86400), ("W1", 604800))
+ORDER_BLOCK_BARS = 5    # detect_order_block: last 5 H1 lows/highs
+SR_BARS = 10            # detect_support_resistance: last 10 H1 highs/lows
+VOLATILITY_BARS = 14    # get_volatility period
+RANGE_BARS = 50         # is_market_ranging: H4 bars averaged for the range
+EXIT_SPANS = (16, 128)  # bars scanned per step before the full hold window
+
+# Tunable parameters; their live values come from the settings snapshot
+PARAMS = (
+    "MAX_STOPLOSS_PIPS",
+    "TREND_SMA_FAST",
+    "TREND_SMA_SLOW",
+    "RANGE_SMA_FAST",
+    "RANGE_SMA_SLOW",
+    "RANGE_RATIO",
+    "PIN_BAR_BODY_RATIO",
+    "SCORE_VOLATILITY_WEIGHT",
+    "SCORE_ORDER_BLOCK_BONUS",
+)
+
+
+def default_params():
+    snapshot = settings.current()
+    return {name: snapshot.get(name) for name in PARAMS}
+
+
+# --- Data ---
+def load_history(symbol, bars):
+    """The latest `bars` M15 bars of `symbol` from the bar store, topped up from MT5 if short."""
+    series = get_series(symbol, mt5.TIMEFRAME_M15)
+    if series.count < bars:
+        rates = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_M15, 0, bars)
+        if rates is not None and len(rates):
+            series.merge(rates)
+    series.sync(force=True)
+    return np.array(series.window(bars))
+
+
+def _rolling(values, window, reduce):
+    """reduce() over each trailing `window` (NaN until the window is full)."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = reduce(sliding_window_view(values, window), axis=1)
+    return out
+
+
+def _at(per_bar, n, lookback):
+    """Value of a per-higher-bar array at the last closed bar, NaN with fewer than `lookback` closed."""
+    return np.where(n >= lookback, per_bar[np.maximum(n - 1, 0)], np.nan) if len(per_bar) else np.full(len(n), np.nan)
+
+
+def prepare(base, point):
+    """Parameter-independent arrays for one symbol's sorted M15 bars."""
+    t = base["time"].astype(np.int64)
+    o, h, l, c = (base[f].astype(float) for f in ("open", "high", "low", "close"))
+    data = {"time": t, "open": o, "high": h, "low": l, "close": c,
+            "spread": base["spread"] * point, "point": np.array([point])}
+
+    po, pc = np.roll(o, 1), np.roll(c, 1)
+    bull = (pc < po) & (c > o) & (c > po) & (o < pc)
+    bear = (pc > po) & (c < o) & (c < po) & (o > pc)
+    engulf = bull | bear
+    engulf[:1] = False
+    data["engulf"] = engulf
+    rng = h - l
+    with np.errstate(divide="ignore", invalid="ignore"):
+        data["body_ratio"] = np.where(rng > 0, np.abs(c - o) / rng, np.inf)
+
+    decided = t + BAR_SECONDS
+    day_offset = int(RESAMPLE_DAY_OFFSET_HOURS * 3600)
+    for name, seconds in HIGHER_TIMEFRAMES:
+        agg = aggregate(base, seconds, day_offset)
+        if len(agg) and bucket_starts(t[:1], seconds, day_offset)[0] != t[0]:
+            agg = agg[1:]  # first bucket is incomplete
+        n = np.searchsorted(agg["time"] + seconds, decided, side="right")
+        data[f"n_{name}"] = n
+        data[f"close_cs_{name}"] = np.concatenate(([0.0], np.cumsum(agg["close"])))
+        data[f"range_cs_{name}"] = np.concatenate(([0.0], np.cumsum(agg["high"] - agg["low"])))
+        if name == "H1":
+            data["ob_low"] = _at(_rolling(agg["low"], ORDER_BLOCK_BARS, np.min), n, ORDER_BLOCK_BARS)
+            data["ob_high"] = _at(_rolling(agg["high"], ORDER_BLOCK_BARS, np.max), n, ORDER_BLOCK_BARS)
+            data["sr_high"] = _at(_rolling(agg["high"], SR_BARS, np.max), n, SR_BARS)
+            data["sr_low"] = _at(_rolling(agg["low"], SR_BARS, np.min), n, SR_BARS)
+            data["volatility"] = _at(_rolling(agg["high"] - agg["low"], VOLATILITY_BARS, np.mean), n, VOLATILITY_BARS)
+    return data
+
+
+# --- Signals ---
+def _sma(cumsum, n, window):
+    """SMA of the last `window` closed bars and whether that many exist."""
+    return (cumsum[n] - cumsum[np.maximum(n - window, 0)]) / window, n >= window
+
+
+def signals(data, params):
+    """Trade direction per M15 bar: 1 buy, -1 sell, 0 no trade."""
+    fast_w, slow_w = int(params["TREND_SMA_FAST"]), int(params["TREND_SMA_SLOW"])
+    up = np.zeros(len(data["time"]), dtype=np.int8)
+    down = np.zeros_like(up)
+    for name in ("W1", "D1", "H4"):
+        cs, n = data[f"close_cs_{name}"], data[f"n_{name}"]
+        fast, ok = _sma(cs, n, fast_w)
+        slow, ok_slow = _sma(cs, n, slow_w)
+        ok &= ok_slow
+        up += ok & (fast > slow)
+        down += ok & (fast < slow)
+    direction = np.where(up >= 2, 1, np.where(down >= 2, -1, 0)).astype(np.int8)
+
+    n4 = data["n_H4"]
+    fast, _ = _sma(data["close_cs_H4"], n4, int(params["RANGE_SMA_FAST"]))
+    slow, ok = _sma(data["close_cs_H4"], n4, int(params["RANGE_SMA_SLOW"]))
+    count = np.minimum(n4, max(RANGE_BARS, int(params["RANGE_SMA_SLOW"])))
+    avg_range, _ = _sma(data["range_cs_H4"], n4, np.maximum(count, 1))
+    ranging = ~ok | (np.abs(fast - slow) < params["RANGE_RATIO"] * avg_range)
+
+    candle = data["engulf"] | (data["body_ratio"] < params["PIN_BAR_BODY_RATIO"])
+    return np.where(~ranging & candle, direction, 0)
+
+
+# --- Simulation ---
+def _exit(data, j0, is_buy, sl, tp):
+    """Exit bar and price of a trade entered at bar j0's open."""
+    high, low, open_ = data["high"], data["low"], data["open"]
+    n = len(high)
+    end = min(n, j0 + BACKTEST_MAX_HOLD_BARS)
+    lo = j0
+    for span in EXIT_SPANS + (BACKTEST_MAX_HOLD_BARS,):
+        hi = min(end, j0 + span)
+        if hi <= lo:
+            continue
+        h, l = high[lo:hi], low[lo:hi]
+        stop = l <= sl if is_buy else h >= sl
+        hit = stop | (h >= tp if is_buy else l <= tp)
+        if hit.any():
+            k = int(np.argmax(hit))
+            j = lo + k
+            if stop[k]:
+                return j, min(sl, open_[j]) if is_buy else max(sl, open_[j])
+            return j, tp
+        lo = hi
+    j = end - 1
+    return j, data["close"][j]
+
+
+def _candidates(data, params, start, end):
+    """Valid trades for one symbol entering in [start, end): bar, direction, entry, sl, tp, score."""
+    direction = signals(data, params)
+    i = np.flatnonzero(direction[:-1])
+    entry_time = data["time"][i + 1]
+    i = i[(entry_time >= start) & (entry_time < end)]
+    is_buy = direction[i] == 1
+
+    entry = data["open"][i + 1] + np.where(is_buy, data["spread"][i + 1], 0.0)
+    fallback = params["MAX_STOPLOSS_PIPS"] * data["point"][0]
+    sl = np.where(is_buy, data["ob_low"][i], data["ob_high"][i])
+    sl = np.where(np.isnan(sl), np.where(is_buy, entry - fallback, entry + fallback), sl)
+    tp = np.where(is_buy, data["sr_high"][i], data["sr_low"][i])
+    tp = np.where(np.isnan(tp), np.where(is_buy, entry + 2 * fallback, entry - 2 * fallback), tp)
+    valid = np.where(is_buy, (sl < entry) & (tp > entry), (sl > entry) & (tp < entry))
+
+    score = (np.abs(tp - sl) + np.nan_to_num(data["volatility"][i]) * params["SCORE_VOLATILITY_WEIGHT"]
+             + params["SCORE_ORDER_BLOCK_BONUS"])
+    return i[valid], is_buy[valid], entry[valid], sl[valid], tp[valid], score[valid]
+
+
+def simulate(universe, params, start=0, end=2 ** 62, max_positions=None):
+    """
+    Backtest `params` over `universe` ({symbol: prepare() arrays}) for
+    entries in [start, end). Returns the metrics dict (see metrics()).
+    """
+    if max_positions is None:
+        max_positions = settings.current().MAX_TRADES_AT_ONCE
+    symbols = list(universe)
+    parts = []
+    for s, symbol in enumerate(symbols):
+        i, is_buy, entry, sl, tp, score = _candidates(universe[symbol], params, start, end)
+        parts.append((np.full(len(i), s), i, is_buy, entry, sl, tp, score,
+                      universe[symbol]["time"][i + 1]))
+    sym, bar, is_buy, entry, sl, tp, score, times = (np.concatenate(p) for p in zip(*parts))
+    order = np.lexsort((-score, times))
+    sorted_times = times[order]
+
+    results = []
+    open_trades = []  # heap of (exit time, symbol index)
+    held = set()
+    k = 0
+    while k < len(order):
+        e = order[k]
+        t = sorted_times[k]
+        while open_trades and open_trades[0][0] <= t:
+            held.discard(heapq.heappop(open_trades)[1])
+        if len(open_trades) >= max_positions:
+            # Full: jump to the first candidate after the earliest exit
+            k = max(k + 1, int(np.searchsorted(sorted_times, open_trades[0][0], side="left")))
+            continue
+        k += 1
+        s = int(sym[e])
+        if s in held:
+            continue
+
+        data = universe[symbols[s]]
+        j, price = _exit(data, int(bar[e]) + 1, bool(is_buy[e]), sl[e], tp[e])
+        if is_buy[e]:
+            r = (price - entry[e]) / (entry[e] - sl[e])
+        else:
+            r = (entry[e] - price - data["spread"][j]) / (sl[e] - entry[e])
+        results.append(r)
+        heapq.heappush(open_trades, (int(data["time"][j]) + BAR_SECONDS, s))
+        held.add(s)
+    return metrics(np.array(results))
+
+
+def metrics(r):
+    """Summary of per-trade R multiples."""
+    if not len(r):
+        return {"trades": 0, "win_rate": 0.0, "net_r": 0.0, "expectancy": 0.0,
+                "profit_factor": 0.0, "max_drawdown_r": 0.0}
+    equity = np.cumsum(r)
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+    losses = -r[r < 0].sum()
+    return {
+        "trades": int(len(r)),
+        "win_rate": round(float((r > 0).mean()), 4),
+        "net_r": round(float(equity[-1]), 3),
+        "expectancy": round(float(r.mean()), 4),
+        "profit_factor": round(float(r[r > 0].sum() / losses), 3) if losses > 0 else float("inf"),
+        "max_drawdown_r": round(float(drawdown.max()), 3),
+    }
@@ -0,0 +1,394 @@
+"""
+Memory-mapped on-disk bar store with delta sync from MT5.
+
+Raw MT5 rate records per (symbol, timeframe) live in fixed-size memmap
+segment files plus a small JSON index. Bars survive restarts; each sync
+asks MT5 only for bars from the last stored bar onward (copy_rates_from),
+so a steady-state sync is one or two bars. window() and range() return
+copies, since a later merge rewrites the forming bar (and, when filling a
+gap, every bar) in place; bars() and times() are views for internal use.
+
+Files live under BAR_STORE_DIR/<server>/, since brokers' feeds differ.
+Process workers on the same server share those files: every write takes an
+exclusive file lock and first picks up bars other processes appended.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import MetaTrader5 as mt5
+
+try:
+    from config import BAR_STORE_DIR, BAR_STORE_INITIAL_BARS, BAR_STORE_MIN_SYNC_SECONDS
+except ImportError:
+    from backend.config import BAR_STORE_DIR, BAR_STORE_INITIAL_BARS, BAR_STORE_MIN_SYNC_SECONDS
+
+# Same layout as the structured arrays MT5's copy_rates_* functions return
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+    ("close", "<f8"), ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+TIMEFRAMES = {
+    mt5.TIMEFRAME_M1: ("M1", 60),
+    mt5.TIMEFRAME_M5: ("M5", 300),
+    mt5.TIMEFRAME_M15: ("M15", 900),
+    mt5.TIMEFRAME_M30: ("M30", 1800),
+    mt5.TIMEFRAME_H1: ("H1", 3600),
+    mt5.TIMEFRAME_H4: ("H4", 14400),
+    mt5.TIMEFRAME_D1: ("D1", 86400),
+    mt5.TIMEFRAME_W1: ("W1", 604800),
+}
+
+INDEX_VERSION = 1
+SEGMENT_BARS = 65536  # ~3.8 MB per segment file
+WEEKEND_GAP_SECONDS = 3 * 86400  # Friday close to Monday open, with holiday slack
+
+
+def _weekday(ts):
+    """Monday=0 weekday of a Unix timestamp (1970-01-01 was a Thursday)."""
+    return (int(ts) // 86400 + 3) % 7
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on `path` across processes (blocks until it's free)."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class BarSeries:
+    """
+    Bars for one (symbol, timeframe), stored in fixed-size memmap segments.
+
+    Segment files are created at full size and never resized, so existing
+    maps (and views handed to callers) stay valid, including on Windows.
+    """
+
+    def __init__(self, symbol, timeframe, directory=BAR_STORE_DIR, segment_bars=SEGMENT_BARS):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.name, self.step = TIMEFRAMES[timeframe]
+        self.directory = directory
+        self.segment_bars = segment_bars
+        self.index_path = os.path.join(directory, f"{symbol}_{self.name}.json")
+        self.lock_path = os.path.join(directory, f"{symbol}_{self.name}.lock")
+        self.count = 0
+        self.last_sync = 0.0
+        self._segments = []
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    # --- File handling ---
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"{self.symbol}_{self.name}.{number:04d}.bars")
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the thread lock and the cross-process file lock, picking up other writers' bars."""
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            with _file_lock(self.lock_path):
+                self._lock_depth = 1
+                try:
+                    self._open()
+                    yield
+                finally:
+                    self._lock_depth = 0
+
+    def _open(self):
+        index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    index = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                index = {}
+
+        if index.get("version") != INDEX_VERSION or index.get("segment_bars") != self.segment_bars:
+            index = {}
+
+        count = int(index.get("count", 0))
+        needed = -(-count // self.segment_bars)
+        for number in range(len(self._segments), needed):
+            path = self._segment_path(number)
+            if not os.path.exists(path) or os.path.getsize(path) < self.segment_bars * RATES_DTYPE.itemsize:
+                # Missing or truncated segment: keep what is intact
+                count = number * self.segment_bars
+                break
+            self._segments.append(
+                np.memmap(path, dtype=RATES_DTYPE, mode="r+", shape=(self.segment_bars,))
+            )
+        self.count = count
+
+    def _ensure_capacity(self, count):
+        size = self.segment_bars * RATES_DTYPE.itemsize
+        while len(self._segments) * self.segment_bars < count:
+            path = self._segment_path(len(self._segments))
+            # Another process may have created it already; only ever grow the file
+            with open(path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            self._segments.append(
+                np.memmap(path, dtype=RATES_DTYPE, mode="r+", shape=(self.segment_bars,))
+            )
+
+    def _write_index(self):
+        index = {
+            "version": INDEX_VERSION,
+            "symbol": self.symbol,
+            "timeframe": self.name,
+            "segment_bars": self.segment_bars,
+            "count": self.count,
+            "first_time": int(self._get(0)["time"]) if self.count else None,
+            "last_time": self.last_time,
+        }
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, self.index_path)
+
+    def flush(self):
+        with self._exclusive():
+            for segment in self._segments:
+                segment.flush()
+            self._write_index()
+
+    # --- Segment addressing ---
+    def _get(self, i):
+        return self._segments[i // self.segment_bars][i % self.segment_bars]
+
+    def _slice(self, lo, hi):
+        """Bars [lo, hi): a view when inside one segment, a copy across segments."""
+        if hi <= lo:
+            return np.empty(0, dtype=RATES_DTYPE)
+        first, last = lo // self.segment_bars, (hi - 1) // self.segment_bars
+        if first == last:
+            off = first * self.segment_bars
+            return self._segments[first][lo - off:hi - off]
+        parts = []
+        for number in range(first, last + 1):
+            off = number * self.segment_bars
+            parts.append(self._segments[number][max(lo, off) - off:min(hi, off + self.segment_bars) - off])
+        return np.concatenate(parts)
+
+    def _write(self, lo, rates):
+        self._ensure_capacity(lo + len(rates))
+        done = 0
+        while done < len(rates):
+            i = lo + done
+            number, off = divmod(i, self.segment_bars)
+            n = min(len(rates) - done, self.segment_bars - off)
+            self._segments[number][off:off + n] = rates[done:done + n]
+            done += n
+
+    def _search(self, t, side):
+        """Global searchsorted over bar times without concatenating segments."""
+        if not self.count:
+            return 0
+        firsts = [int(seg[0]["time"]) for seg in self._segments[:-(-self.count // self.segment_bars)]]
+        number = max(0, bisect.bisect_right(firsts, t) - 1)
+        off = number * self.segment_bars
+        valid = min(self.segment_bars, self.count - off)
+        return off + int(np.searchsorted(self._segments[number]["time"][:valid], t, side=side))
+
+    # --- Reads ---
+    @property
+    def last_time(self):
+        return int(self._get(self.count - 1)["time"]) if self.count else None
+
+    def bars(self):
+        """All stored bars (a view when they fit in one segment; changes on the next merge)."""
+        return self._slice(0, self.count)
+
+    def times(self):
+        return self.bars()["time"]
+
+    def window(self, count):
+        """A copy of the latest `count` bars, oldest first (like copy_rates_from_pos)."""
+        with self._lock:
+            return self._slice(max(0, self.count - count), self.count).copy()
+
+    def range(self, date_from, date_to):
+        """A copy of the bars with date_from <= time <= date_to (Unix seconds)."""
+        with self._lock:
+            return self._slice(self._search(date_from, "left"), self._search(date_to, "right")).copy()
+
+    # --- Writes ---
+    def merge(self, rates):
+        """
+        Merge bars sorted by time. The stored forming bar is overwritten,
+        newer bars are appended, and older bars fill gaps.
+        Returns the number of bars added.
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+        rates = np.asarray(rates).astype(RATES_DTYPE, copy=False)
+
+        with self._exclusive():
+            last = self.last_time
+            if last is not None and rates["time"][0] < last:
+                return self._merge_sorted(rates)
+
+            if last is not None and rates["time"][0] == last:
+                self._write(self.count - 1, rates[:1])
+                rates = rates[1:]
+
+            added = len(rates)
+            if added:
+                self._write(self.count, rates)
+                self.count += added
+                self._write_index()
+            return added
+
+    def _merge_sorted(self, rates):
+        combined = np.concatenate((self.bars(), rates))
+        # Keep the newest copy of each bar time (incoming data wins)
+        _, keep = np.unique(combined["time"][::-1], return_index=True)
+        combined = combined[::-1][keep]
+        added = len(combined) - self.count
+        self._write(0, combined)
+        self.count = len(combined)
+        self._write_index()
+        return added
+
+    # --- Gaps ---
+    def find_gaps(self, since=None):
+        """
+        Return (after_time, before_time) pairs where bars are missing,
+        ignoring normal weekend closures. Vectorized over the series
+        (or over bars from `since` onward).
+        """
+        if self.count < 2 or self.step >= 86400:
+            return []
+        times = self.times()
+        if since is not None:
+            times = times[max(0, int(np.searchsorted(times, since)) - 1):]
+        diffs = np.diff(times)
+        gaps = []
+        for i in np.nonzero(diffs > self.step)[0]:
+            start, end = int(times[i]), int(times[i + 1])
+            if _weekday(start) >= 4 and end - start <= WEEKEND_GAP_SECONDS:
+                continue
+            gaps.append((start, end))
+        return gaps
+
+    def repair_gaps(self, since=None):
+        """Refetch missing ranges from MT5. Returns the number of bars added."""
+        added = 0
+        for start, end in self.find_gaps(since):
+            rates = mt5.copy_rates_range(self.symbol, self.timeframe, start + self.step, end - self.step)
+            if rates is not None and len(rates):
+                added += self.merge(rates)
+        return added
+
+    # --- Sync ---
+    def sync(self, server_time=None, force=False):
+        """
+        Pull new bars from MT5. The first sync loads BAR_STORE_INITIAL_BARS;
+        later syncs request only bars from the last stored bar onward.
+        Returns the number of bars added.
+        """
+        now = time.time()
+        if not force and now - self.last_sync < BAR_STORE_MIN_SYNC_SECONDS:
+            return 0
+
+        with self._exclusive():
+            self.last_sync = now
+            if not self.count:
+                rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, BAR_STORE_INITIAL_BARS)
+                return self.merge(rates)
+
+            if server_time is None:
+                tick = mt5.symbol_info_tick(self.symbol)
+                if not tick:
+                    return 0
+                server_time = tick.time
+
+            last = self.last_time
+            missing = max(0, (int(server_time) - last) // self.step)
+            # A future date_from returns the newest bars; count covers the stored forming bar
+            date_from = datetime.now(timezone.utc) + timedelta(days=1)
+            rates = mt5.copy_rates_from(self.symbol, self.timeframe, date_from, missing + 1)
+            if rates is None or len(rates) == 0:
+                return 0
+
+            gap = rates["time"][0] > last
+            added = self.merge(rates)
+            if gap:
+                added += self.repair_gaps(since=last)
+            return added
+
+
+_series = {}
+_series_lock = threading.Lock()
+_server_dir = None
+
+
+def server_directory(root=BAR_STORE_DIR):
+    """
+    This terminal's broker subdirectory of `root`. Resolved once per
+    process: each worker process is logged in to a single account.
+    """
+    global _server_dir
+    if _server_dir is None:
+        info = mt5.account_info()
+        if info is None:
+            return os.path.join(root, "default")
+        _server_dir = "".join(c if c.isalnum() or c in "-." else "_" for c in str(info.server))
+    return os.path.join(root, _server_dir)
+
+
+def get_series(symbol, timeframe):
+    """Return the shared BarSeries for (symbol, timeframe), opening it on first use."""
+    directory = server_directory()
+    key = (directory, symbol, timeframe)
+    series = _series.get(key)
+    if series is None:
+        with _series_lock:
+            series = _series.get(key)
+            if series is None:
+                series = _series[key] = BarSeries(symbol, timeframe, directory=directory)
+    return series
+
+
+def get_bars(symbol, timeframe, count):
+    """Sync (throttled) and return the latest `count` bars."""
+    series = get_series(symbol, timeframe)
+    series.sync()
+    return series.window(count)
+
+
+def flush_all():
+    for series in list(_series.values()):
+        series.flush()
@@ -0,0 +1,398 @@
+"""
+Local MetaTrader5 stand-in for benchmarks on Linux.
+
+Implements the subset of the MetaTrader5 API the bot uses, backed by
+deterministic random-walk bars so runs are repeatable. Call install()
+before importing any bot module so `import MetaTrader5 as mt5` resolves here.
+"""
+import math
+import sys
+import types
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+# === Constants (same values as the real MetaTrader5 package) ===
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_W1 = 32769
+
+TIMEFRAME_SECONDS = {
+    TIMEFRAME_M1: 60,
+    TIMEFRAME_M5: 300,
+    TIMEFRAME_M15: 900,
+    TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600,
+    TIMEFRAME_H4: 14400,
+    TIMEFRAME_D1: 86400,
+    TIMEFRAME_W1: 604800,
+}
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_SLTP = 6
+
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+ORDER_TIME_GTC = 0
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+
+SYMBOL_TRADE_MODE_DISABLED = 0
+SYMBOL_TRADE_MODE_CLOSEONLY = 3
+SYMBOL_TRADE_MODE_FULL = 4
+
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+COPY_TICKS_TRADE = 2
+
+RATES_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+    ("close", "<f8"), ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+TICKS_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+    ("volume", "<u8"), ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8"),
+])
+
+AccountInfo = namedtuple("AccountInfo", "login balance equity margin_free currency server leverage")
+TerminalInfo = namedtuple("TerminalInfo", "connected trade_allowed ping_last company name")
+SymbolInfo = namedtuple(
+    "SymbolInfo",
+    "name visible trade_mode point digits filling_mode trade_contract_size volume_min volume_step",
+)
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+TradePosition = namedtuple(
+    "TradePosition",
+    "ticket time type magic volume price_open sl tp price_current profit symbol comment",
+)
+OrderSendResult = namedtuple(
+    "OrderSendResult", "retcode deal order volume price bid ask comment request_id request"
+)
+
+DEFAULT_SYMBOLS = [
+    "EURUSD", "GBPUSD", "USDJPY", "USDCHF", "USDCAD", "AUDUSD", "NZDUSD",
+    "XAUUSD", "XAGUSD", "BTCUSD", "ETHUSD", "US30", "NAS100", "SPX500",
+    "GBPJPY", "EURJPY", "AUDJPY", "NZDJPY", "CADJPY", "CHFJPY", "EURGBP",
+]
+
+# Monday 2025-07-07 12:00:00 UTC, used as the default server clock
+DEFAULT_NOW = 1751889600
+
+
+def _to_epoch(value):
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def _base_price(symbol):
+    if "JPY" in symbol:
+        return 150.0
+    if symbol.startswith(("XAU",)):
+        return 2300.0
+    if symbol.startswith(("BTC",)):
+        return 60000.0
+    if symbol.startswith(("ETH",)):
+        return 3000.0
+    if symbol.startswith(("US30", "NAS100", "SPX500")):
+        return 20000.0
+    if symbol.startswith(("XAG",)):
+        return 30.0
+    return 1.1
+
+
+def _point(symbol):
+    price = _base_price(symbol)
+    if price >= 1000:
+        return 0.01
+    if price >= 20:
+        return 0.001
+    return 0.00001
+
+
+class FakeTerminal:
+    """
+    In-memory terminal state: bar series, positions and the server clock.
+    """
+
+    def __init__(self, symbols=None, now=DEFAULT_NOW, history=5000, balance=10000.0, seed=7):
+        self.symbols = list(symbols or DEFAULT_SYMBOLS)
+        self.now = now
+        self.history = history
+        self.balance = balance
+        self.seed = seed
+        self.initialized = False
+        self.positions = {}
+        self.next_ticket = 1000
+        self.calls = {}
+        self._series = {}
+
+    # --- Bar generation ---
+    def _rng(self, symbol, timeframe, salt=0):
+        key = zlib.crc32(f"{symbol}:{timeframe}:{salt}".encode())
+        return np.random.default_rng((self.seed, key))
+
+    def _make_bars(self, symbol, timeframe, start_time, count, open_price, rng):
+        step = TIMEFRAME_SECONDS[timeframe]
+        point = _point(symbol)
+        vol = open_price * 0.0008 * (step / 3600) ** 0.5
+        moves = rng.normal(0, vol, count)
+        closes = open_price + np.cumsum(moves)
+        opens = np.concatenate(([open_price], closes[:-1]))
+        wick = np.abs(rng.normal(0, vol * 0.6, (2, count)))
+        bars = np.zeros(count, dtype=RATES_DTYPE)
+        bars["time"] = start_time + np.arange(count, dtype=np.int64) * step
+        bars["open"] = opens
+        bars["close"] = closes
+        bars["high"] = np.maximum(opens, closes) + wick[0]
+        bars["low"] = np.minimum(opens, closes) - wick[1]
+        bars["tick_volume"] = rng.integers(50, 500, count)
+        bars["spread"] = rng.integers(1, 4, count) * max(1, int(0.00001 / point))
+        return bars
+
+    def series(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        bars = self._series.get(key)
+        step = TIMEFRAME_SECONDS[timeframe]
+        current_open = self.now - self.now % step
+        if bars is None:
+            start = current_open - (self.history - 1) * step
+            bars = self._make_bars(symbol, timeframe, start, self.history,
+                                   _base_price(symbol), self._rng(symbol, timeframe))
+        elif bars["time"][-1] < current_open:
+            missing = int((current_open - bars["time"][-1]) // step)
+            new = self._make_bars(symbol, timeframe, bars["time"][-1] + step, missing,
+                                  float(bars["close"][-1]),
+                                  self._rng(symbol, timeframe, int(bars["time"][-1])))
+            bars = np.concatenate((bars, new))
+        self._series[key] = bars
+        return bars
+
+    def advance(self, seconds):
+        """Move the server clock forward; new bars appear on the next fetch."""
+        self.now += int(seconds)
+
+    def count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    # --- Ticks ---
+    def tick(self, symbol):
+        bars = self.series(symbol, TIMEFRAME_M1)
+        bid = float(bars["close"][-1])
+        ask = bid + 2 * _point(symbol)
+        return Tick(self.now, bid, ask, bid, 1, self.now * 1000, 6, 1.0)
+
+    def ticks(self, symbol, start, end):
+        """
+        One tick per second in [start, end], up to the server clock. Prices
+        follow the M1 closes; the spread is 2 points with a spike every 50s.
+        """
+        end = min(int(end), self.now)
+        start = int(start)
+        if end < start:
+            return np.zeros(0, dtype=TICKS_DTYPE)
+        seconds = np.arange(start, end + 1, dtype=np.int64)
+        bars = self.series(symbol, TIMEFRAME_M1)
+        idx = np.clip(np.searchsorted(bars["time"], seconds, side="right") - 1, 0, len(bars) - 1)
+        point = _point(symbol)
+        ticks = np.zeros(len(seconds), dtype=TICKS_DTYPE)
+        ticks["time"] = seconds
+        ticks["time_msc"] = seconds * 1000 + (seconds * 7919) % 1000
+        ticks["bid"] = bars["close"][idx] + ((seconds * 31) % 7 - 3) * point
+        ticks["ask"] = ticks["bid"] + np.where(seconds % 50 == 0, 12, 2) * point
+        ticks["last"] = ticks["bid"]
+        ticks["flags"] = 6
+        return ticks
+
+    # --- Positions ---
+    def open_position(self, request):
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        self.positions[ticket] = TradePosition(
+            ticket=ticket, time=self.now, type=request["type"], magic=request.get("magic", 0),
+            volume=request["volume"], price_open=request["price"], sl=request.get("sl", 0.0),
+            tp=request.get("tp", 0.0), price_current=request["price"], profit=0.0,
+            symbol=request["symbol"], comment=request.get("comment", ""),
+        )
+        return ticket
+
+
+terminal = FakeTerminal()
+
+
+def _wrap(name, fn):
+    def call(*args, **kwargs):
+        terminal.count(name)
+        return fn(*args, **kwargs)
+    call.__name__ = name
+    return call
+
+
+# === API functions ===
+def initialize(*args, **kwargs):
+    terminal.initialized = True
+    return True
+
+
+def shutdown():
+    terminal.initialized = False
+    return True
+
+
+def last_error():
+    return (1, "Success")
+
+
+def account_info():
+    return AccountInfo(
+        login=188728324, balance=terminal.balance, equity=terminal.balance,
+        margin_free=terminal.balance, currency="USD", server="Fake-Server", leverage=500,
+    )
+
+
+def terminal_info():
+    return TerminalInfo(connected=True, trade_allowed=True, ping_last=2000,
+                        company="Fake Broker", name="FakeTerminal")
+
+
+def symbols_get(group=None):
+    return tuple(symbol_info(s) for s in terminal.symbols)
+
+
+def symbol_info(symbol):
+    if symbol not in terminal.symbols:
+        return None
+    point = _point(symbol)
+    return SymbolInfo(
+        name=symbol, visible=True, trade_mode=SYMBOL_TRADE_MODE_FULL, point=point,
+        digits=round(-math.log10(point)), filling_mode=ORDER_FILLING_IOC,
+        trade_contract_size=100000.0, volume_min=0.01, volume_step=0.01,
+    )
+
+
+def symbol_select(symbol, enable=True):
+    return symbol in terminal.symbols
+
+
+def symbol_info_tick(symbol):
+    if symbol not in terminal.symbols:
+        return None
+    return terminal.tick(symbol)
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    if symbol not in terminal.symbols:
+        return None
+    bars = terminal.series(symbol, timeframe)
+    end = len(bars) - start_pos
+    return bars[max(0, end - count):end].copy()
+
+
+def copy_rates_from(symbol, timeframe, date_from, count):
+    if symbol not in terminal.symbols:
+        return None
+    bars = terminal.series(symbol, timeframe)
+    end = int(np.searchsorted(bars["time"], _to_epoch(date_from), side="right"))
+    return bars[max(0, end - count):end].copy()
+
+
+def copy_rates_range(symbol, timeframe, date_from, date_to):
+    if symbol not in terminal.symbols:
+        return None
+    bars = terminal.series(symbol, timeframe)
+    lo = int(np.searchsorted(bars["time"], _to_epoch(date_from), side="left"))
+    hi = int(np.searchsorted(bars["time"], _to_epoch(date_to), side="right"))
+    return bars[lo:hi].copy()
+
+
+def copy_ticks_from(symbol, date_from, count, flags):
+    if symbol not in terminal.symbols:
+        return None
+    start = _to_epoch(date_from)
+    return terminal.ticks(symbol, start, start + int(count) - 1)[:count]
+
+
+def copy_ticks_range(symbol, date_from, date_to, flags):
+    if symbol not in terminal.symbols:
+        return None
+    return terminal.ticks(symbol, _to_epoch(date_from), _to_epoch(date_to))
+
+
+def positions_get(symbol=None, ticket=None, group=None):
+    positions = terminal.positions.values()
+    if symbol is not None:
+        positions = [p for p in positions if p.symbol == symbol]
+    if ticket is not None:
+        positions = [p for p in positions if p.ticket == ticket]
+    return tuple(positions)
+
+
+def order_send(request):
+    action = request.get("action")
+    tick = terminal.tick(request["symbol"])
+    if action == TRADE_ACTION_DEAL:
+        ticket = terminal.open_position(request)
+        price = tick.ask if request["type"] == ORDER_TYPE_BUY else tick.bid
+        return OrderSendResult(TRADE_RETCODE_DONE, ticket, ticket, request["volume"], price,
+                               tick.bid, tick.ask, "Request executed", 1, request)
+    if action == TRADE_ACTION_SLTP:
+        position = terminal.positions.get(request.get("position"))
+        if position is None:
+            return OrderSendResult(TRADE_RETCODE_INVALID, 0, 0, 0.0, 0.0,
+                                   tick.bid, tick.ask, "Invalid request", 1, request)
+        terminal.positions[position.ticket] = position._replace(
+            sl=request.get("sl", position.sl), tp=request.get("tp", position.tp)
+        )
+        return OrderSendResult(TRADE_RETCODE_DONE, 0, position.ticket, position.volume, 0.0,
+                               tick.bid, tick.ask, "Request executed", 1, request)
+    return OrderSendResult(TRADE_RETCODE_INVALID, 0, 0, 0.0, 0.0,
+                           tick.bid, tick.ask, "Invalid request", 1, request)
+
+
+_API = [
+    "initialize", "shutdown", "last_error", "account_info", "terminal_info", "symbols_get",
+    "symbol_info", "symbol_select", "symbol_info_tick", "copy_rates_from_pos",
+    "copy_rates_from", "copy_rates_range", "copy_ticks_from", "copy_ticks_range",
+    "positions_get", "order_send",
+]
+
+
+def install(fake_terminal=None):
+    """
+    Register this stand-in as the `MetaTrader5` module and return the terminal.
+    Every API call is counted in terminal.calls.
+    """
+    global terminal
+    if fake_terminal is not None:
+        terminal = fake_terminal
+    module = types.ModuleType("MetaTrader5")
+    this = sys.modules[__name__]
+    for name, value in vars(this).items():
+        if name.isupper():
+            setattr(module, name, value)
+    for name in _API:
+        setattr(module, name, _wrap(name, getattr(this, name)))
+    module.terminal = terminal
+    sys.modules["MetaTrader5"] = module
+    return terminal
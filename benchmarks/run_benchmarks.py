@@ -0,0 +1,360 @@
+"""
+Benchmark suite for the scan-cycle and journal hot paths.
+
+Runs against the local MT5 stand-in (benchmarks/fake_mt5.py) so it works on
+Linux without a terminal. All file output goes to a temporary working dir.
+
+Usage:
+    python benchmarks/run_benchmarks.py run [--quick] [--only NAME ...] [--output FILE]
+    python benchmarks/run_benchmarks.py compare BASELINE.json CURRENT.json [--threshold 0.15]
+
+`compare` exits with status 1 when any benchmark regressed past the threshold.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+DEFAULT_THRESHOLD = 0.15
+
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import fake_mt5  # noqa: E402
+
+terminal = fake_mt5.install()
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark function under `name`."""
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def measure(fn, repeat=20, warmup=2, setup=None):
+    """
+    Time `fn` `repeat` times after `warmup` untimed calls.
+    Returns summary stats in milliseconds.
+    """
+    samples = []
+    for i in range(warmup + repeat):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        fn()
+        elapsed = time.perf_counter_ns() - start
+        if i >= warmup:
+            samples.append(elapsed / 1e6)
+
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "max_ms": round(samples[-1], 4),
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the bot's console logging while timing."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# === Decision pipeline ===
+@benchmark("decide_trade")
+def bench_decide_trade(quick):
+    from smc_decision_engine import decide_trade
+
+    symbols = terminal.symbols
+    results = {}
+    with quiet():
+        for symbol in symbols[:5] if quick else symbols:
+            results[symbol] = measure(lambda: decide_trade(symbol), repeat=5 if quick else 20)
+    return results
+
+
+@benchmark("bot_loop_cycle")
+def bench_scan_cycle(quick):
+    import bot_runner
+
+    bot_runner.IGNORE_MARKET_HOURS = True  # time the full scan whatever the wall-clock hour
+    results = {}
+    for n in (5, 10) if quick else (5, 10, 21):
+        symbols = terminal.symbols[:n]
+        with quiet():
+            results[f"{n}_symbols"] = measure(
+                lambda: bot_runner.run_scan_cycle("bench@sentinel.com", symbols, symbol_delay=0),
+                repeat=3 if quick else 10,
+                warmup=1,
+                setup=terminal.positions.clear,
+            )
+    return results
+
+
+@benchmark("technicals")
+def bench_technicals(quick):
+    import technicals
+
+    symbol = "EURUSD"
+    calls = {
+        "get_candles": lambda: technicals.get_candles(symbol, fake_mt5.TIMEFRAME_H1, 50),
+        "get_trend_direction": lambda: technicals.get_trend_direction(symbol),
+        "is_market_ranging": lambda: technicals.is_market_ranging(symbol),
+        "confirm_candle_entry": lambda: technicals.confirm_candle_entry(symbol),
+        "detect_order_block": lambda: technicals.detect_order_block(symbol, "UP"),
+        "detect_support_resistance": lambda: technicals.detect_support_resistance(symbol, "UP"),
+        "get_volatility": lambda: technicals.get_volatility(symbol),
+    }
+    return {name: measure(fn, repeat=20 if quick else 200) for name, fn in calls.items()}
+
+
+@benchmark("bar_store")
+def bench_bar_store(quick):
+    from bar_store import BarSeries
+
+    symbol, tf = "GBPUSD", fake_mt5.TIMEFRAME_M15
+    series = BarSeries(symbol, tf, directory="bars")
+    series.sync(force=True)
+    repeat = 20 if quick else 200
+
+    def delta_sync():
+        terminal.advance(900)
+        series.sync(force=True)
+
+    return {
+        "copy_rates_from_pos_500": measure(lambda: fake_mt5.copy_rates_from_pos(symbol, tf, 0, 500), repeat=repeat),
+        "window_500": measure(lambda: series.window(500), repeat=repeat),
+        "delta_sync": measure(delta_sync, repeat=repeat),
+    }
+
+
+@benchmark("metrics_hook")
+def bench_metrics_hook(quick):
+    import metrics
+
+    calls = 100_000 if quick else 1_000_000
+
+    def hooks():
+        for _ in range(calls):
+            with metrics.stage("bench", "EURUSD"):
+                pass
+
+    results = {}
+    was_enabled = metrics.is_enabled()
+    for label, toggle in (("disabled", metrics.disable), ("enabled", metrics.enable)):
+        toggle()
+        stats = measure(hooks, repeat=3, warmup=1)
+        stats["ns_per_hook"] = round(stats["median_ms"] * 1e6 / calls, 1)
+        results[label] = stats
+    metrics.enable() if was_enabled else metrics.disable()
+    metrics.reset()
+    return results
+
+
+# === Journal ===
+def write_journal(path, rows, today_rows=50):
+    """Write a synthetic journal: `rows` trades, the last `today_rows` dated today."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    history_start = now - timedelta(days=365)
+    step = timedelta(days=364) / max(1, rows - today_rows)
+    with open(path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Timestamp", "Symbol", "EntryPrice", "ExitPrice", "Profit", "Direction"])
+        for i in range(rows):
+            ts = now if i >= rows - today_rows else history_start + step * i
+            profit = round(((i * 37) % 200 - 100) / 10, 2)
+            writer.writerow([ts.isoformat(), "EURUSD", 1.1, 1.101, profit, "BUY" if i % 2 else "SELL"])
+
+
+@benchmark("journal_export")
+def bench_journal_export(quick):
+    import journal
+
+    results = {}
+    for rows in (10_000, 100_000) if quick else (10_000, 100_000, 1_000_000):
+        tj = journal.TradeJournal()
+        write_journal(journal.JOURNAL_CSV, rows)
+        results[f"{rows}_rows"] = measure(
+            tj.export_daily_report, repeat=2 if rows >= 1_000_000 else 5, warmup=1
+        )
+    return results
+
+
+# === AI memory ===
+@benchmark("ai_memory_record_trade")
+def bench_ai_memory(quick):
+    import ai_memory
+
+    results = {}
+    for history in (100, 1_000) if quick else (100, 1_000, 10_000):
+        with open(ai_memory.MEMORY_FILE, "w") as f:
+            json.dump({"EURUSD": [
+                {"entry_price": 1.1, "exit_price": 1.101, "profit": 1.0, "sentiment": None,
+                 "bias": None, "timestamp": "2025-07-07T12:00:00"}
+            ] * history}, f)
+        memory = ai_memory.AIMemory()
+        results[f"{history}_trades"] = measure(
+            lambda: memory.record_trade("EURUSD", 1.1, 1.101, 1.0), repeat=10 if quick else 30
+        )
+    return results
+
+
+# === User log ===
+@benchmark("log_user_event_threads")
+def bench_log_user_event(quick):
+    import log
+
+    results = {}
+    messages = 200 if quick else 2_000
+    for threads in (1, 4, 16):
+        def worker(idx):
+            email = f"user{idx % 4}@sentinel.com"
+            for i in range(messages):
+                log.log_user_event(email, f"⏳ No valid setup for EURUSD ({i})")
+
+        def run():
+            pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+
+        with quiet():
+            stats = measure(run, repeat=3, warmup=1)
+        stats["events_per_sec"] = round(threads * messages / (stats["median_ms"] / 1000), 1)
+        results[f"{threads}_threads"] = stats
+    return results
+
+
+# === Runner ===
+def run(names=None, quick=False):
+    selected = names or list(BENCHMARKS)
+    unknown = [n for n in selected if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"❌ Unknown benchmark(s): {', '.join(unknown)}")
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="sentinel-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            for name in selected:
+                print(f"⏱️ {name}...", flush=True)
+                results[name] = BENCHMARKS[name](quick)
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def flatten(results, prefix=""):
+    """Yield (path, stats) pairs for every leaf stats dict."""
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict) and "median_ms" in value:
+            yield path, value
+        elif isinstance(value, dict):
+            yield from flatten(value, path)
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result files by median time.
+    Returns a list of (path, base_ms, current_ms, change, status) rows.
+    """
+    base = dict(flatten(baseline["results"]))
+    rows = []
+    for path, stats in flatten(current["results"]):
+        if path not in base:
+            rows.append((path, None, stats["median_ms"], None, "NEW"))
+            continue
+        base_ms = base[path]["median_ms"]
+        change = (stats["median_ms"] - base_ms) / base_ms if base_ms else 0.0
+        if change > threshold:
+            status = "REGRESSION"
+        elif change < -threshold:
+            status = "IMPROVED"
+        else:
+            status = "OK"
+        rows.append((path, base_ms, stats["median_ms"], change, status))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentinel benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = sub.add_parser("run", help="Run benchmarks and store a JSON baseline")
+    run_cmd.add_argument("--quick", action="store_true", help="Smaller sizes and fewer repeats")
+    run_cmd.add_argument("--only", nargs="+", metavar="NAME", choices=sorted(BENCHMARKS))
+    run_cmd.add_argument("--output", help="Result file (default: benchmarks/baselines/<timestamp>.json)")
+
+    cmp_cmd = sub.add_parser("compare", help="Compare two result files and flag regressions")
+    cmp_cmd.add_argument("baseline")
+    cmp_cmd.add_argument("current")
+    cmp_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="Allowed relative slowdown of the median (default: 0.15)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.only, args.quick)
+        output = args.output or os.path.join(
+            BASELINE_DIR, datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S") + ".json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results written to {output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = 0
+    for path, base_ms, cur_ms, change, status in compare(baseline, current, args.threshold):
+        base_txt = f"{base_ms:.4f}" if base_ms is not None else "-"
+        change_txt = f"{change * 100:+.1f}%" if change is not None else "-"
+        print(f"{status:<10} {path:<55} {base_txt:>12} → {cur_ms:.4f} ms ({change_txt})")
+        regressions += status == "REGRESSION"
+
+    if regressions:
+        print(f"❌ {regressions} regression(s) above {args.threshold * 100:.0f}%")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
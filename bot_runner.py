@@ -8,37 +8,223 @@ try:
     from log import log_user_event
     from config import (
         MAGIC_NUMBER,
-        MAX_TRADES_AT_ONCE,
         MAX_STOPLOSS_PIPS,
         MAX_LOT_SIZE,
-        RISK_TIERS
+        BOT_WORKER_MODE,
+        SHARED_SIGNALS,
+        POSITION_MANAGER_ENABLED,
+        POSITION_MANAGER_INTERVAL_SECONDS,
+        SR_INDEX_ENABLED,
+        HEARTBEAT_INTERVAL_SECONDS,
+        IGNORE_MARKET_HOURS
     )
 except ImportError:
     from .log import log_user_event
     from backend.config import (
         MAGIC_NUMBER,
-        MAX_TRADES_AT_ONCE,
         MAX_STOPLOSS_PIPS,
         MAX_LOT_SIZE,
-        RISK_TIERS
+        BOT_WORKER_MODE,
+        SHARED_SIGNALS,
+        POSITION_MANAGER_ENABLED,
+        POSITION_MANAGER_INTERVAL_SECONDS,
+        SR_INDEX_ENABLED,
+        HEARTBEAT_INTERVAL_SECONDS,
+        IGNORE_MARKET_HOURS
     )
 
+import settings
 from smc_decision_engine import decide_trade
 from trade_manager import place_order
-from symbol_utils import SYMBOLS_TO_TRADE
+from symbol_utils import get_symbols_to_trade
+from metrics import stage, set_user
+from risk_manager import calculate_risk_percent, calculate_lot
+from tick_store import current_tick
+from positions_snapshot import take_snapshot, clear_snapshot
+from position_manager import get_position_manager
+from sr_levels import get_levels
+from correlation import select_top_k, direction_of
+from mt5_heartbeat import start_heartbeat, get_heartbeat, stop_heartbeat
+import warm_start
+from trading_calendar import get_calendar
+from log_coalesce import for_user
 
 bot_states = {}
 user_threads = {}
 stop_flags = {}
 
 def get_risk_percent(balance):
-    for tier in RISK_TIERS:
+    for tier in settings.current().RISK_TIERS:
         if balance <= tier["balance_max"]:
             return tier["risk_percent"]
     return 0.02
 
-def bot_loop(user_email):
-    if not mt5.initialize():
+def scan_symbols(user_email, symbols, symbol_delay=1, hub=None):
+    """
+    Run decide_trade over each symbol and return every valid signal.
+    With a SignalHub, read its shared per-bar signals instead of analysing locally.
+    """
+    signals = []
+    events = for_user(user_email)
+
+    for symbol in symbols:
+        if hub is not None:
+            signal = hub.latest(symbol)
+        else:
+            with stage("decide_trade", symbol):
+                signal = decide_trade(symbol)
+
+        if signal:
+            signals.append(signal)
+            events.changed(("scan", symbol), signal["type"], f"📡 Signal for {symbol}: {signal}")
+        else:
+            events.changed(("scan", symbol), None, f"⏳ No valid setup for {symbol}")
+        if symbol_delay:
+            time.sleep(symbol_delay)
+
+    return signals
+
+def select_signals(signals, slots, positions, max_trades):
+    """
+    The signals to trade this cycle: the best-scoring one, or with
+    max_trades > 1 up to `slots` signals that don't stack correlated
+    exposure on each other or on the open positions.
+    """
+    if not signals:
+        return []
+    if max_trades <= 1:
+        return [max(signals, key=lambda s: s.get("score", 1))]  # use .get("score") or default to 1
+    with stage("correlation_select"):
+        return select_top_k(
+            [(s.get("score", 1), s["symbol"], direction_of(s["type"]), s) for s in signals],
+            slots,
+            held=[(p.symbol, direction_of(p.type)) for p in positions],
+        )
+
+def size_for_account(signal):
+    """
+    Copy a signal and size it for this account: entry at this account's
+    current price, SL/TP moved with it so their distances from the entry are
+    kept, and the lot from risk_manager. Used for local and shared signals
+    alike. Returns None if MT5 data is unavailable.
+    """
+    account_info = mt5.account_info()
+    symbol_info = mt5.symbol_info(signal["symbol"])
+    tick = current_tick(signal["symbol"])
+    if not account_info or not symbol_info or not tick:
+        return None
+
+    sized = dict(signal)
+    sized["entry_price"] = tick.ask if signal["type"] == "buy" else tick.bid
+    shift = sized["entry_price"] - signal["entry_price"]
+    sized["sl"] = round(signal["sl"] + shift, 5)
+    sized["tp"] = round(signal["tp"] + shift, 5)
+    risk_percent = calculate_risk_percent(account_info.balance)
+    sized["lot"] = calculate_lot(symbol_info, account_info.balance, risk_percent)
+    return sized
+
+def run_scan_cycle(user_email, symbols=None, symbol_delay=1, hub=None):
+    """
+    One bot_loop iteration: market-hours gate, max-trades check, symbol scan
+    and order placement. Returns False if the cycle was skipped because every
+    market is closed or the trade limit is reached.
+    """
+    cfg = settings.current()
+    symbols = symbols or get_symbols_to_trade()
+    if not IGNORE_MARKET_HOURS:
+        # Closed markets are dropped before any terminal call
+        symbols = get_calendar().open_symbols(symbols)
+        if not symbols:
+            for_user(user_email).repeated("🌙 All markets closed. Skipping this cycle.")
+            return False
+
+    with stage("positions"):
+        positions = take_snapshot()
+    open_trade_count = len(positions)
+
+    if open_trade_count >= cfg.MAX_TRADES_AT_ONCE:
+        for_user(user_email).repeated("🔒 Max trades reached. Skipping this cycle.")
+        return False
+
+    if hub is not None:
+        # Shared signals need no terminal work per symbol; only our own position checks
+        symbols = [s for s in symbols if not positions.has_symbol(s)]
+        symbol_delay = 0
+
+    signals = scan_symbols(user_email, symbols, symbol_delay, hub)
+    selected = select_signals(signals, cfg.MAX_TRADES_AT_ONCE - open_trade_count, positions, cfg.MAX_TRADES_AT_ONCE)
+    if not selected:
+        for_user(user_email).repeated("🟡 No trade placed. No valid signal detected.")
+
+    for signal in selected:
+        signal = size_for_account(signal)
+        if not signal:
+            continue
+        log_user_event(user_email, f"🎯 Trade selected: {signal}")
+        success = place_order(
+            symbol=signal["symbol"],
+            order_type=signal["type"],
+            price=signal["entry_price"],
+            sl=signal["sl"],
+            tp=signal["tp"],
+            lot=signal["lot"],
+            account=user_email,
+            signal_time=signal.get("signal_time")
+        )
+        if success:
+            log_user_event(user_email, f"✅ Trade placed: {signal}")
+        else:
+            log_user_event(user_email, f"❌ Failed to place trade for {signal['symbol']}")
+
+    for_user(user_email).repeated("🔁 Scan complete. Waiting before next scan...")
+    return True
+
+def manage_positions(user_email):
+    """One position-manager pass (trailing stops, scale-ins) over a fresh snapshot."""
+    with stage("positions"):
+        positions = take_snapshot()
+    try:
+        if len(positions):
+            levels = ({symbol: get_levels(symbol, mt5.TIMEFRAME_H1) for symbol in positions.symbols()}
+                      if SR_INDEX_ENABLED else None)
+            with stage("position_manager"):
+                get_position_manager(user_email).run(positions, levels)
+    finally:
+        clear_snapshot()
+
+def wait_unless_stopped(user_email, seconds, task=None, interval=None):
+    """
+    Sleep up to `seconds`, waking early once a stop is requested.
+    With a `task`, call task(user_email) every `interval` seconds meanwhile.
+    """
+    deadline = time.time() + seconds
+    next_run = time.time()
+    while not stop_flags.get(user_email, False) and time.time() < deadline:
+        if task is not None and time.time() >= next_run:
+            try:
+                task(user_email)
+            except Exception as e:
+                log_user_event(user_email, f"⚠️ {task.__name__} failed: {e}")
+            next_run = time.time() + interval
+        time.sleep(min(1, max(0, deadline - time.time())))
+
+def connect_terminal(account=None):
+    """
+    Initialize MT5, optionally for a specific account/terminal.
+    `account` may hold login, password, server and path (terminal64.exe).
+    """
+    if not account:
+        return mt5.initialize()
+    kwargs = {k: v for k, v in account.items() if k in ("path", "login", "password", "server") and v}
+    if "login" in kwargs:
+        kwargs["login"] = int(kwargs["login"])  # MT5 API requires login as integer
+    path = kwargs.pop("path", None)
+    return mt5.initialize(path, **kwargs) if path else mt5.initialize(**kwargs)
+
+def bot_loop(user_email, account=None, hub=None):
+    set_user(user_email)
+    settings.start_watcher()
+    if not connect_terminal(account):
         log_user_event(user_email, "❌ MT5 initialization failed.")
         return
 
@@ -48,81 +234,79 @@ def bot_loop(user_email):
         mt5.shutdown()
         return
 
+    warm_start.resume(account_info)  # once per process: reload cached symbols and indexes
+    get_calendar().refresh_broker(get_symbols_to_trade())
     risk = get_risk_percent(account_info.balance)
     log_user_event(user_email, f"✅ Bot started on account {account_info.login} "
                                f"(Balance: {account_info.balance}, Risk: {risk * 100}%)")
 
+    if hub is None and SHARED_SIGNALS:
+        from signal_hub import get_hub
+        hub = get_hub()
+    if hub is not None:
+        hub.subscribe(user_email, get_symbols_to_trade())
+
+    # Started by start_bot_for_user in thread mode; a worker process starts its own
+    heartbeat = start_heartbeat(user_email, connect=lambda: connect_terminal(account))
     try:
         while not stop_flags.get(user_email, False):
-            positions = mt5.positions_get()
-            open_trade_count = len(positions) if positions else 0
-
-            if open_trade_count >= MAX_TRADES_AT_ONCE:
-                log_user_event(user_email, "🔒 Max trades reached. Skipping this cycle.")
-                time.sleep(30)
+            if not heartbeat.healthy():
+                # The heartbeat logs the outage and reconnects; just don't trade through it
+                wait_unless_stopped(user_email, HEARTBEAT_INTERVAL_SECONDS)
                 continue
-
-            best_signal = None
-            best_score = -float("inf")
-
-            for symbol in SYMBOLS_TO_TRADE:
-                signal = decide_trade(symbol)
-
-                if signal:
-                    score = signal.get("score", 1)  # use .get("score") or default to 1
-                    if score > best_score:
-                        best_signal = signal
-                        best_score = score
-                    log_user_event(user_email, f"📡 Signal for {symbol}: {signal}")
-                else:
-                    log_user_event(user_email, f"⏳ No valid setup for {symbol}")
-                time.sleep(1)
-
-            if best_signal:
-                log_user_event(user_email, f"🎯 Best trade selected: {best_signal}")
-                success = place_order(
-                    symbol=best_signal["symbol"],
-                    order_type=best_signal["type"],
-                    price=best_signal["entry_price"],
-                    sl=best_signal["sl"],
-                    tp=best_signal["tp"],
-                    lot=best_signal["lot"]
-                )
-                if success:
-                    log_user_event(user_email, f"✅ Trade placed: {best_signal}")
-                else:
-                    log_user_event(user_email, f"❌ Failed to place trade for {best_signal['symbol']}")
-            else:
-                log_user_event(user_email, "🟡 No trade placed. No valid signal detected.")
-
-            log_user_event(user_email, "🔁 Scan complete. Waiting before next scan...")
-            time.sleep(30)
+            try:
+                run_scan_cycle(user_email, hub=hub)
+            finally:
+                clear_snapshot()
+            # Trailing stops and scale-ins run on their own, faster cadence between scans
+            wait_unless_stopped(user_email, 30, manage_positions if POSITION_MANAGER_ENABLED else None,
+                                POSITION_MANAGER_INTERVAL_SECONDS)
 
     except Exception as e:
         log_user_event(user_email, f"⚠️ Bot error: {e}")
     finally:
+        if stop_flags.get(user_email, False):
+            warm_start.save_on_shutdown()
+        if hub is not None:
+            hub.unsubscribe(user_email)
         try:
             mt5.shutdown()
         except Exception:
             pass
+        for_user(user_email).reset()
         log_user_event(user_email, "🛑 Bot stopped.")
         stop_flags[user_email] = False
         bot_states[user_email] = False
 
-def start_bot_for_user(user_email):
-    if user_email in user_threads and user_threads[user_email].is_alive():
+def start_bot_for_user(user_email, account=None):
+    if BOT_WORKER_MODE == "process":
+        from bot_supervisor import get_supervisor
+        return get_supervisor().start(user_email, account)
+
+    heartbeat = get_heartbeat(user_email)
+    if (user_email in user_threads and user_threads[user_email].is_alive()) or (heartbeat and heartbeat.restarting()):
         log_user_event(user_email, "⚠️ Bot is already running.")
         return False
 
-    stop_flags[user_email] = False
-    bot_states[user_email] = True
-    t = threading.Thread(target=bot_loop, args=(user_email,), daemon=True)
-    user_threads[user_email] = t
-    t.start()
+    def spawn():
+        stop_flags[user_email] = False
+        bot_states[user_email] = True
+        t = threading.Thread(target=bot_loop, args=(user_email, account), daemon=True)
+        user_threads[user_email] = t
+        t.start()
+        return t
+
+    # The heartbeat restarts bot_loop if it exits without a stop request
+    start_heartbeat(user_email, connect=lambda: connect_terminal(account)).supervise(spawn)
     return True
 
 def stop_bot_for_user(user_email):
-    if user_email in user_threads:
+    if BOT_WORKER_MODE == "process":
+        from bot_supervisor import get_supervisor
+        return get_supervisor().stop(user_email)
+
+    restarting = stop_heartbeat(user_email)
+    if user_email in user_threads or restarting:
         stop_flags[user_email] = True
         log_user_event(user_email, "⛔ Stop requested. Bot will stop shortly.")
         return True
@@ -156,6 +340,9 @@ def start_bot():
             time.sleep(60)
     except KeyboardInterrupt:
         print("🛑 Bot interrupted manually. Exiting...")
+        if BOT_WORKER_MODE == "process":
+            from bot_supervisor import get_supervisor
+            get_supervisor().shutdown()
 
 if __name__ == "__main__":
     start_bot()
@@ -0,0 +1,331 @@
+"""
+Process-per-account bot supervisor.
+
+Each account's bot_loop runs in its own worker process with its own MT5
+terminal session, so accounts no longer share the process-global
+MetaTrader5 module. The supervisor talks to workers over a Pipe
+(start/stop/status), restarts crashed workers with exponential backoff and
+caps the number of workers per host.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from log import log_user_event
+from config import (
+    SHARED_SIGNALS,
+    MAX_WORKERS_PER_HOST,
+    WORKER_RESTART_BACKOFF_INITIAL,
+    WORKER_RESTART_BACKOFF_MAX,
+    WORKER_HEALTHY_RESET_SECONDS,
+)
+
+# MT5 only runs on Windows, where "spawn" is the default anyway
+_mp = multiprocessing.get_context("spawn")
+
+
+def _worker_main(user_email, account, conn, shared=None):
+    """
+    Worker process entry point: run bot_loop in a thread and serve IPC commands.
+    `shared` is the hub's (signals, subscriptions) Manager dicts, if enabled.
+    Exits 0 after a requested stop and 1 if the bot loop ended on its own.
+    """
+    import bot_runner
+
+    hub = None
+    if shared is not None:
+        from signal_hub import SignalHub
+        hub = SignalHub(*shared)
+
+    bot_runner.stop_flags[user_email] = False
+    bot_runner.bot_states[user_email] = True
+    started = time.time()
+    stop_requested = False
+
+    t = threading.Thread(target=bot_runner.bot_loop, args=(user_email, account, hub), daemon=True)
+    t.start()
+
+    while t.is_alive():
+        if not conn.poll(1):
+            continue
+        try:
+            command = conn.recv()
+        except EOFError:
+            # Supervisor went away; stop trading rather than run unsupervised
+            command = "stop"
+
+        if command == "stop":
+            stop_requested = True
+            bot_runner.stop_flags[user_email] = True
+        elif command == "status":
+            conn.send({
+                "pid": os.getpid(),
+                "running": t.is_alive(),
+                "uptime": round(time.time() - started, 1),
+                "stopping": stop_requested,
+            })
+
+    # sys.exit runs atexit handlers and flushes output; the daemon bot thread has already ended
+    sys.exit(0 if stop_requested else 1)
+
+
+class _Worker:
+    def __init__(self, user_email, account, shared=None):
+        self.user_email = user_email
+        self.account = account
+        self.shared = shared
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.started_at = None
+        self.restarts = 0
+        self.backoff = WORKER_RESTART_BACKOFF_INITIAL
+        self.restart_at = None
+        self.stopping = False
+        self.stop_deadline = None  # when an ignored stop request turns into terminate()
+        self.terminated_at = None
+
+    def spawn(self):
+        parent_conn, child_conn = _mp.Pipe()
+        self.process = _mp.Process(
+            target=_worker_main,
+            args=(self.user_email, self.account, child_conn, self.shared),
+            name=f"bot-{self.user_email}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.started_at = time.time()
+        self.restart_at = None
+
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def send(self, command):
+        with self.lock:
+            try:
+                self.conn.send(command)
+                return True
+            except (OSError, EOFError, BrokenPipeError):
+                return False
+
+    def query_status(self, timeout=2):
+        with self.lock:
+            try:
+                self.conn.send("status")
+                if self.conn.poll(timeout):
+                    return self.conn.recv()
+            except (OSError, EOFError, BrokenPipeError):
+                pass
+        return None
+
+
+class BotSupervisor:
+    """
+    Starts, stops and monitors one worker process per account.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS_PER_HOST, poll_interval=1.0, shared_signals=SHARED_SIGNALS):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.shared_signals = shared_signals
+        self.workers = {}
+        self._manager = None
+        self._hubs = {}  # broker server (None = default terminal) -> [hub process, (signals, subscriptions), account]
+        self._lock = threading.Lock()
+        self._running = True
+        self._monitor = threading.Thread(target=self._monitor_loop, name="bot-supervisor", daemon=True)
+        self._monitor.start()
+
+    def start(self, user_email, account=None):
+        """
+        Start a worker for this account. `account` holds optional MT5
+        initialize() arguments (login, password, server, path).
+        """
+        with self._lock:
+            worker = self.workers.get(user_email)
+            if worker and worker.stopping and worker.alive():
+                log_user_event(user_email, "⚠️ Bot is still stopping. Try again shortly.")
+                return False
+            if worker and (worker.alive() or worker.restart_at is not None):
+                log_user_event(user_email, "⚠️ Bot is already running.")
+                return False
+
+            active = sum(1 for w in self.workers.values() if w.alive() or w.restart_at is not None)
+            if active >= self.max_workers:
+                log_user_event(user_email, f"🚫 Worker limit reached ({self.max_workers}). Bot not started.")
+                return False
+
+            shared = self._ensure_hub(account) if self.shared_signals else None
+            worker = _Worker(user_email, account, shared)
+            worker.spawn()
+            self.workers[user_email] = worker
+
+        log_user_event(user_email, f"🧩 Bot worker started (PID {worker.process.pid}).")
+        return True
+
+    def stop(self, user_email, timeout=60):
+        """
+        Ask the worker to stop and return straight away. The monitor thread
+        reaps it, and terminates it if it's still running after `timeout` seconds.
+        """
+        with self._lock:
+            worker = self.workers.get(user_email)
+            if not worker:
+                return False
+            if worker.stopping:
+                return True
+            worker.stopping = True
+            worker.restart_at = None
+            if not worker.alive():
+                self.workers.pop(user_email, None)
+                return True
+            worker.stop_deadline = time.time() + timeout
+
+        log_user_event(user_email, "⛔ Stop requested. Bot will stop shortly.")
+        worker.send("stop")
+        return True
+
+    def _reap(self, worker, now):
+        """Monitor-thread side of stop(): forget the worker once it exited, escalating past its deadline."""
+        if not worker.alive():
+            worker.process.join(0)
+            with self._lock:
+                if self.workers.get(worker.user_email) is worker:
+                    self.workers.pop(worker.user_email)
+            return
+        if worker.terminated_at is None and now >= worker.stop_deadline:
+            log_user_event(worker.user_email, "⚠️ Worker did not stop in time. Terminating.")
+            worker.process.terminate()
+            worker.terminated_at = now
+        elif worker.terminated_at is not None and now - worker.terminated_at >= 5:
+            worker.process.kill()
+
+    def status(self, user_email=None):
+        """Return a status dict for one account, or for all accounts."""
+        if user_email is None:
+            with self._lock:
+                emails = list(self.workers)
+            return {email: self.status(email) for email in emails}
+
+        worker = self.workers.get(user_email)
+        if not worker:
+            return {"running": False}
+
+        info = {
+            "running": worker.alive(),
+            "pid": worker.process.pid if worker.process else None,
+            "restarts": worker.restarts,
+            "restart_at": worker.restart_at,
+        }
+        if worker.alive():
+            info.update(worker.query_status() or {})
+        return info
+
+    def is_running(self, user_email):
+        worker = self.workers.get(user_email)
+        return bool(worker and (worker.alive() or worker.restart_at is not None))
+
+    def shutdown(self, timeout=30):
+        """Stop every worker (waiting for them, unlike stop()), the signal hub and the monitor thread."""
+        self._running = False
+        for email in list(self.workers):
+            self.stop(email, timeout)
+        deadline = time.time() + timeout
+        for worker in list(self.workers.values()):
+            worker.process.join(max(0.0, deadline - time.time()))
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join(5)
+        self.workers.clear()
+        for process, _shared, _account in self._hubs.values():
+            process.terminate()
+            process.join(5)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def _ensure_hub(self, account=None):
+        """
+        Start the signal hub for this account's broker server if it isn't
+        running, and return its (signals, subscriptions) Manager dicts.
+
+        Prices and symbol specs differ between brokers, so each server gets
+        its own hub, logged in with the first account seen on that server.
+        Accounts without a server share the default terminal's hub.
+        """
+        from signal_hub import hub_process_main
+
+        server = (account or {}).get("server") or None
+        if self._manager is None:
+            self._manager = _mp.Manager()
+        hub = self._hubs.get(server)
+        if hub is None:
+            hub = self._hubs[server] = [None, (self._manager.dict(), self._manager.dict()), account]
+        if hub[0] is None or not hub[0].is_alive():
+            hub[0] = _mp.Process(
+                target=hub_process_main, args=(*hub[1], hub[2]),
+                name=f"signal-hub-{server or 'default'}", daemon=True,
+            )
+            hub[0].start()
+        return hub[1]
+
+    def _monitor_loop(self):
+        while self._running:
+            now = time.time()
+            with self._lock:
+                workers = list(self.workers.values())
+                for process, _shared, account in list(self._hubs.values()):
+                    if not process.is_alive() and workers:
+                        self._ensure_hub(account)
+
+            for worker in workers:
+                if worker.stopping:
+                    if worker.stop_deadline is not None:
+                        self._reap(worker, now)
+                    continue
+
+                if worker.restart_at is not None:
+                    if now >= worker.restart_at:
+                        with self._lock:
+                            if worker.stopping or self.workers.get(worker.user_email) is not worker:
+                                continue
+                            worker.restarts += 1
+                            worker.spawn()
+                        log_user_event(worker.user_email,
+                                       f"♻️ Bot worker restarted (attempt {worker.restarts}).")
+                    continue
+
+                if worker.alive():
+                    # Forget old crashes once the worker has been healthy for a while
+                    if now - worker.started_at > WORKER_HEALTHY_RESET_SECONDS:
+                        worker.backoff = WORKER_RESTART_BACKOFF_INITIAL
+                    continue
+
+                exitcode = worker.process.exitcode
+                if exitcode == 0:
+                    with self._lock:
+                        self.workers.pop(worker.user_email, None)
+                    continue
+
+                worker.restart_at = now + worker.backoff
+                log_user_event(worker.user_email,
+                               f"💥 Bot worker exited (code {exitcode}). Restarting in {worker.backoff}s.")
+                worker.backoff = min(worker.backoff * 2, WORKER_RESTART_BACKOFF_MAX)
+
+            time.sleep(self.poll_interval)
+
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+
+def get_supervisor():
+    """Return the process-wide supervisor, creating it on first use."""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = BotSupervisor()
+        return _supervisor
@@ -22,6 +22,173 @@ RISK_TIERS = [
 RISK_SMALL_ACCOUNT = 0.1   # 10% risk for accounts < $100
 RISK_LARGE_ACCOUNT = 0.02  # 2% risk for accounts >= $100
 
+# === Strategy Parameters ===
+# Indicator windows, thresholds and scoring weights (tunable with optimizer.py)
+TREND_SMA_FAST = 5                   # W1/D1/H4 trend vote: fast vs slow SMA
+TREND_SMA_SLOW = 15
+RANGE_SMA_FAST = 10                  # H4 ranging check: SMA distance vs average range
+RANGE_SMA_SLOW = 30
+RANGE_RATIO = 0.25
+PIN_BAR_BODY_RATIO = 0.25            # M15 pin bar: body below this fraction of the range
+SCORE_VOLATILITY_WEIGHT = 0.5
+SCORE_SENTIMENT_WEIGHT = 0.3
+SCORE_ORDER_BLOCK_BONUS = 0.2
+SCORE_SR_BONUS = 0.2
+SCORE_TREND_STRENGTH_WEIGHT = 0.4
+
+# === Bot Workers ===
+# "thread" runs every bot inside this process; "process" gives each account
+# its own worker process and MT5 terminal session (see bot_supervisor.py)
+BOT_WORKER_MODE = os.getenv("BOT_WORKER_MODE", "thread").strip().lower()
+MAX_WORKERS_PER_HOST = int(os.getenv("MAX_WORKERS_PER_HOST", os.cpu_count() or 4))
+WORKER_RESTART_BACKOFF_INITIAL = 5    # seconds before the first restart
+WORKER_RESTART_BACKOFF_MAX = 300      # backoff doubles up to this cap
+WORKER_HEALTHY_RESET_SECONDS = 600    # uptime after which backoff resets
+
+# === MT5 Heartbeat ===
+# A background thread per bot session probes the terminal and caches the
+# result; trading loops read the cached state instead of probing themselves
+HEARTBEAT_INTERVAL_SECONDS = 5
+HEARTBEAT_STALE_SECONDS = 30          # a state older than this counts as unhealthy
+RECONNECT_BACKOFF_INITIAL = 1         # seconds before the first reconnect attempt
+RECONNECT_BACKOFF_MAX = 60            # doubles (with jitter) up to this cap
+
+# === Shared Signals ===
+# When enabled, one hub computes each symbol's signal once per bar and every
+# user bot reads it instead of running decide_trade itself (see signal_hub.py)
+SHARED_SIGNALS = os.getenv("SHARED_SIGNALS", "false").strip().lower() == "true"
+SIGNAL_HUB_POLL_SECONDS = 5
+SIGNAL_BAR_SECONDS = 900  # M15, the finest timeframe decide_trade reads
+
+# === Bar Store ===
+# Local memory-mapped bar history, delta-synced from MT5 (see bar_store.py)
+BAR_STORE_ENABLED = os.getenv("BAR_STORE_ENABLED", "false").strip().lower() == "true"
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join("data", "bars"))
+BAR_STORE_INITIAL_BARS = 5000
+BAR_STORE_MIN_SYNC_SECONDS = 1  # repeated reads within a cycle reuse the last sync
+
+# === Tick Store ===
+# Per-symbol tick ring buffers with rolling spread stats (see tick_store.py)
+TICK_STORE_ENABLED = os.getenv("TICK_STORE_ENABLED", "false").strip().lower() == "true"
+TICK_BUFFER_SIZE = 20000          # ticks kept per symbol
+TICK_LOOKBACK_SECONDS = 600       # history loaded on first sync or after a pause
+TICK_RATE_WINDOW_SECONDS = 60
+TICK_STORE_MIN_SYNC_SECONDS = 1
+
+# === Order Execution ===
+ORDER_MAX_RETRIES = 3               # resends after a requote / price change
+ORDER_RETRY_DELAY_SECONDS = 0.2
+ORDER_DEVIATION_POINTS = 10
+ORDER_RESULT_TIMEOUT_SECONDS = 30   # how long callers wait on the account's order queue
+
+# === Position Management ===
+# Batch trailing stops / scale-ins over open bot positions (see position_manager.py)
+POSITION_MANAGER_ENABLED = os.getenv("POSITION_MANAGER_ENABLED", "false").strip().lower() == "true"
+POSITION_MANAGER_INTERVAL_SECONDS = 5  # own cadence, independent of the 30s scan cycle
+TRAIL_TRIGGER_PCT = 0.01           # move SL once price is 1% in profit
+SLTP_MIN_INTERVAL_SECONDS = 30     # at most one SL modification per position per interval
+SCALE_IN_ENABLED = False
+SCALE_IN_TRIGGER_PCT = 0.005
+SCALE_IN_FACTOR = 1.5              # scale to 1.5x volume, capped by MAX_LOT_SIZE
+
+# === Market Structure ===
+STRUCTURE_SWING_BARS = 2             # bars on each side of a swing high/low
+STRUCTURE_HISTORY_BARS = 5000        # bars scanned on the first build
+STRUCTURE_MIN_UPDATE_SECONDS = 30    # how often the index checks for new closed bars
+
+# === Support / Resistance ===
+# Clustered swing levels for TP placement and scoring (see sr_levels.py)
+SR_INDEX_ENABLED = os.getenv("SR_INDEX_ENABLED", "false").strip().lower() == "true"
+SR_CLUSTER_RANGE_FRACTION = 0.5      # level bin width as a fraction of the average bar range
+SR_MIN_TOUCHES = 3
+SR_WIDTH_DRIFT = 0.2                 # rebuild levels once the average bar range moves 20% from the bin width
+
+# === Resampling ===
+# Build H1/H4/D1/W1 locally from one base series per symbol (see resampler.py)
+RESAMPLE_ENABLED = os.getenv("RESAMPLE_ENABLED", "false").strip().lower() == "true"
+RESAMPLE_BASE_TIMEFRAME = "M15"      # finest timeframe the strategy reads
+RESAMPLE_BASE_BARS = 4 * (STRUCTURE_HISTORY_BARS + 2)  # M15 bars for the H1 structure history (and 20 W1 bars)
+RESAMPLE_DAY_OFFSET_HOURS = 0        # server hour at which the broker's D1 bar opens
+RESAMPLE_MIN_REFRESH_SECONDS = 1
+
+# === Filter Pipeline ===
+# Order decision filters by measured cost per rejection, per symbol (see filter_pipeline.py)
+FILTER_ADAPTIVE_ORDER = os.getenv("FILTER_ADAPTIVE_ORDER", "false").strip().lower() == "true"
+FILTER_STATS_ALPHA = 0.1             # weight of the newest sample in the cost/reject averages
+FILTER_EXPLORE_EVERY = 20            # every Nth decision runs all filters to refresh their stats
+
+# === Decision Memo ===
+# Reuse bar-based decision inputs until a new bar opens (see decision_memo.py)
+DECISION_MEMO_ENABLED = os.getenv("DECISION_MEMO_ENABLED", "false").strip().lower() == "true"
+DECISION_MEMO_TICK_SECONDS = 1       # how long one tick time keys the memo lookups
+
+# === Correlation ===
+# Rolling returns correlation for picking several trades at once (see correlation.py)
+CORRELATION_TIMEFRAME = "H1"
+CORRELATION_WINDOW_BARS = 500        # bars of returns in the rolling window
+CORRELATION_CAP = 0.7                # skip a trade that adds to exposure correlated above this
+CORRELATION_MIN_UPDATE_SECONDS = 60
+
+# === Optimizer ===
+# Parameter sweeps over the bar-store backtester (see backtester.py / optimizer.py)
+BACKTEST_MAX_HOLD_BARS = 960         # M15 bars (10 days) before a trade is closed at market
+OPTIMIZER_HISTORY_BARS = 50000       # M15 bars per symbol loaded for a sweep
+OPTIMIZER_OOS_FRACTION = 0.3         # most recent share of history held out for validation
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", os.cpu_count() or 4))
+OPTIMIZER_RESULTS_DIR = os.path.join("reports", "optimizer")
+
+# === Runtime Settings ===
+# JSON file of setting overrides applied without a restart (see settings.py)
+CONFIG_OVERRIDES_FILE = os.getenv("CONFIG_OVERRIDES_FILE", "config_overrides.json")
+CONFIG_HOT_RELOAD = os.getenv("CONFIG_HOT_RELOAD", "false").strip().lower() == "true"
+CONFIG_RELOAD_SECONDS = 2            # how often the watcher checks the file
+
+# === News Sentiment ===
+NEWS_SENTIMENT_CACHE_SECONDS = 900   # reuse a symbol's sentiment for this long
+NEWS_BLACKOUT_CACHE_SECONDS = 60    # the blackout check only reuses a sentiment this fresh
+
+# === Economic Calendar ===
+# News blackout from a local scheduled-events feed instead of a per-symbol HTTP call (see economic_calendar.py)
+NEWS_CALENDAR_ENABLED = os.getenv("NEWS_CALENDAR_ENABLED", "false").strip().lower() == "true"
+NEWS_CALENDAR_FILE = os.getenv("NEWS_CALENDAR_FILE", os.path.join("data", "economic_calendar.csv"))  # .csv, .json or .ics
+NEWS_CALENDAR_URL = os.getenv("NEWS_CALENDAR_URL", "")  # optional: the refresh job downloads the feed from here
+NEWS_CALENDAR_REFRESH_SECONDS = 300  # how often the refresh job runs (0 = load once)
+NEWS_BLACKOUT_IMPACTS = ("high",)    # event impact levels that black out their currencies
+NEWS_BLACKOUT_BEFORE_MINUTES = 30
+NEWS_BLACKOUT_AFTER_MINUTES = 30
+
+# === Warm Start ===
+# Snapshot runtime caches to disk and resume from them after a restart (see warm_start.py)
+WARM_START_ENABLED = os.getenv("WARM_START_ENABLED", "false").strip().lower() == "true"
+WARM_START_DIR = os.getenv("WARM_START_DIR", os.path.join("data", "warm"))
+WARM_START_SAVE_SECONDS = 300        # periodic snapshot while running
+WARM_START_MAX_AGE_SECONDS = 12 * 3600  # older snapshots are ignored
+WARM_START_KEEP = 2                  # snapshot generations kept per account
+
+# === Log Storage ===
+# Rotated, compressed log segments with per-user retention (see log_store.py)
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_SEGMENT_MAX_BYTES = 16 * 1024 * 1024  # rotate the active log at this size...
+LOG_SEGMENT_MAX_SECONDS = 24 * 3600  # ...or when its first line is this old
+LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "gzip")  # gzip or zstd (zstd needs the zstandard package)
+LOG_MAINTENANCE_SECONDS = 60         # how often closed segments are compressed and pruned
+# Retention per log: user email (or "bot" for bot.log) -> {"days", "max_mb"}; "*" is the default
+LOG_RETENTION = {
+    "*": {"days": 14, "max_mb": 500},
+}
+# Log only scan-result changes, fold repeats into periodic summaries and sample debug details (see log_coalesce.py)
+LOG_COALESCE = os.getenv("LOG_COALESCE", "false").strip().lower() == "true"
+LOG_SUMMARY_SECONDS = 900            # one summary line of folded repeats per window
+LOG_SAMPLE_EVERY = 20                # sampled debug messages: emit 1 in this many
+
+# === Log Index ===
+# Full-text search over the user logs in SQLite FTS5 (see log_index.py)
+LOG_INDEX_ENABLED = os.getenv("LOG_INDEX_ENABLED", "false").strip().lower() == "true"
+LOG_INDEX_PATH = os.getenv("LOG_INDEX_PATH", os.path.join("data", "log_index.sqlite"))
+LOG_INDEX_SECONDS = 30               # how often the background indexer tails the logs
+LOG_INDEX_CATCHUP_BYTES = 256 * 1024  # a search indexes at most this much new log itself
+LOG_SEARCH_MAX_RESULTS = 200         # cap on lines returned per search
+
 # === Secure Keys and API Tokens ===
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "your-telegram-bot-token")
@@ -43,8 +210,21 @@ TRADING_SESSIONS = {
     "Asia": {"start": 23, "end": 6}
 }
 
+# Per-symbol session names (symbol prefix -> list of TRADING_SESSIONS keys); others use all sessions
+SYMBOL_SESSIONS = {}
+# Market holidays (UTC dates): "YYYY-MM-DD" -> symbol prefixes closed that day, or ["*"] for all but crypto.
+# None ship here, since fixed dates go stale: list them in MARKET_HOLIDAYS_FILE, same format, e.g.
+# {"2026-12-25": ["*"], "2026-11-26": ["US30", "NAS100"]}. Entries here (or overrides) win for the same date.
+# The shipped data/market_holidays.json only has the weekday Christmas/New Year closures through 2027-01-01;
+# add index and later-year holidays there.
+MARKET_HOLIDAYS = {}
+MARKET_HOLIDAYS_FILE = os.getenv("MARKET_HOLIDAYS_FILE", os.path.join("data", "market_holidays.json"))
+
 # === Flags ===
 IGNORE_SPREAD_CHECK = os.getenv("IGNORE_SPREAD_CHECK", "false").strip().lower() == "true"
+IGNORE_MARKET_HOURS = os.getenv("IGNORE_MARKET_HOURS", "false").strip().lower() == "true"  # scan closed markets too
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").strip().lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # Bearer token for /metrics; unset = /metrics disabled (404)
 
 # === Debug Output (Optional) ===
 if __name__ == "__main__":
@@ -56,3 +236,4 @@ if __name__ == "__main__":
     print("👑 FOUNDER_EMAIL:", FOUNDER_EMAIL)
     print("💬 FOUNDER_TELEGRAM_USERNAME:", FOUNDER_TELEGRAM_USERNAME)
     print("⚙️ IGNORE_SPREAD_CHECK:", IGNORE_SPREAD_CHECK)
+    print("📈 METRICS_ENABLED:", METRICS_ENABLED)
@@ -0,0 +1,31 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Tests run against the local MT5 stand-in the benchmarks use
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+import fake_mt5  # noqa: E402
+
+fake_mt5.install()
+
+
+@pytest.fixture
+def terminal():
+    """A fresh fake MT5 terminal (Monday 2025-07-07 12:00 UTC) for one test."""
+    return fake_mt5.install(fake_mt5.FakeTerminal(symbols=["EURUSD", "GBPUSD", "USDJPY", "EURJPY"]))
+
+
+@pytest.fixture
+def overrides(tmp_path):
+    """Apply runtime setting overrides for one test: overrides(NAME=value, ...)."""
+    import settings
+    path = tmp_path / "overrides.json"
+
+    def apply(**values):
+        path.write_text(json.dumps(values))
+        assert settings.reload(str(path))
+
+    yield apply
+    settings.reload(str(tmp_path / "none.json"))
@@ -0,0 +1,304 @@
+"""
+Rolling cross-symbol returns correlation and correlation-aware selection.
+
+Log returns of closed bars (CORRELATION_TIMEFRAME) are kept in a ring
+buffer of CORRELATION_WINDOW_BARS rows, one column per symbol. Alongside
+it the tracker keeps the column sums and the cross-product matrix R'R.
+Each new bar adds its row's outer product and subtracts the evicted
+row's, so an update is O(n^2) for n symbols instead of recomputing the
+matrix over the whole window. The sums are recomputed from the buffer
+once per full window to stop floating-point drift.
+
+Bars are aligned on time: a symbol without a bar at some time (a closed
+market, a missing quote) contributes a zero return there.
+
+select_top_k picks the best candidates by score with a heap, skipping any
+candidate whose direction-adjusted correlation with an open position or an
+already picked candidate exceeds CORRELATION_CAP.
+"""
+import heapq
+import threading
+import time
+
+import numpy as np
+import MetaTrader5 as mt5
+
+try:
+    from config import (
+        CORRELATION_TIMEFRAME,
+        CORRELATION_WINDOW_BARS,
+        CORRELATION_MIN_UPDATE_SECONDS,
+    )
+    import settings
+    from technicals import get_candles
+    from bar_store import TIMEFRAMES
+except ImportError:
+    from backend.config import (
+        CORRELATION_TIMEFRAME,
+        CORRELATION_WINDOW_BARS,
+        CORRELATION_MIN_UPDATE_SECONDS,
+    )
+    from backend import settings
+    from backend.technicals import get_candles
+    from backend.bar_store import TIMEFRAMES
+
+UPDATE_BARS = 5  # closed bars fetched per symbol on each incremental update
+
+TIMEFRAME_BY_NAME = {name: tf for tf, (name, _) in TIMEFRAMES.items()}
+
+
+def _closed(candles):
+    """Drop the forming bar."""
+    return candles[:-1] if len(candles) else candles
+
+
+class ReturnsCorrelation:
+    """
+    Rolling returns correlation across a set of symbols on one timeframe.
+    """
+
+    def __init__(self, timeframe=None, window=CORRELATION_WINDOW_BARS):
+        self.timeframe = timeframe or TIMEFRAME_BY_NAME[CORRELATION_TIMEFRAME]
+        self.window = window
+        self.symbols = []
+        self.index = {}
+        self.last_time = 0
+        self._reset(0)
+        self._next_update = 0.0
+        self._lock = threading.RLock()
+
+    def _reset(self, n):
+        self._ring = np.zeros((self.window, n))
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._last_close = np.full(n, np.nan)
+        self._head = 0
+        self._filled = 0
+        self._corr = None
+
+    # --- Building ---
+    def _fetch(self, count):
+        """Closed bars per symbol as {symbol: (times, closes)}."""
+        bars = {}
+        for symbol in self.symbols:
+            candles = _closed(get_candles(symbol, self.timeframe, count + 1))
+            if len(candles):
+                bars[symbol] = (np.asarray(candles["time"], dtype=np.int64),
+                                np.asarray(candles["close"], dtype=float))
+        return bars
+
+    def _aligned_closes(self, bars, grid):
+        """Closes per (grid time, symbol), NaN where the symbol has no bar at that time."""
+        closes = np.full((len(grid), len(self.symbols)), np.nan)
+        for symbol, (times, values) in bars.items():
+            pos = np.searchsorted(times, grid)
+            pos = np.minimum(pos, len(times) - 1)
+            hit = times[pos] == grid
+            closes[hit, self.index[symbol]] = values[pos[hit]]
+        return closes
+
+    def _returns(self, closes, previous):
+        """Log returns of aligned closes, carrying each symbol's last close across gaps."""
+        rows = np.zeros_like(closes)
+        last = previous.copy()
+        for r, row in enumerate(closes):
+            seen = ~np.isnan(row)
+            valid = seen & ~np.isnan(last) & (last > 0) & (row > 0)
+            rows[r, valid] = np.log(row[valid] / last[valid])
+            last[seen] = row[seen]
+        return rows, last
+
+    def build(self, symbols):
+        """Load the full window for `symbols` and compute the sums from scratch."""
+        with self._lock:
+            self.symbols = list(dict.fromkeys(symbols))
+            self.index = {s: i for i, s in enumerate(self.symbols)}
+            self._reset(len(self.symbols))
+            self.last_time = 0
+
+            bars = self._fetch(self.window + 1)
+            if not bars:
+                return
+            grid = np.unique(np.concatenate([times for times, _ in bars.values()]))[-(self.window + 1):]
+            closes = self._aligned_closes(bars, grid)
+            rows, self._last_close = self._returns(closes[1:], closes[0])
+
+            n = len(rows)
+            self._ring[:n] = rows
+            self._filled = n
+            self._head = n % self.window
+            self._resum()
+            self.last_time = int(grid[-1])
+
+    def _resum(self):
+        rows = self._ring[:self._filled] if self._filled < self.window else self._ring
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+        self._corr = None
+
+    # --- Incremental path ---
+    def _push(self, row):
+        """Add one bar of returns, evicting the oldest once the window is full."""
+        old = self._ring[self._head]
+        self._sum += row - old
+        self._cross += np.outer(row, row) - np.outer(old, old)
+        self._ring[self._head] = row
+        self._head = (self._head + 1) % self.window
+        self._filled = min(self._filled + 1, self.window)
+        self._corr = None
+        if self._head == 0:
+            self._resum()
+
+    def update(self, symbols=(), force=False):
+        """Track any new symbols (full rebuild) and append newly closed bars."""
+        with self._lock:
+            missing = [s for s in symbols if s not in self.index]
+            if missing:
+                self.build(self.symbols + missing)
+                self._next_update = time.time() + CORRELATION_MIN_UPDATE_SECONDS
+                return
+
+            now = time.time()
+            if not self.symbols or (not force and now < self._next_update):
+                return
+            self._next_update = now + CORRELATION_MIN_UPDATE_SECONDS
+
+            bars = self._fetch(UPDATE_BARS)
+            if not bars:
+                return
+            grid = np.unique(np.concatenate([times for times, _ in bars.values()]))
+            grid = grid[grid > self.last_time]
+            if not len(grid):
+                return
+            step = TIMEFRAMES[self.timeframe][1]
+            if len(grid) >= UPDATE_BARS and grid[0] > self.last_time + step:
+                # Possibly missed bars: reload the window
+                self.build(self.symbols)
+                return
+
+            rows, self._last_close = self._returns(self._aligned_closes(bars, grid), self._last_close)
+            for row in rows:
+                self._push(row)
+            self.last_time = int(grid[-1])
+
+    # --- Warm start ---
+    def export_state(self):
+        """(arrays, meta) holding everything update() needs to carry on."""
+        with self._lock:
+            arrays = {"ring": self._ring, "sum": self._sum, "cross": self._cross, "last_close": self._last_close}
+            meta = {"timeframe": self.timeframe, "window": self.window, "symbols": self.symbols,
+                    "last_time": self.last_time, "head": self._head, "filled": self._filled}
+            return arrays, meta
+
+    def restore_state(self, arrays, meta):
+        """Install exported state (copied: the update path writes in place). False on a settings mismatch."""
+        if meta["timeframe"] != self.timeframe or meta["window"] != self.window:
+            return False
+        with self._lock:
+            self.symbols = list(meta["symbols"])
+            self.index = {s: i for i, s in enumerate(self.symbols)}
+            self._reset(len(self.symbols))
+            self._ring[...] = arrays["ring"]
+            self._sum[...] = arrays["sum"]
+            self._cross[...] = arrays["cross"]
+            self._last_close[...] = arrays["last_close"]
+            self._head, self._filled = meta["head"], meta["filled"]
+            self.last_time = meta["last_time"]
+            self._next_update = 0.0
+        return True
+
+    # --- Queries ---
+    def matrix(self):
+        """Correlation matrix in self.symbols order (0 where a symbol had no movement)."""
+        with self._lock:
+            if self._corr is None:
+                n = max(self._filled, 1)
+                mean = self._sum / n
+                cov = self._cross / n - np.outer(mean, mean)
+                std = np.sqrt(np.clip(np.diag(cov), 0, None))
+                denom = np.outer(std, std)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    corr = np.where(denom > 0, cov / denom, 0.0)
+                self._corr = np.clip(corr, -1.0, 1.0)
+            return self._corr
+
+    def correlation(self, a, b):
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None:
+            return 0.0
+        return 1.0 if i == j else float(self.matrix()[i, j])
+
+
+def select_top_k(candidates, k, held=(), cap=None, tracker=None):
+    """
+    Pick up to `k` candidates by score, skipping correlated exposure.
+
+    `candidates` are (score, symbol, direction, item) with direction +1 for
+    buy and -1 for sell; `held` are (symbol, direction) of open positions.
+    A candidate is skipped when, for any held or already picked position,
+    correlation * direction * other_direction exceeds `cap`, i.e. it would
+    add to the same exposure rather than hedge it (default CORRELATION_CAP).
+    Returns the picked items, best first.
+    """
+    if k <= 0:
+        return []
+    if cap is None:
+        cap = settings.current().CORRELATION_CAP
+    heap = [(-score, n, symbol, direction, item)
+            for n, (score, symbol, direction, item) in enumerate(candidates)]
+    if not heap:
+        return []
+    if tracker is None:
+        tracker = get_correlation([c[2] for c in heap] + [s for s, _ in held])
+    heapq.heapify(heap)
+
+    taken = list(held)
+    picked = []
+    while heap and len(picked) < k:
+        _, _, symbol, direction, item = heapq.heappop(heap)
+        if any(tracker.correlation(symbol, other) * direction * other_direction > cap
+               for other, other_direction in taken):
+            continue
+        taken.append((symbol, direction))
+        picked.append(item)
+    return picked
+
+
+def direction_of(order_type):
+    """+1 for buys, -1 for sells (accepts "buy"/"sell" or an MT5 position type)."""
+    if isinstance(order_type, str):
+        return 1 if order_type.lower() == "buy" else -1
+    return 1 if order_type == mt5.POSITION_TYPE_BUY else -1
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def current_tracker():
+    """The shared tracker if one was created, without updating it."""
+    return _tracker
+
+
+def restore_tracker(arrays, meta):
+    """Install a warm-start snapshot as the shared tracker unless one already exists."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is not None:
+            return False
+        tracker = ReturnsCorrelation()
+        if not tracker.restore_state(arrays, meta):
+            return False
+        _tracker = tracker
+    return True
+
+
+def get_correlation(symbols=()):
+    """Return the shared tracker, updated (throttled) and covering `symbols`."""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = ReturnsCorrelation()
+    _tracker.update(symbols)
+    return _tracker
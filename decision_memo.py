@@ -0,0 +1,109 @@
+"""
+Per-bar memoization for decision inputs.
+
+Bar-based analysis only changes when a new bar opens on a timeframe it
+reads. @per_bar(timeframes) caches a function's result per (symbol,
+arguments) under a key made of the current bar's open time on each of
+those timeframes plus the settings snapshot version, so the closed bars
+behind a W1/D1 trend vote are fetched once per week/day. Tick-dependent
+parts (entry price, spread) are not memoized.
+
+The current bar comes from the latest tick's server time: MT5 opens a bar
+on its first tick, so flooring the last tick time to the timeframe gives
+the open time of the newest bar without fetching any bars. Buckets follow
+the same server-time rules as resampler.py. The tick time is reused for
+up to DECISION_MEMO_TICK_SECONDS across the calls of one decision.
+
+A memoized result is frozen at its first evaluation in the bar, so only
+functions of closed bars should be memoized. Readers of the forming bar
+(technicals.py) memoize what they derive from the closed bars and fold
+latest_tick() into the forming bar instead of fetching it again.
+Disabled (DECISION_MEMO_ENABLED false), the decorator returns the function
+unchanged.
+"""
+import functools
+import time
+
+try:
+    import settings
+    from config import DECISION_MEMO_ENABLED, DECISION_MEMO_TICK_SECONDS, RESAMPLE_DAY_OFFSET_HOURS
+    from bar_store import TIMEFRAMES
+    from resampler import bucket_starts
+    from tick_store import current_tick
+    from metrics import count
+except ImportError:
+    from backend import settings
+    from backend.config import DECISION_MEMO_ENABLED, DECISION_MEMO_TICK_SECONDS, RESAMPLE_DAY_OFFSET_HOURS
+    from backend.bar_store import TIMEFRAMES
+    from backend.resampler import bucket_starts
+    from backend.tick_store import current_tick
+    from backend.metrics import count
+
+DAY_OFFSET = int(RESAMPLE_DAY_OFFSET_HOURS * 3600)
+
+_ticks = {}  # symbol -> (last tick, monotonic time it was read)
+
+
+def note_tick(symbol, tick):
+    """Record a tick the caller already fetched, so the memo keys don't fetch another."""
+    if tick:
+        _ticks[symbol] = (tick, time.monotonic())
+
+
+def latest_tick(symbol):
+    """The symbol's latest tick (reused for DECISION_MEMO_TICK_SECONDS), or None."""
+    noted = _ticks.get(symbol)
+    if noted and time.monotonic() - noted[1] <= DECISION_MEMO_TICK_SECONDS:
+        return noted[0]
+    tick = current_tick(symbol)
+    if not tick:
+        return None
+    note_tick(symbol, tick)
+    return tick
+
+
+def server_time(symbol):
+    """The symbol's latest tick time (server clock), or None without a tick."""
+    tick = latest_tick(symbol)
+    return int(tick.time) if tick else None
+
+
+def bar_key(symbol, timeframe, now=None):
+    """Open time of the symbol's current bar on `timeframe`."""
+    now = server_time(symbol) if now is None else now
+    if now is None:
+        return None
+    return int(bucket_starts(now, TIMEFRAMES[timeframe][1], DAY_OFFSET))
+
+
+def per_bar(timeframes):
+    """
+    Memoize fn(symbol, *args, **kwargs) until a new bar opens on any of
+    `timeframes` (a tuple, or a callable taking the call's arguments and
+    returning one) or the settings snapshot changes.
+    """
+    def decorate(fn):
+        if not DECISION_MEMO_ENABLED:
+            return fn
+        cache = {}
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(symbol, *args, **kwargs):
+            tfs = timeframes(symbol, *args, **kwargs) if callable(timeframes) else timeframes
+            now = server_time(symbol) if tfs else 0
+            if now is None:
+                return fn(symbol, *args, **kwargs)  # no tick to key on: don't cache
+            key = (settings.current().version, *(bar_key(symbol, tf, now) for tf in tfs))
+            call = (symbol, args, tuple(sorted(kwargs.items())))
+            hit = cache.get(call)
+            if hit is not None and hit[0] == key:
+                count(f"memo_hit_{name}", symbol)
+                return hit[1]
+            value = fn(symbol, *args, **kwargs)
+            cache[call] = (key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+    return decorate
@@ -0,0 +1,326 @@
+"""
+Local economic-calendar index for news blackout windows.
+
+Scheduled events are read from a local feed file (NEWS_CALENDAR_FILE:
+.csv, .json or .ics). Events at the configured impact levels become
+blackout windows (NEWS_BLACKOUT_BEFORE/AFTER_MINUTES around the event),
+merged per currency into sorted, non-overlapping intervals. A blackout
+check maps the symbol to its currencies and binary-searches each one's
+intervals: no network and no file access on the hot path.
+
+Feed fields (CSV header / JSON keys): time (ISO 8601, UTC if no offset, or
+Unix seconds), currency, impact, title. ICS events use DTSTART, SUMMARY,
+and X-CURRENCY / X-IMPACT (falling back to CATEGORIES / PRIORITY, or a
+"USD: ..." summary prefix). A DTSTART;TZID=... local time is converted with
+zoneinfo; events whose TZID can't be resolved are skipped and logged rather
+than guessed as UTC.
+
+The refresh job reloads the file when it changes and, if NEWS_CALENDAR_URL
+is set, first downloads the feed to the file. Each load builds a new index
+and swaps it in, so lookups never see a half-built one. The first download
+also runs on the refresh thread: until it lands, the index is empty.
+"""
+import bisect
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+try:
+    from config import (
+        NEWS_CALENDAR_FILE,
+        NEWS_CALENDAR_URL,
+        NEWS_CALENDAR_REFRESH_SECONDS,
+        NEWS_BLACKOUT_IMPACTS,
+        NEWS_BLACKOUT_BEFORE_MINUTES,
+        NEWS_BLACKOUT_AFTER_MINUTES,
+    )
+    from utils import log
+except ImportError:
+    from backend.config import (
+        NEWS_CALENDAR_FILE,
+        NEWS_CALENDAR_URL,
+        NEWS_CALENDAR_REFRESH_SECONDS,
+        NEWS_BLACKOUT_IMPACTS,
+        NEWS_BLACKOUT_BEFORE_MINUTES,
+        NEWS_BLACKOUT_AFTER_MINUTES,
+    )
+    from backend.utils import log
+
+CURRENCIES = {"USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "NZD", "CNY", "XAU", "XAG", "BTC", "ETH"}
+
+# Non-FX symbols by prefix -> the currencies whose news moves them
+SYMBOL_CURRENCIES = {
+    "US30": ("USD",), "NAS100": ("USD",), "SPX500": ("USD",), "USOIL": ("USD",), "UKOIL": ("USD",),
+    "GER40": ("EUR",), "DE40": ("EUR",), "UK100": ("GBP",), "JP225": ("JPY",),
+}
+
+ICS_PRIORITY_IMPACT = {"1": "high", "2": "high", "3": "high", "4": "medium", "5": "medium"}
+
+
+def symbol_currencies(symbol):
+    """Currencies a symbol is exposed to: "EURUSD.m" -> ("EUR", "USD"), "US30" -> ("USD",)."""
+    name = symbol.upper()
+    for prefix, currencies in SYMBOL_CURRENCIES.items():
+        if name.startswith(prefix):
+            return currencies
+    base, quote = name[:3], name[3:6]
+    return tuple(c for c in (base, quote) if c in CURRENCIES)
+
+
+# --- Feed parsing ---
+def _parse_time(value, tz=None):
+    """Unix seconds from ISO 8601, ICS basic format or a number. Naive times are in `tz` (default UTC)."""
+    value = str(value).strip()
+    if value[:8].isdigit() and (len(value) == 8 or value[8:9] == "T"):
+        # ICS: 20261020T123000Z / 20261020T123000 / 20261020
+        fmt = "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d"
+        dt = datetime.strptime(value.rstrip("Z"), fmt)
+    else:
+        try:
+            return float(value)
+        except ValueError:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz or timezone.utc)
+    return dt.timestamp()
+
+
+def _event(time_value, currency, impact, title="", tz=None):
+    return {"time": _parse_time(time_value, tz), "currency": str(currency).strip().upper(),
+            "impact": str(impact).strip().lower(), "title": str(title).strip()}
+
+
+def _read_csv(f):
+    return [_event(r["time"], r["currency"], r.get("impact", ""), r.get("title", "")) for r in csv.DictReader(f)]
+
+
+def _read_json(f):
+    data = json.load(f)
+    events = data.get("events", []) if isinstance(data, dict) else data
+    return [_event(e["time"], e["currency"], e.get("impact", ""), e.get("title", "")) for e in events]
+
+
+def _read_ics(f):
+    # Unfold continuation lines, then collect the fields of each VEVENT
+    lines = []
+    for raw in f.read().splitlines():
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        else:
+            lines.append(raw)
+
+    events, fields, unresolved = [], None, {}
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            fields, params = {}, {}
+        elif line == "END:VEVENT" and fields is not None:
+            summary = fields.get("SUMMARY", "")
+            currency = fields.get("X-CURRENCY") or fields.get("CATEGORIES", "").split(",")[0]
+            if not currency and summary[:3].upper() in CURRENCIES:
+                currency = summary[:3]
+            impact = fields.get("X-IMPACT") or ICS_PRIORITY_IMPACT.get(fields.get("PRIORITY", ""), "")
+            if "DTSTART" in fields and currency:
+                # A local time in its TZID; a trailing Z (UTC) wins over a TZID
+                tzid = None if fields["DTSTART"].endswith("Z") else params.get("DTSTART", {}).get("TZID")
+                tz = _zone(tzid) if tzid else None
+                if tzid and tz is None:
+                    unresolved[tzid] = unresolved.get(tzid, 0) + 1
+                else:
+                    events.append(_event(fields["DTSTART"], currency, impact, summary, tz))
+            fields = None
+        elif fields is not None and ":" in line:
+            name, value = line.split(":", 1)
+            name, *rest = name.split(";")
+            fields[name.upper()] = value
+            params[name.upper()] = dict(p.split("=", 1) for p in rest if "=" in p)
+    for tzid, skipped in unresolved.items():
+        log(f"⚠️ Economic calendar: skipped {skipped} events in unknown time zone {tzid!r}")
+    return events
+
+
+def _zone(tzid):
+    """ZoneInfo for an ICS TZID (quotes stripped), or None if it can't be resolved."""
+    try:
+        return ZoneInfo(tzid.strip('"'))
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+READERS = {".csv": _read_csv, ".json": _read_json, ".ics": _read_ics}
+
+
+def read_feed(path):
+    """All events in a feed file, as dicts with time (Unix seconds), currency, impact and title."""
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError(f"Unsupported calendar feed format: {path}")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return reader(f)
+
+
+# --- Index ---
+class BlackoutIndex:
+    """
+    Merged blackout intervals per currency, immutable once built.
+    """
+
+    def __init__(self, events, impacts=NEWS_BLACKOUT_IMPACTS,
+                 before=NEWS_BLACKOUT_BEFORE_MINUTES * 60, after=NEWS_BLACKOUT_AFTER_MINUTES * 60):
+        impacts = {i.lower() for i in impacts}
+        windows = {}
+        for e in events:
+            if e["impact"] in impacts:
+                windows.setdefault(e["currency"], []).append((e["time"] - before, e["time"] + after, e["title"]))
+
+        self._starts, self._ends, self._titles = {}, {}, {}
+        for currency, spans in windows.items():
+            spans.sort()
+            starts, ends, titles = [], [], []
+            for start, end, title in spans:
+                if starts and start <= ends[-1]:
+                    if end > ends[-1]:
+                        ends[-1] = end
+                    titles[-1] += f", {title}"
+                else:
+                    starts.append(start)
+                    ends.append(end)
+                    titles.append(title)
+            self._starts[currency], self._ends[currency], self._titles[currency] = starts, ends, titles
+        self.events = sum(1 for e in events if e["impact"] in impacts)
+
+    def window(self, currency, now):
+        """(start, end, titles) of the blackout covering `now` for `currency`, or None."""
+        starts = self._starts.get(currency)
+        if not starts:
+            return None
+        i = bisect.bisect_right(starts, now) - 1
+        if i >= 0 and now < self._ends[currency][i]:
+            return starts[i], self._ends[currency][i], self._titles[currency][i]
+        return None
+
+    def blackout(self, symbol, now=None):
+        """The window blacking out `symbol` at `now` (default: now), or None."""
+        now = time.time() if now is None else now
+        for currency in symbol_currencies(symbol):
+            window = self.window(currency, now)
+            if window:
+                return window
+        return None
+
+
+class EconomicCalendar:
+    """
+    The current BlackoutIndex for a feed file, reloaded when the file changes.
+    """
+
+    def __init__(self, path=NEWS_CALENDAR_FILE, url=NEWS_CALENDAR_URL):
+        self.path = path
+        self.url = url
+        self.index = BlackoutIndex([])
+        self.loaded_at = None
+        self._state = None
+        self._lock = threading.Lock()
+        self._refresher = None
+
+    def _file_state(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def reload(self, force=False):
+        """Rebuild the index if the feed file changed. Keeps the old index if the file is unreadable."""
+        with self._lock:
+            state = self._file_state()
+            if state is None or (state == self._state and not force):
+                return False
+            try:
+                index = BlackoutIndex(read_feed(self.path))
+            except (OSError, ValueError, KeyError) as e:
+                log(f"⚠️ Economic calendar not reloaded: {e}")
+                return False
+            self.index = index  # single reference swap
+            self._state = state
+            self.loaded_at = time.time()
+        log(f"🗓️ Economic calendar loaded: {index.events} blackout events from {self.path}")
+        return True
+
+    def download(self):
+        """Fetch the feed from `url` into the local file (atomically)."""
+        import requests  # only the refresh job touches the network
+
+        response = requests.get(self.url, timeout=30)
+        response.raise_for_status()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp, self.path)
+
+    def refresh(self):
+        """One refresh job run: download if a URL is configured, then reload if the file changed."""
+        if self.url:
+            try:
+                self.download()
+            except Exception as e:
+                log(f"⚠️ Economic calendar download failed, using the local file: {e}")
+        return self.reload()
+
+    def _refresh_periodically(self, interval, now=False):
+        if now:
+            self.refresh()
+        while interval:
+            time.sleep(interval)
+            self.refresh()
+
+    def start_refresher(self, interval=NEWS_CALENDAR_REFRESH_SECONDS, now=False):
+        """
+        Start the refresh job once: a first refresh straight away if `now`,
+        then one every `interval` seconds (none if 0).
+        """
+        if not interval and not now:
+            return False
+        with self._lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(target=self._refresh_periodically, args=(interval, now),
+                                                   name="economic-calendar", daemon=True)
+                self._refresher.start()
+        return True
+
+    def blackout(self, symbol, now=None):
+        return self.index.blackout(symbol, now)
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_economic_calendar():
+    """
+    Return the process-wide calendar, created on first use. A local feed
+    file is loaded right away; a feed that still has to be downloaded is
+    fetched by the refresh job, never on the caller's (hot) path.
+    """
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                calendar = EconomicCalendar()
+                download = bool(calendar.url) and calendar._file_state() is None
+                if download:
+                    log("🗓️ Economic calendar: downloading the feed in the background")
+                else:
+                    calendar.reload()
+                calendar.start_refresher(now=download)
+                _calendar = calendar
+    return _calendar
+
+
+def in_blackout(symbol, now=None):
+    """True if a scheduled high-impact event blacks out `symbol` now. In-memory only."""
+    return get_economic_calendar().blackout(symbol, now) is not None
@@ -0,0 +1,138 @@
+"""
+Decision filters with per-symbol cost and rejection statistics.
+
+A decision runs a list of filters; the first one to reject ends it. Every
+filter run is timed and its outcome recorded per (symbol, filter) as
+exponential moving averages of cost and rejection rate.
+
+With FILTER_ADAPTIVE_ORDER enabled, each run orders the filters by
+expected cost per rejection (cost / reject rate, lowest first), which
+minimizes the expected cost of the reject path for independent filters.
+A filter only becomes eligible once the filters it `requires` have passed,
+so data dependencies (sentiment needs the trend) are kept. Filters never
+measured run first, in their declared order, to get measured.
+
+Every FILTER_EXPLORE_EVERY runs per symbol the remaining filters still run
+after a rejection, so a filter that has been ordered late keeps fresh
+statistics. All filters must pass either way, so the decision itself
+doesn't depend on the order; only the first rejection is logged and
+counted.
+"""
+import time
+from collections import namedtuple
+
+try:
+    from config import FILTER_ADAPTIVE_ORDER, FILTER_STATS_ALPHA, FILTER_EXPLORE_EVERY
+    from metrics import stage, count
+    from log_coalesce import console
+except ImportError:
+    from backend.config import FILTER_ADAPTIVE_ORDER, FILTER_STATS_ALPHA, FILTER_EXPLORE_EVERY
+    from backend.metrics import stage, count
+    from backend.log_coalesce import console
+
+# check(symbol, ctx) -> truthy to pass; it may store results in ctx for later filters.
+# message, if set, is logged (formatted with symbol=..., sampled under LOG_COALESCE) when the filter rejects.
+# stage names the timing metric when it predates the filter and differs from `name` (reject_<name> either way).
+Filter = namedtuple("Filter", "name check message requires stage", defaults=((), None))
+
+MIN_REJECT_RATE = 0.01  # floor so a filter that never rejects still has a finite rank
+
+
+class _Stats:
+    __slots__ = ("runs", "cost", "reject_rate")
+
+    def __init__(self):
+        self.runs = 0
+        self.cost = 0.0
+        self.reject_rate = 0.5
+
+    def record(self, seconds, rejected, alpha):
+        if self.runs == 0:
+            self.cost = seconds
+            self.reject_rate = float(rejected)
+        else:
+            self.cost += alpha * (seconds - self.cost)
+            self.reject_rate += alpha * (rejected - self.reject_rate)
+        self.runs += 1
+
+
+class FilterPipeline:
+    """
+    Runs `filters` for a symbol, in declared or adaptive order.
+    """
+
+    def __init__(self, filters, adaptive=FILTER_ADAPTIVE_ORDER, alpha=FILTER_STATS_ALPHA,
+                 explore_every=FILTER_EXPLORE_EVERY):
+        self.filters = list(filters)
+        self.adaptive = adaptive
+        self.alpha = alpha
+        self.explore_every = explore_every
+        self._stats = {}   # symbol -> {filter name: _Stats}
+        self._runs = {}    # symbol -> decisions run
+
+    def _symbol_stats(self, symbol):
+        stats = self._stats.get(symbol)
+        if stats is None:
+            stats = self._stats[symbol] = {f.name: _Stats() for f in self.filters}
+        return stats
+
+    def order(self, symbol):
+        """The order the filters would run in for `symbol` now."""
+        if not self.adaptive:
+            return list(self.filters)
+        stats = self._symbol_stats(symbol)
+
+        def rank(item):
+            position, f = item
+            s = stats[f.name]
+            if s.runs == 0:
+                return (0, 0.0, position)
+            return (1, s.cost / max(s.reject_rate, MIN_REJECT_RATE), position)
+
+        pending = sorted(enumerate(self.filters), key=rank)
+        ordered, done = [], set()
+        while pending:
+            # Cheapest-per-rejection filter whose requirements have already run
+            for i, (_, f) in enumerate(pending):
+                if all(r in done for r in f.requires):
+                    break
+            else:
+                raise ValueError(f"Unsatisfiable filter requirements: {[f.name for _, f in pending]}")
+            ordered.append(f)
+            done.add(f.name)
+            del pending[i]
+        return ordered
+
+    def run(self, symbol, ctx):
+        """Run the filters. Returns (passed, name of the first rejecting filter or None)."""
+        stats = self._symbol_stats(symbol)
+        runs = self._runs[symbol] = self._runs.get(symbol, 0) + 1
+        explore = self.adaptive and self.explore_every and runs % self.explore_every == 0
+
+        rejected_by = None
+        failed = set()
+        for f in self.order(symbol):
+            if any(r in failed for r in f.requires):
+                failed.add(f.name)
+                continue
+            with stage(f.stage or f.name, symbol):
+                started = time.perf_counter()
+                passed = bool(f.check(symbol, ctx))
+                elapsed = time.perf_counter() - started
+            stats[f.name].record(elapsed, not passed, self.alpha)
+            if passed:
+                continue
+            failed.add(f.name)
+            if rejected_by is None:
+                rejected_by = f.name
+                if f.message:
+                    console().sampled((f.name, symbol), f.message.format(symbol=symbol))
+                count(f"reject_{f.name}", symbol)
+            if not explore:
+                break
+        return rejected_by is None, rejected_by
+
+    def stats(self, symbol):
+        """{filter name: {"runs", "cost_ms", "reject_rate"}} for `symbol`."""
+        return {name: {"runs": s.runs, "cost_ms": round(s.cost * 1000, 3), "reject_rate": round(s.reject_rate, 3)}
+                for name, s in self._symbol_stats(symbol).items()}
@@ -1,7 +1,6 @@
 import csv
 import os
 from datetime import datetime, date
-from fpdf import FPDF
 
 # === File Paths ===
 REPORTS_DIR = "reports"
@@ -67,10 +66,11 @@ class TradeJournal:
         win_rate = round((wins / total_trades) * 100, 2) if total_trades else 0.0
 
         # === Create PDF ===
+        from fpdf import FPDF  # only needed for reports; kept out of bot startup
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=12)
-        pdf.cell(0, 10, f"Trade Report – {report_date.isoformat()} (UTC)", ln=True, align="C")
+        pdf.cell(0, 10, f"Trade Report - {report_date.isoformat()} (UTC)", ln=True, align="C")
         pdf.ln(10)
 
         if not trades_today:
@@ -1,18 +1,16 @@
 import datetime
-import os
 import time
 
-LOG_DIR = "logs"
+try:
+    from log_store import user_log, bot_log
+except ImportError:
+    from backend.log_store import user_log, bot_log
 
 def log_user_event(user_email, message):
     """
     Write a user-specific log entry and also print to console and bot.log.
+    Both files rotate into compressed segments (see log_store.py).
     """
-    safe_email = user_email.replace("@", "_").replace(".", "_")
-    if not os.path.exists(LOG_DIR):
-        os.makedirs(LOG_DIR)
-    
-    log_path = os.path.join(LOG_DIR, f"{safe_email}.log")
     timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
     log_line = f"[{timestamp}] ({user_email}): {message}"
 
@@ -20,12 +18,10 @@ def log_user_event(user_email, message):
     print(log_line)
 
     # ✅ User-specific log
-    with open(log_path, "a", encoding="utf-8") as f:
-        f.write(log_line + "\n")
+    user_log(user_email).append(log_line + "\n")
 
     # ✅ Global bot log
-    with open("bot.log", "a", encoding="utf-8") as f:
-        f.write(log_line + "\n")
+    bot_log().append(log_line + "\n")
 
 def log(message):
     """
@@ -34,13 +30,15 @@ def log(message):
     timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
     print(f"[{timestamp}] {message}")
 
-def get_user_logs(email):
+def iter_user_logs(email, since=None, until=None):
+    """
+    Stream a user's log lines, oldest first, across rotated and compressed
+    segments; since/until (Unix time) skip whole segments outside the range.
+    """
+    return user_log(email).read_lines(since, until)
+
+def get_user_logs(email, since=None, until=None):
     """
     Retrieve logs for a specific user based on their email.
     """
-    safe_email = email.replace("@", "_").replace(".", "_")
-    log_path = os.path.join(LOG_DIR, f"{safe_email}.log")
-    if os.path.exists(log_path):
-        with open(log_path, "r", encoding="utf-8") as f:
-            return f.readlines()
-    return []
+    return list(iter_user_logs(email, since, until))
@@ -0,0 +1,150 @@
+"""
+Coalesced logging for messages that repeat every scan cycle.
+
+A Coalescer wraps an emit function (a user's log, the console) with three
+ways to log:
+
+  - changed(key, outcome, message): emit only when `key`'s outcome differs
+    from the last one, e.g. a symbol going from "no setup" to "signal".
+  - repeated(message): emit the first occurrence in each summary window,
+    then fold repeats.
+  - sampled(key, message): emit one in LOG_SAMPLE_EVERY, for debug details.
+
+Everything held back is counted per key (the message itself for
+repeated()). Every LOG_SUMMARY_SECONDS (checked on the next log call, or on
+flush()) one summary line lists each folded key's latest message with its
+count, so no state transition is lost and the volume drops to roughly one
+line per change plus one per summary window, however much the folded text
+varies.
+
+With LOG_COALESCE disabled every call emits, exactly as before.
+"""
+import threading
+import time
+
+try:
+    from config import LOG_COALESCE, LOG_SUMMARY_SECONDS, LOG_SAMPLE_EVERY
+    from log import log_user_event
+    from utils import log
+except ImportError:
+    from backend.config import LOG_COALESCE, LOG_SUMMARY_SECONDS, LOG_SAMPLE_EVERY
+    from backend.log import log_user_event
+    from backend.utils import log
+
+
+class Coalescer:
+    """
+    Per-destination state for change-only, folded and sampled messages.
+    """
+
+    def __init__(self, emit, enabled=LOG_COALESCE, summary_seconds=LOG_SUMMARY_SECONDS,
+                 sample_every=LOG_SAMPLE_EVERY):
+        self.emit = emit
+        self.enabled = enabled
+        self.summary_seconds = summary_seconds
+        self.sample_every = max(1, sample_every)
+        self._outcomes = {}   # key -> last outcome
+        self._seen = set()    # messages repeated() emitted this window
+        self._samples = {}    # key -> calls
+        self._folded = {}     # (kind, key) -> [latest message, count held back this window]
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+
+    def changed(self, key, outcome, message):
+        """Emit `message` if `key`'s outcome changed. Returns True if emitted."""
+        if not self.enabled:
+            self.emit(message)
+            return True
+        with self._lock:
+            first = key not in self._outcomes
+            changed = first or self._outcomes[key] != outcome
+            self._outcomes[key] = outcome
+            if not changed:
+                self._fold(("changed", key), message)
+        return self._after(message if changed else None)
+
+    def repeated(self, message):
+        """Emit `message` once per summary window; later repeats only count toward the summary."""
+        if not self.enabled:
+            self.emit(message)
+            return True
+        with self._lock:
+            first = message not in self._seen
+            if first:
+                self._seen.add(message)
+            else:
+                self._fold(("repeated", message), message)
+        return self._after(message if first else None)
+
+    def sampled(self, key, message):
+        """Emit every LOG_SAMPLE_EVERY-th `message` for `key`, starting with the first."""
+        if not self.enabled:
+            self.emit(message)
+            return True
+        with self._lock:
+            calls = self._samples[key] = self._samples.get(key, 0) + 1
+            emit = (calls - 1) % self.sample_every == 0
+            if not emit:
+                self._fold(("sampled", key), message)
+        if emit and self.sample_every > 1:
+            message = f"{message} (1 in {self.sample_every} sampled)"
+        return self._after(message if emit else None)
+
+    def _fold(self, key, message):
+        folded = self._folded.get(key)
+        if folded is None:
+            self._folded[key] = [message, 1]
+        else:
+            folded[0] = message
+            folded[1] += 1
+
+    def _after(self, message):
+        if message is not None:
+            self.emit(message)
+        if time.time() - self._window_start >= self.summary_seconds:
+            self.flush()
+        return message is not None
+
+    def flush(self):
+        """Emit the summary of folded messages now and start a new window."""
+        with self._lock:
+            folded, self._folded = self._folded, {}
+            self._seen.clear()
+            elapsed = time.time() - self._window_start
+            self._window_start = time.time()
+        if folded:
+            parts = "; ".join(f"{message} ×{n}" for message, n in
+                              sorted(folded.values(), key=lambda item: -item[1]))
+            self.emit(f"🧾 Repeated in the last {elapsed:.0f}s: {parts}")
+
+    def reset(self):
+        """Flush the summary and forget all outcomes, so the next run logs from a clean slate."""
+        self.flush()
+        with self._lock:
+            self._outcomes.clear()
+            self._samples.clear()
+
+
+_coalescers = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_coalescer(name, emit):
+    """Return the process-wide Coalescer for `name`, creating it with `emit` on first use."""
+    coalescer = _coalescers.get(name)
+    if coalescer is None:
+        with _coalescers_lock:
+            coalescer = _coalescers.get(name)
+            if coalescer is None:
+                coalescer = _coalescers[name] = Coalescer(emit)
+    return coalescer
+
+
+def for_user(user_email):
+    """Coalescer writing to the user's log."""
+    return get_coalescer(("user", user_email), lambda message: log_user_event(user_email, message))
+
+
+def console():
+    """Coalescer writing to the console log (decision details)."""
+    return get_coalescer(("console",), log)
@@ -0,0 +1,436 @@
+"""
+Full-text index of the user logs (SQLite FTS5).
+
+An incremental indexer tails each user's log, including its rotated and
+compressed segments (see log_store.py), into log_lines (timestamp, user,
+symbol, event type, message) plus an external-content FTS5 table over the
+message, symbol and event. Per log it remembers the active file's inode,
+the byte offset read so far and the last closed segment indexed, so each
+pass reads only new lines; when the active file is rotated, the pass first
+finishes its closed segment from the same offset. A rotation during a pass
+leaves the active file for the next pass, so the offset recorded for one
+file is never applied to another.
+
+search() answers from the index alone: for text queries, the newest
+RANK_CANDIDATES FTS5 matches, ranked by BM25 term frequency; for filters
+only, the (user, ts) index. A user's text search is confined to the rowid
+range of that user's lines (in the time range), so it never walks other
+users' matches beyond that range.
+
+A pass runs in one IMMEDIATE transaction per log, so several processes may
+index the same database without duplicating lines. The background indexer
+does the backfill; a search request only catches up a bounded tail of the
+active file (LOG_INDEX_CATCHUP_BYTES) and never waits for another indexer.
+Rows past the log's LOG_RETENTION days are pruned along with its segments.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+
+try:
+    from config import (
+        LOG_DIR,
+        LOG_INDEX_ENABLED,
+        LOG_INDEX_PATH,
+        LOG_INDEX_SECONDS,
+        LOG_INDEX_CATCHUP_BYTES,
+        LOG_SEARCH_MAX_RESULTS,
+    )
+    from log_store import TIMESTAMP_FORMAT, SEGMENT_PATTERN, safe_name, segments, open_segment, retention_for
+    from economic_calendar import CURRENCIES, SYMBOL_CURRENCIES
+    from utils import log
+except ImportError:
+    from backend.config import (
+        LOG_DIR,
+        LOG_INDEX_ENABLED,
+        LOG_INDEX_PATH,
+        LOG_INDEX_SECONDS,
+        LOG_INDEX_CATCHUP_BYTES,
+        LOG_SEARCH_MAX_RESULTS,
+    )
+    from backend.log_store import TIMESTAMP_FORMAT, SEGMENT_PATTERN, safe_name, segments, open_segment, retention_for
+    from backend.economic_calendar import CURRENCIES, SYMBOL_CURRENCIES
+    from backend.utils import log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_lines (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    user TEXT NOT NULL,
+    symbol TEXT,
+    event TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS log_lines_user_ts ON log_lines (user, ts);
+CREATE INDEX IF NOT EXISTS log_lines_source_ts ON log_lines (source, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5 (
+    message, symbol, event, content='log_lines', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS log_lines_ai AFTER INSERT ON log_lines BEGIN
+    INSERT INTO log_fts (rowid, message, symbol, event) VALUES (new.id, new.message, new.symbol, new.event);
+END;
+CREATE TRIGGER IF NOT EXISTS log_lines_ad AFTER DELETE ON log_lines BEGIN
+    INSERT INTO log_fts (log_fts, rowid, message, symbol, event)
+    VALUES ('delete', old.id, old.message, old.symbol, old.event);
+END;
+CREATE TABLE IF NOT EXISTS log_sources (
+    name TEXT PRIMARY KEY,
+    ino INTEGER,
+    offset INTEGER NOT NULL DEFAULT 0,
+    watermark INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+RANK_CANDIDATES = 1000  # newest matches ranked per text search
+BUSY_TIMEOUT_MS = 30000
+CATCH_UP_BUSY_MS = 50   # a search's catch-up skips rather than wait for another indexer
+
+LINE_PATTERN = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] \((.*?)\): (.*)$")
+WORD_PATTERN = re.compile(r"\w+")
+SYMBOL_PATTERN = re.compile(r"\b([A-Z]{6}|[A-Z]{5}|[A-Z]{2,3}\d{2,3})\b")
+
+# First match wins; checked against the message text
+EVENT_TYPES = (
+    ("signal", "📡 Signal"),
+    ("no_setup", "No valid setup"),
+    ("trade_selected", "🎯 Trade selected"),
+    ("trade_placed", "✅ Trade placed"),
+    ("trade_failed", "Failed to place trade"),
+    ("summary", "🧾 Repeated"),
+    ("max_trades", "Max trades reached"),
+    ("market_closed", "markets closed"),
+    ("no_trade", "No trade placed"),
+    ("scan_complete", "Scan complete"),
+    ("heartbeat", "MT5 heartbeat"),
+    ("reconnect", "reconnect"),
+    ("start", "started"),
+    ("stop", "stop"),
+    ("error", "❌"),
+    ("warning", "⚠️"),
+)
+
+
+def symbol_of(message):
+    """The first trading symbol named in a log message (broker suffix dropped), or None."""
+    for token in SYMBOL_PATTERN.findall(message):
+        if any(token.startswith(prefix) for prefix in SYMBOL_CURRENCIES):
+            return token
+        if len(token) == 6 and token[:3] in CURRENCIES and token[3:] in CURRENCIES:
+            return token
+    return None
+
+
+def event_of(message):
+    lowered = message.lower()
+    for event, marker in EVENT_TYPES:
+        if marker.lower() in lowered:
+            return event
+    return "info"
+
+
+def match_expression(query):
+    """FTS5 expression for a plain-text query: every term must match; a trailing * makes a prefix term."""
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return " ".join(terms) or None
+
+
+def relevance(messages, query, k1=1.2, b=0.75):
+    """
+    BM25 term-frequency score of each message for the query's terms, with
+    length normalized over `messages`. Document frequencies are left out:
+    every candidate already matches every term.
+    """
+    terms = [(t.rstrip("*").lower(), t.endswith("*")) for t in query.split() if t.rstrip("*")]
+    tokens = [WORD_PATTERN.findall(m.lower()) for m in messages]
+    average = sum(len(t) for t in tokens) / len(tokens) if tokens else 1
+    scores = []
+    for words in tokens:
+        norm = k1 * (1 - b + b * len(words) / (average or 1))
+        score = 0.0
+        for term, prefix in terms:
+            tf = sum(1 for w in words if (w.startswith(term) if prefix else w == term))
+            score += tf * (k1 + 1) / (tf + norm) if tf else 0.0
+        scores.append(score)
+    return scores
+
+
+class LogIndex:
+    """
+    The index database: incremental indexing per log, and search.
+    """
+
+    def __init__(self, path=LOG_INDEX_PATH, log_dir=LOG_DIR):
+        self.path = path
+        self.log_dir = log_dir
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = self._connect()
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Indexing ---
+    def _rows(self, name, path, offset):
+        """Parsed rows from `path` starting at byte `offset`, and the offset after the last full line."""
+        with open_segment(path, binary=True) as f:
+            if offset:
+                if path.endswith(".log"):
+                    f.seek(offset)
+                else:
+                    f.read(offset)  # compressed: decompress up to the offset
+            return self._parse(name, f.read(), offset)
+
+    def _parse(self, name, data, offset):
+        rows = []
+        end = data.rfind(b"\n") + 1  # a partial last line waits for the next pass
+        ts, user = None, name
+        for raw in data[:end].decode("utf-8", errors="replace").splitlines():
+            match = LINE_PATTERN.match(raw)
+            if match:
+                ts = time.mktime(time.strptime(match.group(1), TIMESTAMP_FORMAT))
+                user, message = match.group(2), match.group(3)
+            elif ts is None or not raw.strip():
+                continue
+            else:
+                message = raw  # continuation of a multi-line message
+            rows.append((ts, name, user, symbol_of(message), event_of(message), message))
+        return rows, offset + end
+
+    def index_log(self, name, path=None, max_bytes=None):
+        """
+        Index new lines of one log (active file LOG_DIR/<name>.log). Returns the number of lines added.
+
+        With `max_bytes` (the search request path) this only catches up the
+        active file's tail: it never waits for another indexer, and leaves a
+        log that was never indexed, has unindexed segments or more than
+        `max_bytes` of new lines to the background indexer.
+        """
+        path = path or os.path.join(self.log_dir, f"{name}.log")
+        bounded = max_bytes is not None
+        if not self._lock.acquire(blocking=not bounded):
+            return 0
+        try:
+            conn = self._conn
+            if bounded:
+                conn.execute(f"PRAGMA busy_timeout = {CATCH_UP_BUSY_MS}")
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError:
+                if bounded:
+                    return 0  # another process is indexing
+                raise
+            finally:
+                if bounded:
+                    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            try:
+                added = self._index_pass(conn, name, path, max_bytes)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            self._lock.release()
+        return added
+
+    def _index_pass(self, conn, name, path, max_bytes):
+        state = conn.execute("SELECT ino, offset, watermark FROM log_sources WHERE name = ?", (name,)).fetchone()
+        ino, offset, watermark = state or (None, 0, 0)
+        pending = [(closed_ns, segment) for closed_ns, segment in segments(name, self.log_dir)
+                   if closed_ns > watermark]
+        try:
+            active = open(path, "rb")
+        except FileNotFoundError:
+            active = None
+        if max_bytes is not None:
+            stat = os.fstat(active.fileno()) if active else None
+            if (state is None or pending or stat is None or stat.st_ino != ino
+                    or stat.st_size - offset > max_bytes):
+                if active:
+                    active.close()
+                return 0
+
+        rows = []
+        # Segments closed since the last pass; the first one is the file we were tailing,
+        # so (ino, offset) always describe the file that becomes the next segment
+        for closed_ns, segment in pending:
+            try:
+                new, _ = self._rows(name, segment, offset)
+            except (FileNotFoundError, EOFError):
+                new = []  # removed or compressed meanwhile: caught up on the next pass
+            rows += new
+            watermark, ino, offset = closed_ns, None, 0
+
+        if active is not None:
+            with active:
+                stat = os.fstat(active.fileno())
+                if any(closed_ns > watermark for closed_ns, _ in segments(name, self.log_dir)):
+                    pass  # rotated during this pass: the next one reads that segment from `offset` first
+                else:
+                    if ino is not None and (stat.st_ino != ino or stat.st_size < offset):
+                        offset = 0  # replaced or truncated
+                    if stat.st_size > offset:
+                        active.seek(offset)
+                        new, offset = self._parse(name, active.read(), offset)
+                        rows += new
+                    ino = stat.st_ino
+
+        conn.executemany("INSERT INTO log_lines (ts, source, user, symbol, event, message) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO log_sources (name, ino, offset, watermark) VALUES (?, ?, ?, ?)",
+                     (name, ino, offset, watermark))
+        return len(rows)
+
+    def index_user(self, user_email):
+        return self.index_log(safe_name(user_email))
+
+    def catch_up(self, user_email, max_bytes=LOG_INDEX_CATCHUP_BYTES):
+        """Index a user's newest lines if that's cheap (see index_log); for the search request path."""
+        return self.index_log(safe_name(user_email), max_bytes=max_bytes)
+
+    def log_names(self):
+        """Every user log in LOG_DIR (active or segmented); bot.log repeats their lines and is skipped."""
+        names = set()
+        try:
+            entries = os.listdir(self.log_dir)
+        except FileNotFoundError:
+            return []
+        for entry in entries:
+            match = SEGMENT_PATTERN.match(entry)
+            if match:
+                names.add(match.group("name"))
+            elif entry.endswith(".log") and entry.count(".") == 1:
+                names.add(entry[:-4])
+        names.discard("bot")
+        return sorted(names)
+
+    def prune(self, name, days):
+        """Drop a log's rows older than `days`. Returns the count."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM log_lines WHERE source = ? AND ts < ?",
+                                        (name, time.time() - days * 86400))
+        return cursor.rowcount
+
+    def index_all(self):
+        """One indexing pass over every user log, with retention. Returns the number of lines added."""
+        added = 0
+        for name in self.log_names():
+            added += self.index_log(name)
+            days = retention_for(name).get("days")
+            if days:
+                self.prune(name, days)
+        return added
+
+    # --- Search ---
+    def search(self, query=None, user=None, symbol=None, event=None, since=None, until=None,
+               limit=LOG_SEARCH_MAX_RESULTS):
+        """
+        Matching log lines as dicts (ts, time, user, symbol, event, message, score).
+        Text queries are ranked by relevance (best first) among the newest
+        RANK_CANDIDATES matches; others are newest first.
+        since/until are Unix times.
+        """
+        where, params = [], []
+        for column, value in (("user", user), ("symbol", symbol and symbol.split(".")[0].upper()),
+                              ("event", event)):
+            if value:
+                where.append(f"l.{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("l.ts >= ?")
+            params.append(float(since))
+        if until is not None:
+            where.append("l.ts <= ?")
+            params.append(float(until))
+        limit = max(1, min(int(limit), LOG_SEARCH_MAX_RESULTS))
+
+        expression = match_expression(query) if query else None
+        conn = self._connect()  # readers don't wait for the indexer under WAL
+        if expression and user:
+            # A user's lines are inserted in time order, so the user's lines (within the time range, if
+            # any) map to a rowid range that FTS5 can seek to directly, instead of walking other users' matches
+            low = conn.execute("SELECT id FROM log_lines WHERE user = ? AND ts >= ? ORDER BY ts, id LIMIT 1",
+                               (user, float(since or 0))).fetchone()
+            high = conn.execute("SELECT id FROM log_lines WHERE user = ? AND ts <= ? "
+                                "ORDER BY ts DESC, id DESC LIMIT 1",
+                                (user, float(until if until is not None else "inf"))).fetchone()
+            if low is None or high is None:
+                conn.close()
+                return []
+            where.append("log_fts.rowid BETWEEN ? AND ?")
+            params += [low[0], high[0]]
+        if expression:
+            # FTS5 walks matching rowids newest first and stops at RANK_CANDIDATES, so a term in
+            # millions of lines costs the same as a rare one; those candidates are then ranked here
+            sql = ("SELECT l.ts, l.user, l.symbol, l.event, l.message "
+                   "FROM log_fts JOIN log_lines l ON l.id = log_fts.rowid WHERE log_fts MATCH ?"
+                   + "".join(f" AND {w}" for w in where) + " ORDER BY log_fts.rowid DESC LIMIT ?")
+            params = [expression] + params + [RANK_CANDIDATES]
+        else:
+            sql = ("SELECT l.ts, l.user, l.symbol, l.event, l.message FROM log_lines l"
+                   + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY l.ts DESC LIMIT ?")
+            params.append(limit)
+
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        if expression:
+            scores = relevance([row[4] for row in rows], query)
+            ranked = sorted(zip(scores, rows), key=lambda item: (-item[0], -item[1][0]))[:limit]
+        else:
+            ranked = [(None, row) for row in rows]
+        return [{"ts": ts, "time": time.strftime(TIMESTAMP_FORMAT, time.localtime(ts)), "user": user,
+                 "symbol": symbol, "event": event, "message": message,
+                 "score": round(score, 3) if score is not None else None}
+                for score, (ts, user, symbol, event, message) in ranked]
+
+
+_index = None
+_index_lock = threading.Lock()
+_indexer = None
+
+
+def get_log_index():
+    """Return the process-wide LogIndex, opening the database on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LogIndex()
+    return _index
+
+
+def _index_periodically(interval):
+    while True:
+        try:
+            added = get_log_index().index_all()
+            if added:
+                log(f"🔎 Log index: {added} new lines")
+        except Exception as e:
+            log(f"⚠️ Log indexing failed: {e}")
+        time.sleep(interval)
+
+
+def start_indexer(interval=LOG_INDEX_SECONDS):
+    """Start the background indexer once per process (no-op unless LOG_INDEX_ENABLED)."""
+    global _indexer
+    if not LOG_INDEX_ENABLED:
+        return False
+    with _index_lock:
+        if _indexer is None or not _indexer.is_alive():
+            _indexer = threading.Thread(target=_index_periodically, args=(interval,), name="log-indexer", daemon=True)
+            _indexer.start()
+    return True
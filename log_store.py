@@ -0,0 +1,315 @@
+"""
+Segmented, compressed storage for the user logs and bot.log.
+
+Each log keeps appending to its usual file (logs/<user>.log, bot.log), the
+active segment. When it reaches LOG_SEGMENT_MAX_BYTES, or its first line is
+older than LOG_SEGMENT_MAX_SECONDS, it is renamed to a closed segment
+LOG_DIR/<name>.<closed at, ns>.log. A background maintenance thread
+compresses closed segments (gzip, or zstd with the zstandard package) and
+applies retention.
+
+Retention is per log: LOG_RETENTION maps a user's email (or "bot") to
+{"days", "max_mb"}, with "*" as the default, and is read from the current
+settings snapshot, so it can be changed per user without a restart. Only
+closed segments are ever deleted.
+
+read_lines() walks the closed segments in order, decompressing as it goes,
+then the active file, skipping whole segments outside the time range.
+
+Several worker processes may write and maintain the same logs. Appends
+reopen the file, so a rename by another process is picked up on the next
+write; compression writes to a per-process temp file and replaces.
+"""
+import gzip
+import io
+import os
+import re
+import threading
+import time
+
+try:
+    import settings
+    from config import (
+        LOG_DIR,
+        LOG_SEGMENT_MAX_BYTES,
+        LOG_SEGMENT_MAX_SECONDS,
+        LOG_COMPRESSION,
+        LOG_MAINTENANCE_SECONDS,
+    )
+    from utils import log
+except ImportError:
+    from backend import settings
+    from backend.config import (
+        LOG_DIR,
+        LOG_SEGMENT_MAX_BYTES,
+        LOG_SEGMENT_MAX_SECONDS,
+        LOG_COMPRESSION,
+        LOG_MAINTENANCE_SECONDS,
+    )
+    from backend.utils import log
+
+BOT_LOG = "bot.log"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"  # log lines start with "[<timestamp>]"
+LINE_STAMP = re.compile(r"^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}[\] ]")
+SEGMENT_PATTERN = re.compile(r"^(?P<name>.+)\.(?P<closed>\d{19})\.log(?P<ext>\.gz|\.zst)?$")
+
+
+def safe_name(user_email):
+    """File-system name of a user's log ("bot" stays "bot")."""
+    return user_email.replace("@", "_").replace(".", "_")
+
+
+def _line_time(line):
+    try:
+        return time.mktime(time.strptime(line[1:20], TIMESTAMP_FORMAT))
+    except (ValueError, IndexError):
+        return None
+
+
+# --- Segments ---
+def segments(name, segment_dir=LOG_DIR):
+    """Closed segments of a log as [(closed at ns, path)], oldest first."""
+    found = {}
+    try:
+        entries = os.listdir(segment_dir)
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        match = SEGMENT_PATTERN.match(entry)
+        if match and match.group("name") == name:
+            # Mid-compression both files exist and are complete; keep either one
+            found.setdefault(int(match.group("closed")), os.path.join(segment_dir, entry))
+    return sorted(found.items())
+
+
+def open_segment(path, binary=False):
+    """Open a segment or active log for reading, decompressing .gz/.zst transparently."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb") if binary else gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        import zstandard  # optional: only needed for zstd segments
+
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return stream if binary else io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, "rb") if binary else open(path, "r", encoding="utf-8")
+
+
+def _compressor(method):
+    if method == "zstd":
+        try:
+            import zstandard
+            return ".zst", lambda src, dst: zstandard.ZstdCompressor().copy_stream(src, dst)
+        except ImportError:
+            log("⚠️ zstandard is not installed; compressing logs with gzip")
+    return ".gz", lambda src, dst: _gzip_copy(src, dst)
+
+
+def _gzip_copy(src, dst):
+    with gzip.GzipFile(fileobj=dst, mode="wb") as gz:
+        while True:
+            chunk = src.read(1 << 20)
+            if not chunk:
+                break
+            gz.write(chunk)
+
+
+def compress(path, method=LOG_COMPRESSION):
+    """Compress a closed segment in place. Returns the new path, or None if another process got there first."""
+    ext, copy = _compressor(method)
+    target = path + ext
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            copy(src, dst)
+        os.replace(tmp, target)
+        os.remove(path)
+    except FileNotFoundError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+    return target
+
+
+def retention_for(name, policies=None):
+    """{"days", "max_mb"} for a log: its own LOG_RETENTION entry over the "*" default."""
+    policies = settings.current().LOG_RETENTION if policies is None else policies
+    policy = dict(policies.get("*", {}))
+    for key, value in policies.items():
+        if key != "*" and safe_name(key) == name:
+            policy.update(value)
+    return policy
+
+
+def apply_retention(name, policy, segment_dir=LOG_DIR, now=None):
+    """Delete a log's closed segments past the policy's age or size budget, oldest first. Returns the count."""
+    now = time.time() if now is None else now
+    closed = segments(name, segment_dir)
+    sizes = {}
+    for _, path in closed:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except FileNotFoundError:
+            sizes[path] = 0
+    total = sum(sizes.values())
+    max_bytes = policy.get("max_mb", 0) * 1024 * 1024
+    max_age = policy.get("days", 0) * 86400
+
+    removed = 0
+    for closed_ns, path in closed:
+        too_old = max_age and now - closed_ns / 1e9 > max_age
+        too_big = max_bytes and total > max_bytes
+        if not (too_old or too_big):
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= sizes[path]
+        removed += 1
+    return removed
+
+
+class SegmentedLog:
+    """
+    One log: appends to its active file and rotates it into closed segments.
+    """
+
+    def __init__(self, name, path, segment_dir=LOG_DIR, max_bytes=LOG_SEGMENT_MAX_BYTES,
+                 max_seconds=LOG_SEGMENT_MAX_SECONDS):
+        self.name = name
+        self.path = path
+        self.segment_dir = segment_dir
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self._started = None  # active segment's first line time, as last read
+        self._lock = threading.Lock()
+
+    def _segment_start(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                started = _line_time(f.readline())
+        except FileNotFoundError:
+            return time.time()
+        return started if started is not None else time.time()
+
+    def append(self, text):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+                size = f.tell()
+            if self._started is None:
+                self._started = self._segment_start()
+            if size >= self.max_bytes:
+                self._rotate()
+            elif self.max_seconds and time.time() - self._started >= self.max_seconds:
+                # Another process may have rotated since we looked: check the file itself
+                self._started = self._segment_start()
+                if time.time() - self._started >= self.max_seconds:
+                    self._rotate()
+
+    def _rotate(self):
+        target = os.path.join(self.segment_dir, f"{self.name}.{time.time_ns()}.log")
+        try:
+            os.replace(self.path, target)
+        except FileNotFoundError:
+            pass  # already rotated by another process
+        self._started = time.time()
+        _wake.set()
+
+    def rotate(self):
+        """Close the active segment now."""
+        with self._lock:
+            self._rotate()
+
+    def read_lines(self, since=None, until=None):
+        """
+        Lines across closed segments and the active file, oldest first,
+        optionally within [since, until] (Unix time). Lines without a
+        timestamp (the rest of a multi-line message) go with the line before.
+        """
+        low = time.strftime(TIMESTAMP_FORMAT, time.localtime(since)) if since else None
+        high = time.strftime(TIMESTAMP_FORMAT, time.localtime(until)) if until else None
+        paths = [path for closed_ns, path in segments(self.name, self.segment_dir)
+                 if since is None or closed_ns / 1e9 >= since]
+        paths.append(self.path)
+        stamp = None  # timestamp of the last timestamped line
+        for path in paths:
+            try:
+                f = open_segment(path)
+            except FileNotFoundError:
+                continue  # compressed or removed meanwhile
+            with f:
+                for line in f:
+                    if LINE_STAMP.match(line):
+                        stamp = line[1:20]
+                    if low and (stamp is None or stamp < low):
+                        continue
+                    if high and stamp is not None and stamp > high:
+                        return
+                    yield line
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+_wake = threading.Event()
+_maintainer = None
+
+
+def get_log(name, path=None):
+    """Return the process-wide SegmentedLog for `name` (default file: LOG_DIR/<name>.log)."""
+    stored = _logs.get(name)
+    if stored is None:
+        with _logs_lock:
+            stored = _logs.get(name)
+            if stored is None:
+                os.makedirs(LOG_DIR, exist_ok=True)
+                stored = _logs[name] = SegmentedLog(name, path or os.path.join(LOG_DIR, f"{name}.log"))
+                _start_maintenance()
+    return stored
+
+
+def user_log(user_email):
+    return get_log(safe_name(user_email))
+
+
+def bot_log():
+    return get_log("bot", BOT_LOG)
+
+
+# --- Maintenance ---
+def maintain(segment_dir=LOG_DIR):
+    """Compress closed segments and apply each log's retention. Returns (compressed, removed)."""
+    compressed = removed = 0
+    names = set()
+    try:
+        entries = os.listdir(segment_dir)
+    except FileNotFoundError:
+        return 0, 0
+    for entry in entries:
+        match = SEGMENT_PATTERN.match(entry)
+        if not match:
+            continue
+        names.add(match.group("name"))
+        if match.group("ext") is None and compress(os.path.join(segment_dir, entry)):
+            compressed += 1
+    for name in names:
+        removed += apply_retention(name, retention_for(name), segment_dir)
+    return compressed, removed
+
+
+def _maintain_periodically(interval):
+    while True:
+        _wake.wait(interval)
+        _wake.clear()
+        try:
+            maintain()
+        except Exception as e:
+            log(f"⚠️ Log maintenance failed: {e}")
+
+
+def _start_maintenance():
+    global _maintainer
+    if _maintainer is None or not _maintainer.is_alive():
+        _maintainer = threading.Thread(target=_maintain_periodically, args=(LOG_MAINTENANCE_SECONDS,),
+                                       name="log-maintenance", daemon=True)
+        _maintainer.start()
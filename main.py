@@ -12,9 +12,16 @@ from backend.journal import TradeJournal
 from backend.risk_manager import calculate_risk_percent, calculate_lot
 from backend.telegram_alerts import send_telegram_message
 from backend.trade_filter import is_spread_acceptable
-from backend.watchdog import check_mt5_health
+from backend.mt5_heartbeat import start_heartbeat, stop_heartbeat
+from backend.metrics import stage, set_user
+from backend.positions_snapshot import take_snapshot, clear_snapshot
 import backend.bot_runner as bot_runner
-from backend.config import MAX_TRADES_AT_ONCE
+from backend import settings, warm_start
+from backend.correlation import select_top_k, direction_of
+from backend.trading_calendar import get_calendar
+from backend.config import IGNORE_MARKET_HOURS
+from backend.filter_pipeline import Filter, FilterPipeline
+from backend.log_coalesce import get_coalescer
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +36,12 @@ BASE_SYMBOLS = [
     "NAS100", "BTCUSD", "GBPJPY", "EURJPY", "AUDJPY"
 ]
 
+# Pre-decision gates, ordered per symbol like decide_trade's own filters
+GATES = FilterPipeline([
+    Filter("news", lambda symbol, ctx: not is_strong_news_event(symbol), None, stage="news_event"),
+    Filter("spread", lambda symbol, ctx: is_spread_acceptable(symbol), None),
+])
+
 def resolve_symbols():
     """Dynamically detect available MT5 symbols based on BASE_SYMBOLS."""
     resolved = []
@@ -44,10 +57,13 @@ def resolve_symbols():
     return resolved
 
 def main_loop(user_email):
+    set_user(user_email)
+    settings.start_watcher()
     mt5_api = MT5Manager()
     ai_memory = AIMemory()
     journal = TradeJournal()
     last_export_day = None
+    events = get_coalescer(("main", user_email), logging.info)
 
     if not mt5_api.connect():
         logging.error(f"[{user_email}] ❌ Failed to connect to MT5.")
@@ -63,6 +79,14 @@ def main_loop(user_email):
     logging.info(f"[{user_email}] ✅ Symbols: {symbols_to_trade}")
     send_telegram_message(f"[{user_email}] ✅ MT5 Bot started. Symbols: {', '.join(symbols_to_trade)}")
 
+    # resolve_symbols() shuts the terminal down, so reconnect before the first probe
+    mt5_api.connect()
+    heartbeat = start_heartbeat(user_email, connect=mt5_api.connect)
+    warm_start.resume(mt5.account_info())
+    calendar = get_calendar()
+    calendar.refresh_broker(symbols_to_trade)
+    health_alerted = False
+
     try:
         while bot_runner.bot_states.get(user_email, False):
             now = datetime.now(timezone.utc)
@@ -74,41 +98,71 @@ def main_loop(user_email):
                 send_telegram_message(f"[{user_email}] 📄 Daily Report:\n{report_path}")
                 last_export_day = now.date()
 
-            # 🩺 MT5 health check
-            if not check_mt5_health():
-                logging.warning(f"[{user_email}] ⚠️ MT5 health check failed.")
-                send_telegram_message(f"[{user_email}] ⚠️ Health check failed. Retrying...")
-                time.sleep(5)
+            # 🌙 Skip closed markets before any terminal or news call
+            open_symbols = symbols_to_trade if IGNORE_MARKET_HOURS else calendar.open_symbols(symbols_to_trade)
+            if not open_symbols:
+                time.sleep(30)
                 continue
 
-            open_positions = mt5.positions_get()
-            if open_positions and len(open_positions) >= MAX_TRADES_AT_ONCE:
-                logging.info(f"[{user_email}] ⏳ Max trade limit reached. Waiting...")
+            # 🩺 MT5 health (cached by the heartbeat thread; alert once per outage)
+            if not heartbeat.healthy():
+                if not health_alerted:
+                    reason = heartbeat.state().reason
+                    logging.warning(f"[{user_email}] ⚠️ MT5 health check failed: {reason}")
+                    send_telegram_message(f"[{user_email}] ⚠️ Health check failed ({reason}). Reconnecting...")
+                    health_alerted = True
+                time.sleep(5)
+                continue
+            if health_alerted:
+                send_telegram_message(f"[{user_email}] ✅ MT5 connection restored.")
+                health_alerted = False
+
+            max_trades = settings.current().MAX_TRADES_AT_ONCE
+            with stage("positions"):
+                open_positions = take_snapshot()
+            if len(open_positions) >= max_trades:
+                events.repeated(f"[{user_email}] ⏳ Max trade limit reached. Waiting...")
                 time.sleep(3)
                 continue
 
             candidates = []
 
-            for symbol in symbols_to_trade:
-                if not mt5.symbol_select(symbol, True):
+            for symbol in open_symbols:
+                with stage("symbol_select", symbol):
+                    selected = mt5.symbol_select(symbol, True)
+                if not selected:
                     continue
-                if mt5_api.has_open_position(symbol):
+                with stage("open_position_check", symbol):
+                    has_position = mt5_api.has_open_position(symbol)
+                if has_position:
                     continue
-                if is_strong_news_event(symbol):
-                    continue
-                if not is_spread_acceptable(symbol):
+                passed, _ = GATES.run(symbol, {})
+                if not passed:
                     continue
 
-                sentiment = get_news_sentiment(symbol)
-                strategy_feedback = ai_memory.update_strategy(symbol)
-                trade = decide_trade(symbol, sentiment, strategy_feedback)
+                with stage("news_sentiment", symbol):
+                    sentiment = get_news_sentiment(symbol)
+                with stage("ai_memory", symbol):
+                    strategy_feedback = ai_memory.update_strategy(symbol)
+                with stage("decide_trade", symbol):
+                    trade = decide_trade(symbol, sentiment, strategy_feedback)
 
                 if trade:
                     reward = abs(trade['tp'] - trade['entry_price'])
                     candidates.append((symbol, trade, strategy_feedback, reward))
 
-            if candidates:
-                symbol, trade, strategy_feedback, _ = max(candidates, key=lambda x: x[3])
+            slots = max_trades - len(open_positions)
+            if max_trades > 1:
+                with stage("correlation_select"):
+                    selected = select_top_k(
+                        [(c[3], c[0], direction_of(c[1]['type']), c) for c in candidates],
+                        slots,
+                        held=[(p.symbol, direction_of(p.type)) for p in open_positions],
+                    )
+            else:
+                selected = [max(candidates, key=lambda x: x[3])] if candidates else []
+
+            for symbol, trade, strategy_feedback, _ in selected:
                 account_info = mt5.account_info()
                 symbol_info = mt5.symbol_info(symbol)
                 risk_percent = calculate_risk_percent(account_info.balance, strategy_feedback)
@@ -121,7 +175,8 @@ def main_loop(user_email):
                     order_type=trade['type'],
                     price=trade['entry_price'],
                     sl=trade['sl'],
-                    tp=trade['tp']
+                    tp=trade['tp'],
+                    signal_time=trade.get('signal_time')
                 )
 
                 if success:
@@ -140,8 +195,9 @@ def main_loop(user_email):
                 else:
                     logging.warning(f"[{user_email}] ❌ Failed to place trade on {symbol}")
                     send_telegram_message(f"[{user_email}] ❌ Trade failed on {symbol}")
-            else:
+            if not selected:
                 logging.debug(f"[{user_email}] 🔍 No valid trade setup right now.")
+            clear_snapshot()
 
             time.sleep(1)
 
@@ -150,6 +206,8 @@ def main_loop(user_email):
         send_telegram_message(f"[{user_email}] ❗ Bot Error: {e}")
 
     finally:
+        warm_start.save_on_shutdown()
+        stop_heartbeat(user_email)
         mt5_api.disconnect()
         send_telegram_message(f"[{user_email}] 🔌 MT5 Bot stopped.")
 if __name__ == "__main__":
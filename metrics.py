@@ -0,0 +1,178 @@
+"""
+Lightweight per-stage timing and counters for the decision pipeline.
+
+Usage:
+    with stage("trend", symbol):
+        trend = get_trend_direction(symbol)
+    count("order_failed", symbol)
+
+Samples are labelled by stage, user and symbol. The user label comes from
+set_user(), called once per bot thread. When metrics are disabled, stage()
+returns a shared no-op context manager so a hook costs one function call.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+try:
+    from config import METRICS_ENABLED
+except ImportError:
+    from backend.config import METRICS_ENABLED
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_context = threading.local()
+_histograms = {}  # (stage, user, symbol) -> [bucket counts..., +Inf count, sum]
+_counters = {}    # (event, user, symbol) -> count
+_summaries = {}   # (name, user, symbol) -> [count, sum]
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopStage()
+
+
+class _Stage:
+    __slots__ = ("key", "start")
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.key, time.perf_counter() - self.start)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_user(user_email):
+    """Label every sample recorded from the current thread with this user."""
+    _context.user = user_email
+
+
+def _user():
+    return getattr(_context, "user", "")
+
+
+def stage(name, symbol=""):
+    """Context manager timing one pipeline stage."""
+    if not _enabled:
+        return _NOOP
+    return _Stage((name, _user(), symbol or ""))
+
+
+def observe(key, seconds):
+    """Record a duration for a (stage, user, symbol) key."""
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        hist[bisect_left(BUCKETS, seconds)] += 1
+        hist[-1] += seconds
+
+
+def count(event, symbol="", amount=1):
+    """Increment an event counter (rejections, order outcomes, ...)."""
+    if not _enabled:
+        return
+    key = (event, _user(), symbol or "")
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def summarize(name, value, symbol=""):
+    """Record a non-duration sample (e.g. slippage in points) for a summary metric."""
+    if not _enabled:
+        return
+    key = (name, _user(), symbol or "")
+    with _lock:
+        summary = _summaries.get(key)
+        if summary is None:
+            summary = _summaries[key] = [0, 0.0]
+        summary[0] += 1
+        summary[1] += value
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+        _summaries.clear()
+
+
+def _labels(**labels):
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        counters = dict(_counters)
+        summaries = {k: list(v) for k, v in _summaries.items()}
+
+    lines = [
+        "# HELP sentinel_stage_seconds Time spent in each decision pipeline stage.",
+        "# TYPE sentinel_stage_seconds histogram",
+    ]
+    for (stage_name, user, symbol), hist in sorted(histograms.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS, hist):
+            cumulative += n
+            labels = _labels(stage=stage_name, user=user, symbol=symbol, le=bound)
+            lines.append(f"sentinel_stage_seconds_bucket{labels} {cumulative}")
+        cumulative += hist[len(BUCKETS)]
+        labels = _labels(stage=stage_name, user=user, symbol=symbol, le="+Inf")
+        lines.append(f"sentinel_stage_seconds_bucket{labels} {cumulative}")
+        labels = _labels(stage=stage_name, user=user, symbol=symbol)
+        lines.append(f"sentinel_stage_seconds_sum{labels} {hist[-1]:.6f}")
+        lines.append(f"sentinel_stage_seconds_count{labels} {cumulative}")
+
+    lines.append("# HELP sentinel_events_total Decision pipeline events by type.")
+    lines.append("# TYPE sentinel_events_total counter")
+    for (event, user, symbol), value in sorted(counters.items()):
+        lines.append(f"sentinel_events_total{_labels(event=event, user=user, symbol=symbol)} {value}")
+
+    for name in sorted({key[0] for key in summaries}):
+        lines.append(f"# TYPE sentinel_{name} summary")
+        for (summary_name, user, symbol), (n, total) in sorted(summaries.items()):
+            if summary_name != name:
+                continue
+            labels = _labels(user=user, symbol=symbol)
+            lines.append(f"sentinel_{name}_sum{labels} {total:.6f}")
+            lines.append(f"sentinel_{name}_count{labels} {n}")
+
+    return "\n".join(lines) + "\n"
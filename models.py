@@ -1,3 +1,5 @@
+import os
+
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
@@ -64,3 +66,26 @@ class UserPreference(db.Model):
     show_news = db.Column(db.Boolean, default=True)
     show_calendar = db.Column(db.Boolean, default=True)
     dark_mode = db.Column(db.Boolean, default=False)
+
+
+# -------------------------------
+# MT5 Account Model
+# -------------------------------
+class MT5Account(db.Model):
+    """
+    The MT5 account a user's bot trades. The password is not stored here:
+    it comes from the MT5_PASSWORD_<login> environment variable, or the
+    terminal at `terminal_path` is already logged in.
+    """
+    __tablename__ = 'mt5_accounts'
+
+    user_email = db.Column(db.String(120), db.ForeignKey('users.email'), primary_key=True)
+    login = db.Column(db.Integer)
+    server = db.Column(db.String(120))
+    terminal_path = db.Column(db.String(260))  # terminal64.exe of this account's own terminal
+
+    def credentials(self):
+        """initialize() arguments for bot_runner.connect_terminal (unset fields omitted)."""
+        account = {"login": self.login, "server": self.server, "path": self.terminal_path,
+                   "password": os.getenv(f"MT5_PASSWORD_{self.login}") if self.login else None}
+        return {key: value for key, value in account.items() if value}
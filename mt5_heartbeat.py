@@ -0,0 +1,244 @@
+"""
+Background MT5 heartbeat with a cached health state.
+
+One Heartbeat thread per bot session probes the terminal every
+HEARTBEAT_INTERVAL_SECONDS (terminal_info + account_info, no initialize)
+and publishes the result as an immutable Health tuple. Trading loops read
+it with state() or healthy(): a plain attribute read, no terminal
+round-trip. A state older than HEARTBEAT_STALE_SECONDS counts as unhealthy,
+so a hung probe can't keep reporting a stale "ok".
+
+When the terminal is gone the heartbeat reconnects with exponential backoff
+and jitter (RECONNECT_BACKOFF_INITIAL up to RECONNECT_BACKOFF_MAX). It can
+also supervise the session's bot_loop thread and start a new one, with the
+worker restart backoff, whenever it exits without a stop being requested.
+"""
+import random
+import threading
+import time
+from collections import namedtuple
+
+import MetaTrader5 as mt5
+
+try:
+    from config import (
+        HEARTBEAT_INTERVAL_SECONDS,
+        HEARTBEAT_STALE_SECONDS,
+        RECONNECT_BACKOFF_INITIAL,
+        RECONNECT_BACKOFF_MAX,
+        WORKER_RESTART_BACKOFF_INITIAL,
+        WORKER_RESTART_BACKOFF_MAX,
+        WORKER_HEALTHY_RESET_SECONDS,
+    )
+    from log import log_user_event
+except ImportError:
+    from backend.config import (
+        HEARTBEAT_INTERVAL_SECONDS,
+        HEARTBEAT_STALE_SECONDS,
+        RECONNECT_BACKOFF_INITIAL,
+        RECONNECT_BACKOFF_MAX,
+        WORKER_RESTART_BACKOFF_INITIAL,
+        WORKER_RESTART_BACKOFF_MAX,
+        WORKER_HEALTHY_RESET_SECONDS,
+    )
+    from backend.log import log_user_event
+
+# healthy: terminal connected and balance > 0; since: when `healthy` last flipped
+Health = namedtuple("Health", "healthy reason balance checked_at since failures")
+
+UNKNOWN = Health(False, "not checked yet", None, 0.0, 0.0, 0)
+
+
+def probe():
+    """One terminal check. Returns (healthy, reason, balance, connected)."""
+    try:
+        terminal = mt5.terminal_info()
+        if terminal is None:
+            return False, f"terminal unavailable {mt5.last_error()}", None, False
+        if not getattr(terminal, "connected", True):
+            return False, "terminal not connected to the trade server", None, False
+        account = mt5.account_info()
+        if account is None:
+            return False, f"account info unavailable {mt5.last_error()}", None, False
+        if account.balance <= 0:
+            return False, "account balance is zero", account.balance, True
+        return True, "ok", account.balance, True
+    except Exception as e:
+        return False, f"probe error: {e}", None, False
+
+
+def _jittered(delay):
+    """Between half and the full delay, so sessions that failed together retry apart."""
+    return random.uniform(delay / 2, delay)
+
+
+class Heartbeat:
+    """
+    Probes the terminal for one session on its own thread and caches the result.
+    `connect` re-initializes the terminal (returns True on success).
+    """
+
+    def __init__(self, session, connect=mt5.initialize, interval=HEARTBEAT_INTERVAL_SECONDS,
+                 stale_after=HEARTBEAT_STALE_SECONDS):
+        self.session = session
+        self.connect = connect
+        self.interval = interval
+        self.stale_after = stale_after
+        self._state = UNKNOWN
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.reconnects = 0
+        self._reconnect_backoff = RECONNECT_BACKOFF_INITIAL
+        self._reconnect_at = 0.0
+
+        self.restarts = 0
+        self._spawn = None
+        self._loop = None
+        self._loop_started = 0.0
+        self._restart_backoff = WORKER_RESTART_BACKOFF_INITIAL
+        self._restart_at = None
+
+    # --- Readers (hot path) ---
+    def state(self):
+        """The cached Health. A single attribute read."""
+        return self._state
+
+    def healthy(self):
+        state = self._state
+        return state.healthy and time.time() - state.checked_at <= self.stale_after
+
+    # --- Lifecycle ---
+    def start(self):
+        if self._state is UNKNOWN:
+            self.check()  # callers get a real state straight away
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=f"heartbeat-{self.session}", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop probing and supervising. A bot_loop still running is left to finish on its own."""
+        with self._lock:
+            self._stop.set()
+            self._spawn = None
+            self._restart_at = None
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def supervise(self, spawn):
+        """Start the session's loop with `spawn()` (returns the started Thread) and restart it if it exits."""
+        with self._lock:
+            self._spawn = spawn
+            self._loop = spawn()
+            self._loop_started = time.time()
+            self._restart_backoff = WORKER_RESTART_BACKOFF_INITIAL
+            self._restart_at = None
+
+    def restarting(self):
+        """True while a restart of an exited loop is scheduled."""
+        return self._restart_at is not None
+
+    # --- Heartbeat thread ---
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._supervise_loop()
+            self._stop.wait(self.interval)
+
+    def check(self):
+        """Probe now, reconnecting if due, and publish the new state."""
+        healthy, reason, balance, connected = probe()
+        now = time.time()
+        if not connected and now >= self._reconnect_at:
+            healthy, reason, balance, connected = self._reconnect(now, reason)
+        elif connected:
+            # Also recovered on its own: the next outage starts from the initial backoff
+            self._reconnect_backoff = RECONNECT_BACKOFF_INITIAL
+            self._reconnect_at = 0.0
+
+        previous = self._state
+        failures = 0 if healthy else previous.failures + 1
+        since = previous.since if healthy == previous.healthy and previous.checked_at else now
+        self._state = Health(healthy, reason, balance, now, since, failures)  # single reference swap
+
+        if healthy != previous.healthy and previous is not UNKNOWN:
+            if healthy:
+                log_user_event(self.session, f"💚 MT5 heartbeat restored after {now - previous.since:.0f}s.")
+            else:
+                log_user_event(self.session, f"💔 MT5 heartbeat lost: {reason}")
+        elif not healthy and previous is UNKNOWN:
+            log_user_event(self.session, f"💔 MT5 heartbeat unhealthy: {reason}")
+        return self._state
+
+    def _reconnect(self, now, reason):
+        self.reconnects += 1
+        try:
+            ok = bool(self.connect())
+        except Exception as e:
+            ok, reason = False, f"reconnect error: {e}"
+        if ok:
+            self._reconnect_backoff = RECONNECT_BACKOFF_INITIAL
+            self._reconnect_at = 0.0
+            return probe()
+        delay = _jittered(self._reconnect_backoff)
+        self._reconnect_at = now + delay
+        self._reconnect_backoff = min(self._reconnect_backoff * 2, RECONNECT_BACKOFF_MAX)
+        log_user_event(self.session, f"🔌 MT5 reconnect failed ({reason}). Next attempt in {delay:.1f}s.")
+        return False, reason, None, False
+
+    def _supervise_loop(self):
+        with self._lock:
+            if self._spawn is None or self._loop is None:
+                return
+            now = time.time()
+            if self._loop.is_alive():
+                # Forget old crashes once the loop has been up for a while
+                if now - self._loop_started > WORKER_HEALTHY_RESET_SECONDS:
+                    self._restart_backoff = WORKER_RESTART_BACKOFF_INITIAL
+                return
+            if self._restart_at is None:
+                delay = _jittered(self._restart_backoff)
+                self._restart_at = now + delay
+                self._restart_backoff = min(self._restart_backoff * 2, WORKER_RESTART_BACKOFF_MAX)
+                log_user_event(self.session, f"💥 Bot loop exited. Restarting in {delay:.1f}s.")
+                return
+            if now < self._restart_at:
+                return
+            self.restarts += 1
+            self._restart_at = None
+            self._loop = self._spawn()
+            self._loop_started = now
+        log_user_event(self.session, f"♻️ Bot loop restarted (attempt {self.restarts}).")
+
+
+_heartbeats = {}
+_heartbeats_lock = threading.Lock()
+
+
+def start_heartbeat(session, connect=mt5.initialize, **kwargs):
+    """Return the session's running heartbeat, starting one if needed."""
+    with _heartbeats_lock:
+        heartbeat = _heartbeats.get(session)
+        if heartbeat is None or not heartbeat.running():
+            heartbeat = Heartbeat(session, connect, **kwargs)
+            _heartbeats[session] = heartbeat
+        return heartbeat.start()
+
+
+def get_heartbeat(session):
+    """The session's running heartbeat, or None."""
+    heartbeat = _heartbeats.get(session)
+    return heartbeat if heartbeat is not None and heartbeat.running() else None
+
+
+def stop_heartbeat(session):
+    with _heartbeats_lock:
+        heartbeat = _heartbeats.pop(session, None)
+    if heartbeat is not None:
+        heartbeat.stop()
+    return heartbeat is not None
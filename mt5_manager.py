@@ -1,11 +1,15 @@
 import MetaTrader5 as mt5
 import logging
 from config import MAGIC_NUMBER  # ✅ Use relative or direct import based on your structure
+from tick_store import current_tick
+from positions_snapshot import current_snapshot, refresh_after_order
+from order_executor import get_executor
 
 
 class MT5Manager:
     def __init__(self):
         self.connected = False
+        self.account = None
 
     def connect(self, login=None, password=None, server=None):
         """
@@ -22,6 +26,7 @@ class MT5Manager:
                 return False
 
             self.connected = True
+            self.account = str(login) if login else None
             logging.info("🔗 Connected to MetaTrader 5.")
             return True
 
@@ -36,6 +41,9 @@ class MT5Manager:
             logging.info("🔌 Disconnected from MT5.")
 
     def has_open_position(self, symbol):
+        snapshot = current_snapshot()
+        if snapshot is not None:
+            return snapshot.has_symbol(symbol)
         try:
             positions = mt5.positions_get(symbol=symbol)
             if positions is None:
@@ -48,7 +56,7 @@ class MT5Manager:
 
     def get_current_price(self, symbol, order_type):
         try:
-            tick = mt5.symbol_info_tick(symbol)
+            tick = current_tick(symbol)
             if not tick:
                 logging.error(f"❌ Failed to fetch price for {symbol}")
                 return None
@@ -57,61 +65,31 @@ class MT5Manager:
             logging.exception(f"❌ Error getting current price for {symbol}: {e}")
             return None
 
-    def place_order(self, symbol, lot, order_type, price=None, sl=0.0, tp=0.0):
+    def place_order(self, symbol, lot, order_type, price=None, sl=0.0, tp=0.0, signal_time=None):
         try:
-            if not mt5.symbol_select(symbol, True):
-                logging.error(f"❌ Could not select symbol {symbol} in Market Watch.")
-                return False
-
-            if price is None:
-                price = self.get_current_price(symbol, order_type)
-                if price is None:
-                    return False
-
-            symbol_info = mt5.symbol_info(symbol)
-            if symbol_info is None:
-                logging.error(f"❌ Could not retrieve symbol info for {symbol}")
-                return False
-
-            filling_mode = symbol_info.filling_mode
-            if filling_mode not in (
-                mt5.ORDER_FILLING_IOC,
-                mt5.ORDER_FILLING_RETURN,
-                mt5.ORDER_FILLING_FOK
-            ):
-                logging.warning(f"⚠️ Unknown or unsupported filling mode for {symbol}: {filling_mode}")
-
-            order = {
-                "action": mt5.TRADE_ACTION_DEAL,
+            result = get_executor(self.account).place({
                 "symbol": symbol,
-                "volume": lot,
-                "type": mt5.ORDER_TYPE_BUY if order_type.lower() == "buy" else mt5.ORDER_TYPE_SELL,
+                "order_type": order_type,
+                "lot": lot,
                 "price": price,
                 "sl": sl,
                 "tp": tp,
                 "magic": MAGIC_NUMBER,
-                "deviation": 10,
-                "type_filling": filling_mode,
-                "type_time": mt5.ORDER_TIME_GTC,  # ✅ Always include time type
-            }
-
-            result = mt5.order_send(order)
-
-            if result is None:
-                logging.error("❌ order_send() returned None.")
-                return False
+                "signal_time": signal_time,
+            })
 
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
+            if not result["ok"]:
                 logging.error(
-                    f"❌ Order failed: {symbol} [{order_type.upper()}] | RetCode: {result.retcode} | "
-                    f"Msg: {result.comment} | Volume: {lot} | Price: {price}"
+                    f"❌ Order failed: {symbol} [{order_type.upper()}] | RetCode: {result['retcode']} | "
+                    f"Msg: {result['comment']} | Volume: {lot} | Price: {price} | Attempts: {result['attempts']}"
                 )
                 return False
 
             logging.info(
-                f"✅ Order Placed: {symbol} {order_type.upper()} {lot} lots @ {price} "
-                f"| SL: {sl} | TP: {tp} | Ticket: {result.order}"
+                f"✅ Order Placed: {symbol} {order_type.upper()} {lot} lots @ {result['price']} "
+                f"| SL: {sl} | TP: {tp} | Ticket: {result['ticket']} | Slippage: {result['slippage_points']} pts"
             )
+            refresh_after_order()
             return True
 
         except Exception as e:
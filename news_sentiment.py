@@ -1,22 +1,60 @@
 # backend/news_sentiment.py
 
-import requests
-from backend.config import FINNHUB_API_KEY
+import threading
+import time
 
-def get_news_sentiment(symbol):
+from backend.config import (
+    FINNHUB_API_KEY,
+    NEWS_SENTIMENT_CACHE_SECONDS,
+    NEWS_BLACKOUT_CACHE_SECONDS,
+    NEWS_CALENDAR_ENABLED,
+)
+from backend.economic_calendar import in_blackout
+
+# symbol -> (fetched_at, sentiment); is_strong_news_event shares it with a shorter max age
+_cache = {}
+_cache_lock = threading.Lock()
+
+def get_news_sentiment(symbol, max_age=NEWS_SENTIMENT_CACHE_SECONDS):
+    cached = _cache.get(symbol)
+    if cached and time.time() - cached[0] < max_age:
+        return cached[1]
     try:
+        import requests  # deferred to the first news lookup
         response = requests.get(
             f"https://finnhub.io/api/v1/news-sentiment?symbol={symbol}&token={FINNHUB_API_KEY}",
             timeout=10
         )
         data = response.json()
-        return data
     except Exception as e:
         print(f"❌ News API error: {e}")
         return {}
+    with _cache_lock:
+        _cache[symbol] = (time.time(), data)
+    return data
+
+def export_cache():
+    """Cached sentiments as {symbol: [fetched_at, sentiment]} (for warm_start)."""
+    with _cache_lock:
+        return {symbol: list(entry) for symbol, entry in _cache.items()}
+
+def restore_cache(entries):
+    """Load cached sentiments that are still within NEWS_SENTIMENT_CACHE_SECONDS. Returns the count."""
+    now = time.time()
+    fresh = {symbol: (fetched_at, data) for symbol, (fetched_at, data) in entries.items()
+             if now - fetched_at < NEWS_SENTIMENT_CACHE_SECONDS}
+    with _cache_lock:
+        for symbol, entry in fresh.items():
+            if symbol not in _cache or _cache[symbol][0] < entry[0]:
+                _cache[symbol] = entry
+    return len(fresh)
 
 def is_strong_news_event(symbol):
-    sentiment = get_news_sentiment(symbol)
+    if NEWS_CALENDAR_ENABLED:
+        # Scheduled high-impact events from the local calendar index: no network here
+        return in_blackout(symbol)
+    # A risk gate: don't let the scoring cache delay a blackout by up to NEWS_SENTIMENT_CACHE_SECONDS
+    sentiment = get_news_sentiment(symbol, max_age=NEWS_BLACKOUT_CACHE_SECONDS)
     try:
         # Example logic: classify as strong if negative/positive score > 0.6
         if sentiment:
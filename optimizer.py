@@ -0,0 +1,248 @@
+"""
+Parallel parameter sweeps over the backtester.
+
+The history of every symbol is prepared once in this process and copied
+into a single shared-memory block. Pool workers map that block as NumPy
+views when they start, so each parameter set only runs the backtester's
+signal and trade passes; nothing is reloaded or recomputed per run.
+
+Every parameter set is backtested on the in-sample period and on the
+held-out most recent OPTIMIZER_OOS_FRACTION of history. The table is ranked
+on in-sample net R only; the out-of-sample columns show whether a result
+holds up on data the ranking never saw.
+
+Usage:
+    python optimizer.py grid   [--symbols S ...] [--bars N] [--workers N] [--top N] [--output FILE]
+    python optimizer.py random [--samples N] [--seed N] [...]
+    python optimizer.py backtest [--symbols S ...] [--bars N]
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import MetaTrader5 as mt5
+
+try:
+    from config import (
+        OPTIMIZER_HISTORY_BARS,
+        OPTIMIZER_OOS_FRACTION,
+        OPTIMIZER_WORKERS,
+        OPTIMIZER_RESULTS_DIR,
+    )
+    from backtester import PARAMS, default_params, load_history, prepare, simulate
+except ImportError:
+    from backend.config import (
+        OPTIMIZER_HISTORY_BARS,
+        OPTIMIZER_OOS_FRACTION,
+        OPTIMIZER_WORKERS,
+        OPTIMIZER_RESULTS_DIR,
+    )
+    from backend.backtester import PARAMS, default_params, load_history, prepare, simulate
+
+# Grid sweep values; random sweeps draw from each parameter's min..max
+PARAM_GRID = {
+    "TREND_SMA_FAST": [3, 5, 8],
+    "TREND_SMA_SLOW": [10, 15, 20, 30],
+    "RANGE_SMA_FAST": [5, 10, 20],
+    "RANGE_SMA_SLOW": [20, 30, 50],
+    "RANGE_RATIO": [0.1, 0.25, 0.5],
+    "PIN_BAR_BODY_RATIO": [0.1, 0.25, 0.4],
+    "SCORE_VOLATILITY_WEIGHT": [0.0, 0.5, 1.0, 2.0],
+}
+MIN_TRADES = 30  # in-sample trades below this rank last
+
+METRIC_COLUMNS = ("trades", "win_rate", "net_r", "expectancy", "profit_factor", "max_drawdown_r")
+
+
+def _valid(params):
+    return (params["TREND_SMA_FAST"] < params["TREND_SMA_SLOW"]
+            and params["RANGE_SMA_FAST"] < params["RANGE_SMA_SLOW"])
+
+
+def grid_params():
+    base = default_params()
+    names = list(PARAM_GRID)
+    for values in itertools.product(*(PARAM_GRID[n] for n in names)):
+        params = dict(base, **dict(zip(names, values)))
+        if _valid(params):
+            yield params
+
+
+def random_params(samples, seed=None):
+    rng = random.Random(seed)
+    base = default_params()
+    drawn = 0
+    while drawn < samples:
+        params = dict(base)
+        for name, values in PARAM_GRID.items():
+            lo, hi = min(values), max(values)
+            params[name] = rng.randint(lo, hi) if isinstance(lo, int) else round(rng.uniform(lo, hi), 3)
+        if _valid(params):
+            drawn += 1
+            yield params
+
+
+# --- Shared memory ---
+def share(universe):
+    """Copy every prepared array into one shared-memory block. Returns (block, layout)."""
+    layout, offset = {}, 0
+    for symbol, data in universe.items():
+        for name, array in data.items():
+            offset = -(-offset // 64) * 64  # keep each array cache-line aligned
+            layout[(symbol, name)] = (offset, array.dtype.str, array.shape)
+            offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for (symbol, name), (start, dtype, shape) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view[...] = universe[symbol][name]
+    return block, layout
+
+
+def attach(block, layout):
+    """Read-only NumPy views of a shared block, as {symbol: {name: array}}."""
+    universe = {}
+    for (symbol, name), (start, dtype, shape) in layout.items():
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)
+        view.flags.writeable = False
+        universe.setdefault(symbol, {})[name] = view
+    return universe
+
+
+_worker = {}
+
+
+def _init_worker(name, layout, split):
+    block = shared_memory.SharedMemory(name=name)
+    _worker.update(block=block, universe=attach(block, layout), split=split)
+
+
+def _evaluate(params):
+    universe, split = _worker["universe"], _worker["split"]
+    return params, simulate(universe, params, end=split), simulate(universe, params, start=split)
+
+
+# --- Sweeps ---
+def load_universe(symbols, bars=OPTIMIZER_HISTORY_BARS):
+    universe = {}
+    for symbol in symbols:
+        info = mt5.symbol_info(symbol)
+        history = load_history(symbol, bars)
+        if info is None or len(history) < 1000:
+            print(f"⚠️ Skipping {symbol}: not enough history")
+            continue
+        universe[symbol] = prepare(history, info.point)
+    return universe
+
+
+def oos_split(universe, fraction=OPTIMIZER_OOS_FRACTION):
+    """Entry time from which the most recent `fraction` of the history is out of sample."""
+    first = min(int(d["time"][0]) for d in universe.values())
+    last = max(int(d["time"][-1]) for d in universe.values())
+    return int(last - (last - first) * fraction)
+
+
+def _rank_key(row):
+    _, in_sample, _ = row
+    return (in_sample["trades"] >= MIN_TRADES, in_sample["net_r"], -in_sample["max_drawdown_r"])
+
+
+def sweep(universe, param_sets, workers=OPTIMIZER_WORKERS):
+    """Backtest every parameter set in a process pool. Returns rows ranked best first."""
+    param_sets = list(param_sets)
+    split = oos_split(universe)
+    block, layout = share(universe)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(block.name, layout, split)) as pool:
+            chunksize = max(1, len(param_sets) // (workers * 8))
+            rows = list(pool.map(_evaluate, param_sets, chunksize=chunksize))
+    finally:
+        block.close()
+        block.unlink()
+    return sorted(rows, key=_rank_key, reverse=True)
+
+
+def write_table(rows, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", *PARAMS,
+                         *(f"is_{c}" for c in METRIC_COLUMNS), *(f"oos_{c}" for c in METRIC_COLUMNS)])
+        for rank, (params, in_sample, out_of_sample) in enumerate(rows, 1):
+            writer.writerow([rank, *(params[p] for p in PARAMS),
+                             *(in_sample[c] for c in METRIC_COLUMNS),
+                             *(out_of_sample[c] for c in METRIC_COLUMNS)])
+
+
+def print_table(rows, top):
+    print(f"{'#':>3} {'IS trades':>9} {'IS R':>8} {'IS PF':>6} {'OOS trades':>10} {'OOS R':>8} {'OOS PF':>6}  params")
+    defaults = default_params()
+    for rank, (params, in_sample, out_of_sample) in enumerate(rows[:top], 1):
+        changed = {k: v for k, v in params.items() if v != defaults[k]}
+        print(f"{rank:>3} {in_sample['trades']:>9} {in_sample['net_r']:>8} {in_sample['profit_factor']:>6} "
+              f"{out_of_sample['trades']:>10} {out_of_sample['net_r']:>8} {out_of_sample['profit_factor']:>6}  {changed}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Strategy parameter sweeps")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("grid", "random", "backtest"):
+        p = sub.add_parser(name)
+        p.add_argument("--symbols", nargs="+")
+        p.add_argument("--bars", type=int, default=OPTIMIZER_HISTORY_BARS)
+        if name != "backtest":
+            p.add_argument("--workers", type=int, default=OPTIMIZER_WORKERS)
+            p.add_argument("--top", type=int, default=20)
+            p.add_argument("--output")
+        if name == "random":
+            p.add_argument("--samples", type=int, default=2000)
+            p.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if not mt5.initialize():
+        print("❌ MT5 initialization failed.")
+        return 1
+    try:
+        if args.symbols:
+            symbols = args.symbols
+        else:
+            from symbol_utils import get_symbols_to_trade
+            symbols = get_symbols_to_trade()
+        started = time.perf_counter()
+        universe = load_universe(symbols, args.bars)
+    finally:
+        mt5.shutdown()
+    if not universe:
+        print("❌ No symbol history to test on.")
+        return 1
+    print(f"📦 Prepared {len(universe)} symbols in {time.perf_counter() - started:.1f}s")
+
+    if args.command == "backtest":
+        split = oos_split(universe)
+        params = default_params()
+        print(f"📊 In sample:     {simulate(universe, params, end=split)}")
+        print(f"📊 Out of sample: {simulate(universe, params, start=split)}")
+        return 0
+
+    param_sets = grid_params() if args.command == "grid" else random_params(args.samples, args.seed)
+    started = time.perf_counter()
+    rows = sweep(universe, param_sets, args.workers)
+    print(f"✅ {len(rows)} parameter sets in {time.perf_counter() - started:.1f}s on {args.workers} workers")
+
+    output = args.output or os.path.join(
+        OPTIMIZER_RESULTS_DIR, f"{args.command}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    write_table(rows, output)
+    print_table(rows, args.top)
+    print(f"📄 Ranked table written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
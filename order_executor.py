@@ -0,0 +1,273 @@
+"""
+Order execution pipeline: one queue and worker thread per account.
+
+Orders are plain dicts (symbol, order_type, lot, price, sl, tp and optional
+magic, comment, signal_time). The worker sends each order with the
+symbol's cached filling mode, retries requotes and price changes at a fresh
+tick, and records:
+  - signal-to-send latency (signal_time -> first order_send)
+  - send-to-fill latency (order_send round trip of the filled attempt)
+  - slippage in points against the order's price (positive = adverse)
+
+Latencies go to the metrics histograms; slippage goes to a metrics
+summary and to each executor's recent_fills().
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import MetaTrader5 as mt5
+
+try:
+    from config import (
+        MAGIC_NUMBER,
+        ORDER_MAX_RETRIES,
+        ORDER_RETRY_DELAY_SECONDS,
+        ORDER_DEVIATION_POINTS,
+        ORDER_RESULT_TIMEOUT_SECONDS,
+    )
+    from metrics import stage, count, observe, summarize, set_user, is_enabled
+    from tick_store import current_tick
+except ImportError:
+    from backend.config import (
+        MAGIC_NUMBER,
+        ORDER_MAX_RETRIES,
+        ORDER_RETRY_DELAY_SECONDS,
+        ORDER_DEVIATION_POINTS,
+        ORDER_RESULT_TIMEOUT_SECONDS,
+    )
+    from backend.metrics import stage, count, observe, summarize, set_user, is_enabled
+    from backend.tick_store import current_tick
+
+RETRY_RETCODES = {
+    getattr(mt5, "TRADE_RETCODE_REQUOTE", 10004),
+    getattr(mt5, "TRADE_RETCODE_PRICE_CHANGED", 10020),
+    getattr(mt5, "TRADE_RETCODE_PRICE_OFF", 10021),
+}
+INVALID_FILL_RETCODE = getattr(mt5, "TRADE_RETCODE_INVALID_FILL", 10030)
+
+# symbol_info().filling_mode is a bitmask of allowed fillings
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+
+def _filling_for(info):
+    if info.filling_mode & SYMBOL_FILLING_FOK:
+        return mt5.ORDER_FILLING_FOK
+    if info.filling_mode & SYMBOL_FILLING_IOC:
+        return mt5.ORDER_FILLING_IOC
+    return mt5.ORDER_FILLING_RETURN
+
+
+class _SymbolCache:
+    """symbol_select/symbol_info done once per symbol instead of once per order."""
+
+    def __init__(self):
+        self.points = {}
+        self.fillings = {}
+
+    def prepare(self, symbol):
+        if symbol in self.fillings:
+            return True
+        with stage("order_symbol_select", symbol):
+            selected = mt5.symbol_select(symbol, True)
+        if not selected:
+            return False
+        with stage("order_symbol_info", symbol):
+            info = mt5.symbol_info(symbol)
+        if info is None:
+            return False
+        self.points[symbol] = info.point
+        self.fillings[symbol] = _filling_for(info)
+        return True
+
+    def next_filling(self, symbol):
+        """After an invalid-fill rejection, fall back through IOC and RETURN."""
+        order = [mt5.ORDER_FILLING_FOK, mt5.ORDER_FILLING_IOC, mt5.ORDER_FILLING_RETURN]
+        current = self.fillings.get(symbol)
+        i = order.index(current) + 1 if current in order else 0
+        if i >= len(order):
+            return None
+        self.fillings[symbol] = order[i]
+        return order[i]
+
+
+class OrderExecutor:
+    """
+    Serializes one account's orders through a queue and a worker thread.
+    """
+
+    def __init__(self, account="default"):
+        self.account = account
+        self.symbols = _SymbolCache()
+        self.fills = deque(maxlen=500)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # --- Submission ---
+    def submit(self, order):
+        """Queue an order and return a Future resolving to the execution result dict."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((order, future))
+        return future
+
+    def place(self, order, timeout=ORDER_RESULT_TIMEOUT_SECONDS):
+        """
+        Submit and wait. If the order is still queued after `timeout` it is
+        withdrawn and reported as failed; once the worker has started sending
+        it, wait for the real outcome instead, since it may already be filled.
+        """
+        future = self.submit(order)
+        try:
+            try:
+                return future.result(timeout)
+            except FutureTimeout:
+                if future.cancel():
+                    return {"ok": False, "retcode": None, "attempts": 0,
+                            "comment": f"Not sent: still queued after {timeout}s"}
+                return future.result()
+        except Exception as e:
+            return {"ok": False, "retcode": None, "comment": f"Execution error: {e}", "attempts": 0}
+
+    def recent_fills(self):
+        return list(self.fills)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"orders-{self.account}", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        set_user(self.account)
+        while True:
+            order, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.execute(order))
+            except Exception as e:
+                future.set_exception(e)
+
+    # --- Execution ---
+    def execute(self, order):
+        """Send one order with retries. Runs on the worker thread."""
+        symbol = order["symbol"]
+        is_buy = order["order_type"].lower() == "buy"
+        result = {"ok": False, "retcode": None, "comment": "", "ticket": None,
+                  "price": None, "attempts": 0, "slippage_points": None}
+
+        if not self.symbols.prepare(symbol):
+            result["comment"] = f"Symbol {symbol} unavailable"
+            count("order_failed", symbol)
+            return result
+
+        price = order.get("price")
+        if price is None:
+            tick = current_tick(symbol)
+            if not tick:
+                result["comment"] = f"No tick for {symbol}"
+                count("order_failed", symbol)
+                return result
+            price = tick.ask if is_buy else tick.bid
+        expected = price
+
+        request = {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": symbol,
+            "volume": order["lot"],
+            "type": mt5.ORDER_TYPE_BUY if is_buy else mt5.ORDER_TYPE_SELL,
+            "price": price,
+            "sl": order.get("sl", 0.0),
+            "tp": order.get("tp", 0.0),
+            "deviation": order.get("deviation", ORDER_DEVIATION_POINTS),
+            "magic": order.get("magic", MAGIC_NUMBER),
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": self.symbols.fillings[symbol],
+        }
+        if order.get("comment"):
+            request["comment"] = order["comment"]
+
+        signal_time = order.get("signal_time")
+        if signal_time and is_enabled():
+            observe(("order_signal_to_send", self.account, symbol), max(0.0, time.time() - signal_time))
+
+        for attempt in range(1, ORDER_MAX_RETRIES + 2):
+            result["attempts"] = attempt
+            sent = time.perf_counter()
+            with stage("order_send", symbol):
+                response = mt5.order_send(request)
+            elapsed = time.perf_counter() - sent
+
+            if response is None:
+                result["comment"] = f"order_send() returned None: {mt5.last_error()}"
+                break
+
+            result["retcode"] = response.retcode
+            result["comment"] = response.comment
+
+            if response.retcode == mt5.TRADE_RETCODE_DONE:
+                if is_enabled():
+                    observe(("order_send_to_fill", self.account, symbol), elapsed)
+                self._record_fill(result, response, symbol, is_buy, expected, attempt)
+                return result
+
+            if response.retcode == INVALID_FILL_RETCODE and self.symbols.next_filling(symbol) is not None:
+                request["type_filling"] = self.symbols.fillings[symbol]
+                continue
+
+            if response.retcode not in RETRY_RETCODES or attempt > ORDER_MAX_RETRIES:
+                break
+
+            count("order_requote", symbol)
+            time.sleep(ORDER_RETRY_DELAY_SECONDS)
+            tick = current_tick(symbol)
+            if not tick:
+                break
+            request["price"] = tick.ask if is_buy else tick.bid
+
+        count("order_failed", symbol)
+        return result
+
+    def _record_fill(self, result, response, symbol, is_buy, expected, attempts):
+        fill_price = response.price or expected
+        point = self.symbols.points.get(symbol) or 0.0001
+        slippage = ((fill_price - expected) if is_buy else (expected - fill_price)) / point
+        result.update({
+            "ok": True,
+            "ticket": response.order,
+            "price": fill_price,
+            "slippage_points": round(slippage, 1),
+        })
+        summarize("order_slippage_points", slippage, symbol)
+        count("order_placed", symbol)
+        self.fills.append({
+            "time": time.time(),
+            "symbol": symbol,
+            "expected": expected,
+            "price": fill_price,
+            "slippage_points": result["slippage_points"],
+            "attempts": attempts,
+        })
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(account=None):
+    """Return the executor (and queue) for an account, creating it on first use."""
+    key = account or "default"
+    executor = _executors.get(key)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(key)
+            if executor is None:
+                executor = _executors[key] = OrderExecutor(key)
+    return executor
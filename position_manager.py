@@ -0,0 +1,210 @@
+"""
+Batch trailing-stop and scale-in management over all open bot positions.
+
+One pass every POSITION_MANAGER_INTERVAL_SECONDS (bot_runner runs it
+between scan cycles): the positions snapshot is turned into NumPy arrays,
+each symbol's tick is read once, and the trailing and scale-in rules are
+evaluated for every position at once. Positions are valued at the price
+they would close at (bid for buys, ask for sells). SL modifications are
+sent only when they tighten the stop by at least one point, and at most
+once per SLTP_MIN_INTERVAL_SECONDS per position. Scale-ins open new
+positions, so they only use free MAX_TRADES_AT_ONCE slots.
+"""
+import threading
+import time
+
+import numpy as np
+import MetaTrader5 as mt5
+
+try:
+    import settings
+    from config import MAGIC_NUMBER
+    from metrics import stage, count
+    from utils import log
+    from tick_store import current_tick
+    from order_executor import get_executor
+    from positions_snapshot import refresh_after_order
+except ImportError:
+    from backend import settings
+    from backend.config import MAGIC_NUMBER
+    from backend.metrics import stage, count
+    from backend.utils import log
+    from backend.tick_store import current_tick
+    from backend.order_executor import get_executor
+    from backend.positions_snapshot import refresh_after_order
+
+
+class PositionManager:
+    """
+    Evaluates trailing and scale-in rules for one account's positions.
+    """
+
+    def __init__(self, account=None, magic=MAGIC_NUMBER):
+        self.account = account
+        self.magic = magic
+        self.points = {}
+        self.digits = {}
+        self.last_modify = {}  # ticket -> time of the last SLTP request
+        self.scaled = set()    # tickets already scaled into
+
+    def _point(self, symbol):
+        point = self.points.get(symbol)
+        if point is None:
+            info = mt5.symbol_info(symbol)
+            point = self.points[symbol] = info.point if info and info.point else 0.00001
+            self.digits[symbol] = info.digits if info else 5
+        return point
+
+    def run(self, snapshot, sr_levels=None):
+        """
+        Manage every bot position in `snapshot` (a PositionsSnapshot).
+        `sr_levels` optionally maps symbol -> sr_levels.LevelIndex; positions
+        trail to the nearest level behind the price, or to breakeven without
+        one. Returns (sl_modified, scaled_in).
+        """
+        positions = snapshot.for_magic(self.magic)
+        if not positions:
+            return 0, 0
+
+        # One tick per symbol for the whole pass
+        ticks = {}
+        for symbol in {p.symbol for p in positions}:
+            tick = current_tick(symbol)
+            if tick:
+                ticks[symbol] = tick
+        positions = [p for p in positions if p.symbol in ticks]
+        if not positions:
+            return 0, 0
+
+        sr_levels = sr_levels or {}
+        cfg = settings.current()
+        is_buy = np.array([p.type == mt5.POSITION_TYPE_BUY for p in positions])
+        entry = np.array([p.price_open for p in positions], dtype=float)
+        sl = np.array([p.sl for p in positions], dtype=float)
+        volume = np.array([p.volume for p in positions], dtype=float)
+        point = np.array([self._point(p.symbol) for p in positions])
+        # Close-out price: a buy is sold at the bid, a sell bought back at the ask
+        price = np.array([ticks[p.symbol].bid if p.type == mt5.POSITION_TYPE_BUY else ticks[p.symbol].ask
+                          for p in positions], dtype=float)
+        sr = np.array([self._level_behind(sr_levels.get(p.symbol), is_buy[i], price[i])
+                       for i, p in enumerate(positions)], dtype=float)
+
+        with stage("position_rules"):
+            # Trailing: once +TRAIL_TRIGGER_PCT in profit, move SL to the better of entry and S/R
+            sr = np.where(np.isnan(sr), entry, sr)
+            triggered = np.where(is_buy, price >= entry * (1 + cfg.TRAIL_TRIGGER_PCT),
+                                 price <= entry * (1 - cfg.TRAIL_TRIGGER_PCT))
+            new_sl = np.where(is_buy, np.maximum(entry, sr), np.minimum(entry, sr))
+            new_sl = np.round(new_sl / point) * point
+            half = point / 2
+
+            # Only tighten, and only by at least one point (no-op suppression)
+            no_sl = sl == 0
+            tightens = np.where(is_buy, new_sl >= sl + point, new_sl <= sl - point) | no_sl
+            # Never set a stop on the wrong side of the current price
+            valid = np.where(is_buy, new_sl < price, new_sl > price)
+            modify = triggered & tightens & valid
+
+            scale = np.zeros(len(positions), dtype=bool)
+            if cfg.SCALE_IN_ENABLED:
+                # Scale in once per symbol, after the position moved in our favour and the SL is at breakeven
+                per_symbol = {}
+                for p in positions:
+                    per_symbol[p.symbol] = per_symbol.get(p.symbol, 0) + 1
+                single = np.array([per_symbol[p.symbol] == 1 for p in positions])
+                moved = np.where(is_buy, price >= entry * (1 + cfg.SCALE_IN_TRIGGER_PCT),
+                                 price <= entry * (1 - cfg.SCALE_IN_TRIGGER_PCT))
+                protected = ~no_sl & np.where(is_buy, sl >= entry - half, sl <= entry + half)
+                add = np.round(np.minimum(volume * cfg.SCALE_IN_FACTOR, cfg.MAX_LOT_SIZE) - volume, 2)
+                scale = single & moved & protected & (add > 0)
+
+        now = time.time()
+        modified = 0
+        for i in np.nonzero(modify)[0]:
+            position = positions[i]
+            if now - self.last_modify.get(position.ticket, 0) < cfg.SLTP_MIN_INTERVAL_SECONDS:
+                count("sltp_rate_limited", position.symbol)
+                continue
+            self.last_modify[position.ticket] = now
+            if self._modify_sl(position, round(float(new_sl[i]), self.digits[position.symbol])):
+                modified += 1
+
+        scaled = 0
+        slots = cfg.MAX_TRADES_AT_ONCE - len(snapshot)
+        for i in np.nonzero(scale)[0]:
+            position = positions[i]
+            if position.ticket in self.scaled:
+                continue
+            if scaled >= slots:
+                count("scale_in_no_slot", position.symbol)
+                break
+            self.scaled.add(position.ticket)
+            if self._scale_in(position, float(add[i])):
+                scaled += 1
+
+        # Forget tickets that are no longer open
+        open_tickets = {p.ticket for p in positions}
+        self.last_modify = {t: ts for t, ts in self.last_modify.items() if t in open_tickets}
+        self.scaled &= open_tickets
+
+        if modified or scaled:
+            refresh_after_order()
+        return modified, scaled
+
+    @staticmethod
+    def _level_behind(levels, is_buy, price):
+        """Nearest S/R level below a buy's price (above a sell's), or NaN."""
+        if levels is None:
+            return np.nan
+        level = levels.next_below(price) if is_buy else levels.next_above(price)
+        return level[0] if level else np.nan
+
+    def _modify_sl(self, position, new_sl):
+        request = {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "position": position.ticket,
+            "sl": new_sl,
+            "tp": position.tp,
+            "symbol": position.symbol,
+            "magic": position.magic,
+        }
+        with stage("order_sltp", position.symbol):
+            result = mt5.order_send(request)
+        if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE:
+            log(f"✅ SL updated for {position.symbol} #{position.ticket} → SL = {new_sl}")
+            count("sltp_modified", position.symbol)
+            return True
+        code = result.retcode if result is not None else mt5.last_error()
+        log(f"❌ SL update failed on {position.symbol} #{position.ticket} → code {code}")
+        return False
+
+    def _scale_in(self, position, add_volume):
+        result = get_executor(self.account).place({
+            "symbol": position.symbol,
+            "order_type": "buy" if position.type == mt5.POSITION_TYPE_BUY else "sell",
+            "lot": add_volume,
+            "price": None,  # the executor prices it at the fresh ask/bid
+            "magic": self.magic,
+            "comment": "SentinelFXBot scale-in",
+        })
+        if result["ok"]:
+            log(f"🔄 Scaled in {add_volume} lots on {position.symbol}")
+            return True
+        log(f"❌ Scale-in failed for {position.symbol}: {result['comment']}")
+        return False
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_position_manager(account=None):
+    """Return the PositionManager for an account, creating it on first use."""
+    key = account or "default"
+    manager = _managers.get(key)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(key)
+            if manager is None:
+                manager = _managers[key] = PositionManager(account)
+    return manager
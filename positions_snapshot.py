@@ -0,0 +1,102 @@
+"""
+One positions_get() per scan cycle, indexed by symbol, ticket and magic.
+
+The loop calls take_snapshot() at the start of each cycle; position checks
+made from the same thread (MT5Manager.has_open_position, trade_manager
+helpers) read the snapshot instead of calling the terminal again. Order
+functions call refresh_after_order() once an order_send succeeds, so the
+snapshot stays correct for the rest of the cycle.
+
+The loop calls clear_snapshot() when the cycle ends, and a snapshot older
+than one cycle interval is ignored anyway, so checks made outside a cycle
+(or from a loop that skipped the clear) go back to the terminal.
+"""
+import threading
+import time
+
+import MetaTrader5 as mt5
+
+MAX_AGE_SECONDS = 30  # one scan-cycle interval
+
+_context = threading.local()
+
+
+class PositionsSnapshot:
+    """
+    Open positions at one point in time. `ok` is False if MT5 returned None.
+    """
+
+    def __init__(self):
+        self.ok = False
+        self.fetched_at = None
+        self._positions = ()
+        self._by_symbol = {}
+        self._by_ticket = {}
+        self._by_magic = {}
+
+    def refresh(self):
+        positions = mt5.positions_get()
+        self.ok = positions is not None
+        self.fetched_at = time.time()
+        self._positions = tuple(positions or ())
+
+        by_symbol, by_ticket, by_magic = {}, {}, {}
+        for pos in self._positions:
+            by_symbol.setdefault(pos.symbol, []).append(pos)
+            by_ticket[pos.ticket] = pos
+            by_magic.setdefault(pos.magic, []).append(pos)
+        self._by_symbol, self._by_ticket, self._by_magic = by_symbol, by_ticket, by_magic
+        return self
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def symbols(self):
+        return set(self._by_symbol)
+
+    def has_symbol(self, symbol):
+        return symbol in self._by_symbol
+
+    def for_symbol(self, symbol):
+        return self._by_symbol.get(symbol, [])
+
+    def first(self, symbol):
+        """The first open position on `symbol`, or None."""
+        positions = self._by_symbol.get(symbol)
+        return positions[0] if positions else None
+
+    def get(self, ticket):
+        return self._by_ticket.get(ticket)
+
+    def for_magic(self, magic):
+        return self._by_magic.get(magic, [])
+
+
+def take_snapshot():
+    """Fetch positions once and make the snapshot current for this thread."""
+    snapshot = PositionsSnapshot().refresh()
+    _context.snapshot = snapshot
+    return snapshot
+
+
+def current_snapshot(max_age=MAX_AGE_SECONDS):
+    """This thread's current snapshot, or None if none was taken, the fetch failed or it is older than `max_age`."""
+    snapshot = getattr(_context, "snapshot", None)
+    if snapshot is None or not snapshot.ok or time.time() - snapshot.fetched_at > max_age:
+        return None
+    return snapshot
+
+
+def clear_snapshot():
+    """End this thread's cycle: later position checks query the terminal until the next take_snapshot()."""
+    _context.snapshot = None
+
+
+def refresh_after_order():
+    """Re-fetch this thread's snapshot after a successful order_send."""
+    snapshot = getattr(_context, "snapshot", None)
+    if snapshot is not None:
+        snapshot.refresh()
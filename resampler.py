@@ -0,0 +1,200 @@
+"""
+Higher timeframes built locally from one base series per symbol.
+
+One base timeframe (RESAMPLE_BASE_TIMEFRAME, M15 by default) is fetched
+per symbol, and H1/H4/D1/W1 bars are aggregated from it with vectorized
+OHLC reductions. The result has the same layout as copy_rates_from_pos.
+
+Buckets follow the broker's server time, which MT5 bar times already use:
+intraday bars align to multiples of their length, D1 to server midnight
+(shifted by RESAMPLE_DAY_OFFSET_HOURS for brokers whose day starts at
+another hour) and W1 to Sunday. The last bucket holds the forming base bar,
+so the current higher-timeframe bar stays up to date. On each refresh only
+that bucket and any newer ones are re-aggregated.
+
+Each timeframe keeps enough bars for its largest consumer (the structure
+index history or the correlation window). A request for more bars than
+the base series covers returns None, so get_candles falls back to MT5.
+"""
+import threading
+import time
+
+import numpy as np
+import MetaTrader5 as mt5
+
+try:
+    from config import (
+        BAR_STORE_ENABLED,
+        RESAMPLE_BASE_TIMEFRAME,
+        RESAMPLE_BASE_BARS,
+        RESAMPLE_DAY_OFFSET_HOURS,
+        RESAMPLE_MIN_REFRESH_SECONDS,
+        STRUCTURE_HISTORY_BARS,
+        CORRELATION_WINDOW_BARS,
+    )
+    from bar_store import RATES_DTYPE, TIMEFRAMES
+except ImportError:
+    from backend.config import (
+        BAR_STORE_ENABLED,
+        RESAMPLE_BASE_TIMEFRAME,
+        RESAMPLE_BASE_BARS,
+        RESAMPLE_DAY_OFFSET_HOURS,
+        RESAMPLE_MIN_REFRESH_SECONDS,
+        STRUCTURE_HISTORY_BARS,
+        CORRELATION_WINDOW_BARS,
+    )
+    from backend.bar_store import RATES_DTYPE, TIMEFRAMES
+
+TAIL_BARS = 16       # base bars fetched per incremental refresh
+# Aggregated bars kept per timeframe: the largest consumer's request (history + forming bar) and one spare
+MAX_AGG_BARS = max(STRUCTURE_HISTORY_BARS, CORRELATION_WINDOW_BARS) + 2
+SUNDAY_OFFSET = 3 * 86400  # 1970-01-01 was a Thursday; the 4th was a Sunday
+
+TIMEFRAME_BY_NAME = {name: tf for tf, (name, _) in TIMEFRAMES.items()}
+
+
+def bucket_starts(times, seconds, day_offset=0):
+    """Server-time bucket start for each bar time."""
+    times = np.asarray(times, dtype=np.int64)
+    if seconds >= 604800:
+        shift = SUNDAY_OFFSET + day_offset
+    elif seconds >= 86400:
+        shift = day_offset
+    else:
+        shift = 0
+    return (times - shift) // seconds * seconds + shift
+
+
+def aggregate(base, seconds, day_offset=0):
+    """Vectorized OHLC aggregation of sorted base bars into `seconds` buckets."""
+    if len(base) == 0:
+        return np.zeros(0, dtype=RATES_DTYPE)
+    keys = bucket_starts(base["time"], seconds, day_offset)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(base)])) - 1
+
+    bars = np.zeros(len(starts), dtype=RATES_DTYPE)
+    bars["time"] = keys[starts]
+    bars["open"] = base["open"][starts]
+    bars["close"] = base["close"][ends]
+    bars["high"] = np.maximum.reduceat(base["high"], starts)
+    bars["low"] = np.minimum.reduceat(base["low"], starts)
+    bars["tick_volume"] = np.add.reduceat(base["tick_volume"], starts)
+    bars["spread"] = np.minimum.reduceat(base["spread"], starts)
+    bars["real_volume"] = np.add.reduceat(base["real_volume"], starts)
+    return bars
+
+
+class SymbolResampler:
+    """
+    The base series of one symbol plus its aggregated timeframes.
+    """
+
+    def __init__(self, symbol, base_timeframe=None, base_bars=RESAMPLE_BASE_BARS):
+        self.symbol = symbol
+        self.base_timeframe = base_timeframe or TIMEFRAME_BY_NAME[RESAMPLE_BASE_TIMEFRAME]
+        self.base_seconds = TIMEFRAMES[self.base_timeframe][1]
+        self.base_bars = base_bars
+        self.day_offset = int(RESAMPLE_DAY_OFFSET_HOURS * 3600)
+        self.base = np.zeros(0, dtype=RATES_DTYPE)
+        self.last_refresh = 0.0
+        self._agg = {}  # timeframe -> aggregated bars
+        self._lock = threading.RLock()
+
+    def supports(self, timeframe):
+        seconds = TIMEFRAMES.get(timeframe, (None, 0))[1]
+        return seconds >= self.base_seconds and seconds % self.base_seconds == 0
+
+    def capacity(self, timeframe):
+        """How many bars of `timeframe` (forming bar included) the current base series yields."""
+        if timeframe == self.base_timeframe:
+            return len(self.base)
+        # A window starting mid-bucket loses its first, incomplete bar
+        return min(MAX_AGG_BARS, len(self.base) * self.base_seconds // TIMEFRAMES[timeframe][1] - 1)
+
+    # --- Base series ---
+    def _fetch(self, count):
+        if BAR_STORE_ENABLED:
+            from bar_store import get_bars
+            rates = get_bars(self.symbol, self.base_timeframe, count)
+        else:
+            rates = mt5.copy_rates_from_pos(self.symbol, self.base_timeframe, 0, count)
+        if rates is None:
+            return np.zeros(0, dtype=RATES_DTYPE)
+        return np.asarray(rates).astype(RATES_DTYPE, copy=False)
+
+    def refresh(self, force=False):
+        """Update the base series: one small tail fetch, or a full fetch after a gap."""
+        now = time.time()
+        if not force and now - self.last_refresh < RESAMPLE_MIN_REFRESH_SECONDS:
+            return
+        with self._lock:
+            self.last_refresh = now
+            if BAR_STORE_ENABLED or not len(self.base):
+                # The bar store already delta-syncs, so its window is cheap
+                self.base = self._fetch(self.base_bars)
+                return
+
+            tail = self._fetch(TAIL_BARS)
+            if not len(tail):
+                return
+            keep = np.searchsorted(self.base["time"], tail["time"][0], side="left")
+            if keep == len(self.base) and tail["time"][0] > self.base["time"][-1] + self.base_seconds:
+                self.base = self._fetch(self.base_bars)  # missed bars: refetch everything
+                return
+            base = np.concatenate((self.base[:keep], tail))
+            self.base = base[-self.base_bars:]
+
+    # --- Aggregated series ---
+    def rates(self, timeframe, count):
+        """Latest `count` bars of `timeframe`, oldest first, the last one forming."""
+        self.refresh()
+        with self._lock:
+            if timeframe == self.base_timeframe:
+                return self.base[-count:]
+            seconds = TIMEFRAMES[timeframe][1]
+            base = self.base
+            if not len(base):
+                return base
+
+            agg = self._agg.get(timeframe)
+            if agg is not None and len(agg) and agg["time"][-1] >= base["time"][0]:
+                # Re-aggregate from the last (forming) bucket onward
+                i = int(np.searchsorted(base["time"], agg["time"][-1], side="left"))
+                agg = np.concatenate((agg[:-1], aggregate(base[i:], seconds, self.day_offset)))
+            else:
+                agg = aggregate(base, seconds, self.day_offset)
+                if len(agg) and bucket_starts(base["time"][:1], seconds, self.day_offset)[0] != base["time"][0]:
+                    agg = agg[1:]  # the window starts mid-bucket: the first bar is incomplete
+            agg = agg[-MAX_AGG_BARS:]
+            self._agg[timeframe] = agg
+            return agg[-count:]
+
+
+_resamplers = {}
+_resamplers_lock = threading.Lock()
+
+
+def get_resampler(symbol):
+    resampler = _resamplers.get(symbol)
+    if resampler is None:
+        with _resamplers_lock:
+            resampler = _resamplers.get(symbol)
+            if resampler is None:
+                resampler = _resamplers[symbol] = SymbolResampler(symbol)
+    return resampler
+
+
+def get_rates(symbol, timeframe, count):
+    """
+    Bars for `timeframe` built from the symbol's base series, or None if
+    `timeframe` can't be derived from the base timeframe or the base series
+    is too short for `count` bars.
+    """
+    resampler = get_resampler(symbol)
+    if not resampler.supports(timeframe):
+        return None
+    resampler.refresh()
+    if count > resampler.capacity(timeframe):
+        return None
+    return resampler.rates(timeframe, count)
@@ -1,6 +1,10 @@
-from flask import request, jsonify, session
+import sqlite3
+
+from flask import request, jsonify, session, Response
 from flask_login import login_required
-from models import UserPreference, BotLog, db
+from models import UserPreference, BotLog, MT5Account, db
+from config import METRICS_TOKEN
+import metrics
 
 # ✅ In-memory bot runtime state
 bot_runtime_state = {}
@@ -27,8 +31,13 @@ def setup_routes(app):
         if not email:
             return jsonify({"error": "Unauthorized", "message": "Session email missing"}), 401
 
-        bot_runtime_state[email] = True
-        return jsonify({"status": "Bot started", "running": True})
+        import bot_runner  # pulls in MetaTrader5; only needed once a bot starts
+
+        mt5_account = db.session.get(MT5Account, email)
+        account = mt5_account.credentials() if mt5_account else None
+        started = bot_runner.start_bot_for_user(email, account)
+        bot_runtime_state[email] = started or bot_runtime_state.get(email, False)
+        return jsonify({"status": "Bot started" if started else "Bot not started", "running": bot_runtime_state[email]})
 
     @app.route('/api/bot/stop', methods=['POST'])
     @login_required
@@ -37,9 +46,75 @@ def setup_routes(app):
         if not email:
             return jsonify({"error": "Unauthorized", "message": "Session email missing"}), 401
 
+        import bot_runner
+
+        bot_runner.stop_bot_for_user(email)
         bot_runtime_state[email] = False
         return jsonify({"status": "Bot stopped", "running": False})
 
+    @app.route('/api/bot/account', methods=['PUT'])
+    @login_required
+    def bot_account():
+        data = request.json or {}
+        email = session.get('user_email')
+        if not email:
+            return jsonify({"error": "Unauthorized", "message": "Session email missing"}), 401
+
+        mt5_account = db.session.get(MT5Account, email)
+        if not mt5_account:
+            mt5_account = MT5Account(user_email=email)
+            db.session.add(mt5_account)
+        try:
+            mt5_account.login = int(data["login"]) if data.get("login") else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid login"}), 400
+        mt5_account.server = data.get("server") or None
+        mt5_account.terminal_path = data.get("terminal_path") or None
+        db.session.commit()
+        return jsonify({
+            "status": "Account updated",
+            "login": mt5_account.login,
+            "server": mt5_account.server,
+            "terminal_path": mt5_account.terminal_path
+        })
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        # Prometheus scrapers can't log in, so a bearer token is required; without one configured
+        # the endpoint stays hidden (series are labelled with account emails)
+        if not METRICS_TOKEN:
+            return jsonify({"error": "Not found"}), 404
+        if request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+            return jsonify({"error": "Unauthorized"}), 401
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+    @app.route('/api/bot/logs/search')
+    @login_required
+    def bot_logs_search():
+        email = session.get('user_email')
+        if not email:
+            return jsonify({"error": "Unauthorized", "message": "Session email missing"}), 401
+
+        import log_index  # sqlite index opened on the first search
+        try:
+            since = float(request.args["since"]) if request.args.get("since") else None
+            until = float(request.args["until"]) if request.args.get("until") else None
+            limit = int(request.args.get("limit", 50))
+        except ValueError:
+            return jsonify({"error": "since, until and limit must be numbers"}), 400
+
+        if not log_index.start_indexer():
+            # Backfill is the background indexer's job; without it the index never fills
+            return jsonify({"error": "Log search is disabled"}), 404
+        index = log_index.get_log_index()
+        index.catch_up(email)  # this user's newest lines, if few; the background indexer does the rest
+        try:
+            results = index.search(request.args.get("q"), user=email, symbol=request.args.get("symbol"),
+                                   event=request.args.get("event"), since=since, until=until, limit=limit)
+        except sqlite3.OperationalError as e:
+            return jsonify({"error": f"Invalid search: {e}"}), 400
+        return jsonify({"results": results, "count": len(results)})
+
     @app.route('/api/bot/settings', methods=['PATCH'])
     @login_required
     def bot_settings():
@@ -1,8 +1,16 @@
 # run_bot.py
+#
+#   python run_bot.py                    start the bot
+#   python run_bot.py startup-profile    report import/initialization time per module
 
-from bot_runner import start_bot  # Ensure bot_runner.py is in the same directory or in PYTHONPATH
+import sys
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "startup-profile":
+        from startup_profile import main as startup_profile
+        return startup_profile(sys.argv[2:])
+
+    from bot_runner import start_bot  # Ensure bot_runner.py is in the same directory or in PYTHONPATH
     print("📈 Starting Sentinel Forex Bot...")
 
     try:
@@ -15,4 +23,4 @@ def main():
         print("🧹 Cleaning up... Exit complete.")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Hot-reloadable configuration snapshots.
+
+config.py stays the source of defaults (and of env-driven values). On top
+of it, an optional JSON overrides file (CONFIG_OVERRIDES_FILE) maps setting
+names to new values. Both are merged into an immutable, versioned Snapshot;
+current() returns the active one with a plain global read, so hot paths
+never take a lock.
+
+With CONFIG_HOT_RELOAD enabled, a watcher thread polls the file and swaps
+in a new snapshot when it changes. A file with unknown names or values of
+the wrong type is rejected as a whole and the previous snapshot stays.
+Structured settings (risk tiers, sessions, holidays, retention) are also
+checked field by field. Secrets (keys, tokens, passwords) are not part of
+snapshots and can't be overridden.
+
+Only the settings in RELOADABLE can be overridden: those are the ones
+their consumers read through current(). Everything else (feature flags,
+storage paths, worker mode, ...) is read once from config.py, so an
+override for it is rejected rather than silently ignored.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+try:
+    import config
+    from config import CONFIG_OVERRIDES_FILE, CONFIG_HOT_RELOAD, CONFIG_RELOAD_SECONDS
+    from utils import log
+except ImportError:
+    from backend import config
+    from backend.config import CONFIG_OVERRIDES_FILE, CONFIG_HOT_RELOAD, CONFIG_RELOAD_SECONDS
+    from backend.utils import log
+
+
+def _freeze(value):
+    """Read-only copy: dicts become mappingproxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class Snapshot:
+    """
+    One immutable set of settings. Read values as attributes
+    (snapshot.MAX_SPREAD_PIPS) or with get().
+    """
+
+    __slots__ = ("version", "loaded_at", "overrides", "_values")
+
+    def __init__(self, version, values, overrides):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "loaded_at", time.time())
+        object.__setattr__(self, "overrides", _freeze(overrides))
+        object.__setattr__(self, "_values", _freeze(values))
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"No setting named {name}") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings snapshots are read-only")
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def as_dict(self):
+        return dict(self._values)
+
+
+SECRET_MARKERS = ("SECRET", "TOKEN", "PASSWORD", "API_KEY")
+
+
+def is_secret(name):
+    return any(marker in name for marker in SECRET_MARKERS)
+
+
+DEFAULTS = {name: value for name, value in vars(config).items() if name.isupper() and not is_secret(name)}
+
+# Settings whose consumers read them through current(); add a name here only after its readers do
+RELOADABLE = frozenset({
+    "MAX_TRADES_AT_ONCE", "MAX_SPREAD_PIPS", "MAX_STOPLOSS_PIPS", "MAX_LOT_SIZE",
+    "RISK_LARGE_ACCOUNT", "RISK_TIERS", "CORRELATION_CAP",
+    "TREND_SMA_FAST", "TREND_SMA_SLOW", "RANGE_SMA_FAST", "RANGE_SMA_SLOW", "RANGE_RATIO", "PIN_BAR_BODY_RATIO",
+    "SCORE_VOLATILITY_WEIGHT", "SCORE_SENTIMENT_WEIGHT", "SCORE_ORDER_BLOCK_BONUS", "SCORE_SR_BONUS",
+    "SCORE_TREND_STRENGTH_WEIGHT",
+    "TRAIL_TRIGGER_PCT", "SCALE_IN_ENABLED", "SCALE_IN_TRIGGER_PCT", "SCALE_IN_FACTOR", "SLTP_MIN_INTERVAL_SECONDS",
+    "TRADING_SESSIONS", "SYMBOL_SESSIONS", "MARKET_HOLIDAYS",
+    "LOG_RETENTION",
+})
+
+
+def _check_type(name, value):
+    default = DEFAULTS[name]
+    if isinstance(default, bool) or isinstance(value, bool):
+        return isinstance(default, bool) and isinstance(value, bool)
+    if isinstance(default, (int, float)):
+        return isinstance(value, (int, float)) and (isinstance(default, float) or isinstance(value, int))
+    if isinstance(default, (list, tuple)):
+        return isinstance(value, list)  # JSON has no tuples; snapshots freeze lists anyway
+    return isinstance(value, type(default))
+
+
+# --- Structured settings: each check returns an error message, or None ---
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_risk_tiers(tiers):
+    if not tiers:
+        return "needs at least one tier"
+    for tier in tiers:
+        if not isinstance(tier, dict) or set(tier) != {"balance_max", "risk_percent"}:
+            return "each tier needs exactly balance_max and risk_percent"
+        if not (_is_number(tier["balance_max"]) and _is_number(tier["risk_percent"])):
+            return "tier values must be numbers"
+        if not 0 < tier["risk_percent"] <= 1:
+            return "risk_percent must be in (0, 1]"
+    limits = [tier["balance_max"] for tier in tiers]
+    if limits != sorted(limits):
+        return "tiers must be sorted by balance_max"
+    return None
+
+
+def _check_retention(policies):
+    for name, policy in policies.items():
+        if (not isinstance(policy, dict) or not set(policy) <= {"days", "max_mb"}
+                or not all(_is_number(v) and v >= 0 for v in policy.values())):
+            return f"{name}: expected days and/or max_mb, non-negative numbers"
+    return None
+
+
+def _check_sessions(sessions):
+    for name, hours in sessions.items():
+        if (not isinstance(hours, dict) or set(hours) != {"start", "end"}
+                or not all(isinstance(h, int) and not isinstance(h, bool) and 0 <= h <= 24 for h in hours.values())):
+            return f"{name}: expected start and end hours (0-24)"
+    return None
+
+
+def _check_string_lists(mapping):
+    for key, items in mapping.items():
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            return f"{key}: expected a list of strings"
+    return None
+
+
+def _check_holidays(holidays):
+    for day in holidays:
+        try:
+            datetime.strptime(day, "%Y-%m-%d")
+        except ValueError:
+            return f"{day}: expected a YYYY-MM-DD date"
+    return _check_string_lists(holidays)
+
+
+STRUCTURE_CHECKS = {
+    "RISK_TIERS": _check_risk_tiers,
+    "LOG_RETENTION": _check_retention,
+    "TRADING_SESSIONS": _check_sessions,
+    "SYMBOL_SESSIONS": _check_string_lists,
+    "MARKET_HOLIDAYS": _check_holidays,
+}
+
+
+def load_overrides(path=CONFIG_OVERRIDES_FILE):
+    """Validated overrides from `path` ({} if it doesn't exist). Raises ValueError if invalid."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            overrides = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not valid JSON: {e}") from None
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path} must hold a JSON object")
+    secret = sorted(name for name in overrides if is_secret(name))
+    if secret:
+        raise ValueError(f"Secrets can't be overridden: {', '.join(secret)}")
+    unknown = sorted(set(overrides) - set(DEFAULTS))
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(unknown)}")
+    fixed = sorted(set(overrides) - RELOADABLE)
+    if fixed:
+        raise ValueError(f"Only read at startup, set these in config.py and restart: {', '.join(fixed)}")
+    wrong = sorted(name for name, value in overrides.items() if not _check_type(name, value))
+    if wrong:
+        raise ValueError(f"Wrong type for: {', '.join(wrong)}")
+    for name, check in STRUCTURE_CHECKS.items():
+        error = check(overrides[name]) if name in overrides else None
+        if error:
+            raise ValueError(f"Invalid {name}: {error}")
+    return overrides
+
+
+def _initial():
+    try:
+        overrides = load_overrides()
+    except (OSError, ValueError) as e:
+        log(f"⚠️ Config overrides ignored: {e}")
+        overrides = {}
+    return Snapshot(1, dict(DEFAULTS, **overrides), overrides)
+
+
+_snapshot = _initial()
+_swap_lock = threading.Lock()
+_watcher = None
+
+
+def current():
+    """The active snapshot. Lock-free: a single global read."""
+    return _snapshot
+
+
+def reload(path=CONFIG_OVERRIDES_FILE):
+    """Load the overrides file into a new snapshot and swap it in. Returns True on success."""
+    global _snapshot
+    try:
+        overrides = load_overrides(path)
+    except (OSError, ValueError) as e:
+        log(f"⚠️ Config reload rejected, keeping v{_snapshot.version}: {e}")
+        return False
+
+    with _swap_lock:
+        previous = _snapshot
+        if _freeze(overrides) == previous.overrides:
+            return True
+        snapshot = Snapshot(previous.version + 1, dict(DEFAULTS, **overrides), overrides)
+        changed = [name for name in DEFAULTS if snapshot.get(name) != previous.get(name)]
+        _snapshot = snapshot  # single reference assignment: readers see old or new, never a mix
+    if changed:
+        log(f"⚙️ Config v{snapshot.version} loaded: {', '.join(changed)} changed")
+    return True
+
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _watch(path, interval):
+    seen = None  # compare on the first pass too, in case the file changed before the watcher started
+    while True:
+        time.sleep(interval)
+        state = _file_state(path)
+        if state != seen:
+            seen = state
+            reload(path)
+
+
+def start_watcher(path=CONFIG_OVERRIDES_FILE, interval=CONFIG_RELOAD_SECONDS):
+    """Start the file watcher once per process (no-op unless CONFIG_HOT_RELOAD is enabled)."""
+    global _watcher
+    if not CONFIG_HOT_RELOAD:
+        return False
+    with _swap_lock:
+        if _watcher is not None and _watcher.is_alive():
+            return True
+        _watcher = threading.Thread(target=_watch, args=(path, interval), name="config-watcher", daemon=True)
+        _watcher.start()
+    return True
+
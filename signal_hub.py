@@ -0,0 +1,131 @@
+"""
+Shared market-data and signal fan-out across user bots.
+
+The hub runs decide_trade once per symbol per bar and stores the result in
+a shared `signals` mapping. Subscribed bots read that mapping and apply only
+their own lot sizing and position checks, so analysis cost grows with
+symbols instead of users x symbols.
+
+In thread mode the hub runs as a thread with plain dicts. In process mode the
+supervisor runs one hub process per broker server and passes its Manager
+dicts to that server's workers.
+"""
+import threading
+import time
+
+import MetaTrader5 as mt5
+
+from smc_decision_engine import decide_trade
+from utils import log
+from config import SIGNAL_HUB_POLL_SECONDS, SIGNAL_BAR_SECONDS
+
+
+class SignalHub:
+    """
+    Computes each subscribed symbol's signal once per bar.
+
+    `signals` maps symbol -> {"bar_time", "computed_at", "signal"}.
+    `subscriptions` maps user_email -> list of symbols.
+    """
+
+    def __init__(self, signals=None, subscriptions=None,
+                 poll_seconds=SIGNAL_HUB_POLL_SECONDS, bar_seconds=SIGNAL_BAR_SECONDS):
+        self.signals = signals if signals is not None else {}
+        self.subscriptions = subscriptions if subscriptions is not None else {}
+        self.poll_seconds = poll_seconds
+        self.bar_seconds = bar_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Bot side ---
+    def subscribe(self, user_email, symbols):
+        self.subscriptions[user_email] = list(symbols)
+
+    def unsubscribe(self, user_email):
+        self.subscriptions.pop(user_email, None)
+
+    def latest(self, symbol):
+        """
+        Return the current bar's signal for `symbol`, or None if there is none
+        yet or the hub hasn't caught up with the bar this bot's terminal is on.
+        """
+        entry = self.signals.get(symbol)
+        if not entry or entry["bar_time"] != self.current_bar_time(symbol):
+            return None
+        return entry["signal"]
+
+    # --- Hub side ---
+    def symbols(self):
+        subscribed = set()
+        for symbols in list(self.subscriptions.values()):
+            subscribed.update(symbols)
+        return sorted(subscribed)
+
+    def current_bar_time(self, symbol):
+        """Open time of the current analysis bar, from the symbol's server tick time."""
+        tick = mt5.symbol_info_tick(symbol)
+        if not tick:
+            return None
+        return tick.time - tick.time % self.bar_seconds
+
+    def refresh(self):
+        """Recompute every subscribed symbol whose bar changed. Returns the number recomputed."""
+        computed = 0
+        for symbol in self.symbols():
+            bar_time = self.current_bar_time(symbol)
+            if bar_time is None:
+                continue
+            entry = self.signals.get(symbol)
+            if entry and entry["bar_time"] == bar_time:
+                continue
+            try:
+                signal = decide_trade(symbol)
+            except Exception as e:
+                log(f"❌ Signal hub failed on {symbol}: {e}")
+                continue
+            self.signals[symbol] = {"bar_time": bar_time, "computed_at": time.time(), "signal": signal}
+            computed += 1
+        return computed
+
+    def run(self):
+        log("📡 Signal hub running.")
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="signal-hub", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def hub_process_main(signals, subscriptions, account=None):
+    """Entry point for the hub's own worker process (process mode)."""
+    from bot_runner import connect_terminal
+
+    if not connect_terminal(account):
+        log(f"❌ Signal hub: MT5 initialization failed: {mt5.last_error()}")
+        return
+    try:
+        SignalHub(signals, subscriptions).run()
+    finally:
+        mt5.shutdown()
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """Return the in-process hub (thread mode), starting it on first use."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = SignalHub()
+            _hub.start()
+        return _hub
@@ -1,6 +1,14 @@
+import time
 import MetaTrader5 as mt5
-from config import MAX_STOPLOSS_PIPS
+import settings
+from config import SR_INDEX_ENABLED
 from utils import log
+from metrics import stage, count
+from tick_store import current_tick
+from sr_levels import get_levels
+from filter_pipeline import Filter, FilterPipeline
+from decision_memo import note_tick, per_bar
+from log_coalesce import console
 
 from technicals import (
     detect_order_block,
@@ -11,80 +19,112 @@ from technicals import (
     get_volatility  # ✅ Make sure this function exists in your technicals
 )
 
-def get_sl_tp_by_smc(symbol, direction, entry_price):
+@per_bar(())
+def symbol_point(symbol):
     symbol_info = mt5.symbol_info(symbol)
-    point = symbol_info.point if symbol_info and symbol_info.point else 0.0001
+    return symbol_info.point if symbol_info and symbol_info.point else 0.0001
+
+def get_sl_tp_by_smc(symbol, direction, entry_price):
+    point = symbol_point(symbol)
+    max_sl_pips = settings.current().MAX_STOPLOSS_PIPS
 
     sl_zone = detect_order_block(symbol, direction)
     sl = sl_zone if sl_zone else (
-        entry_price - MAX_STOPLOSS_PIPS * point if direction == "UP"
-        else entry_price + MAX_STOPLOSS_PIPS * point
+        entry_price - max_sl_pips * point if direction == "UP"
+        else entry_price + max_sl_pips * point
     )
 
-    tp_zone = detect_support_resistance(symbol, direction)
+    if SR_INDEX_ENABLED:
+        # Next clustered level beyond entry, found by binary search
+        levels = get_levels(symbol, mt5.TIMEFRAME_H1)
+        level = levels.next_above(entry_price) if direction == "UP" else levels.next_below(entry_price)
+        tp_zone = level[0] if level else None
+    else:
+        tp_zone = detect_support_resistance(symbol, direction)
     tp = tp_zone if tp_zone else (
-        entry_price + MAX_STOPLOSS_PIPS * 2 * point if direction == "UP"
-        else entry_price - MAX_STOPLOSS_PIPS * 2 * point
+        entry_price + max_sl_pips * 2 * point if direction == "UP"
+        else entry_price - max_sl_pips * 2 * point
     )
 
     return round(sl, 5), round(tp, 5)
 
-def decide_trade(symbol, news_sentiment=None, strategy_feedback=None):
-    log(f"🔍 Scanning {symbol}...")
+def _not_ranging(symbol, ctx):
+    return not is_market_ranging(symbol)
 
-    if is_market_ranging(symbol):
-        log(f"⚠️ {symbol} is ranging. Skipping.")
-        return None
+def _has_trend(symbol, ctx):
+    ctx["trend"] = get_trend_direction(symbol)
+    return ctx["trend"] in ("UP", "DOWN")
 
-    trend = get_trend_direction(symbol)
-    if trend not in ["UP", "DOWN"]:
-        log(f"⚠️ No clear trend on {symbol}. Skipping.")
-        return None
+def _sentiment_agrees(symbol, ctx):
+    sentiment, trend = ctx["news_sentiment"], ctx["trend"]
+    return sentiment is None or not ((sentiment < 0 and trend == "UP") or (sentiment > 0 and trend == "DOWN"))
 
-    if news_sentiment is not None:
-        if (news_sentiment < 0 and trend == "UP") or (news_sentiment > 0 and trend == "DOWN"):
-            log(f"⚠️ Sentiment contradicts trend on {symbol}. Skipping.")
-            return None
+def _candle_confirmed(symbol, ctx):
+    return confirm_candle_entry(symbol)
 
-    if not confirm_candle_entry(symbol):
-        log(f"⚠️ No entry candle confirmed for {symbol}. Skipping.")
-        return None
+def _has_tick(symbol, ctx):
+    ctx["tick"] = current_tick(symbol)
+    note_tick(symbol, ctx["tick"])  # later memo lookups key on this tick's time
+    return bool(ctx["tick"])
 
-    tick = mt5.symbol_info_tick(symbol)
-    if not tick:
-        log(f"❌ No tick data for {symbol}.")
+# Declared in the original fixed order; FILTER_ADAPTIVE_ORDER reorders them per symbol
+FILTERS = FilterPipeline([
+    Filter("ranging", _not_ranging, "⚠️ {symbol} is ranging. Skipping."),
+    Filter("trend", _has_trend, "⚠️ No clear trend on {symbol}. Skipping."),
+    Filter("sentiment", _sentiment_agrees, "⚠️ Sentiment contradicts trend on {symbol}. Skipping.", ("trend",)),
+    Filter("candle", _candle_confirmed, "⚠️ No entry candle confirmed for {symbol}. Skipping."),
+    Filter("tick", _has_tick, "❌ No tick data for {symbol}."),
+])
+
+def decide_trade(symbol, news_sentiment=None, strategy_feedback=None):
+    console().sampled(("scan", symbol), f"🔍 Scanning {symbol}...")
+
+    ctx = {"news_sentiment": news_sentiment}
+    passed, _ = FILTERS.run(symbol, ctx)
+    if not passed:
         return None
+    trend, tick = ctx["trend"], ctx["tick"]
 
     entry_price = tick.ask if trend == "UP" else tick.bid
-    sl, tp = get_sl_tp_by_smc(symbol, trend, entry_price)
+    with stage("sl_tp", symbol):
+        sl, tp = get_sl_tp_by_smc(symbol, trend, entry_price)
 
     lot_size = 0.01
     if strategy_feedback and strategy_feedback.get("risk_reduction"):
         lot_size = 0.01
 
     # ✅ Scoring logic
-    base_score = abs(tp - sl)
-    score = base_score
-
-    # 🔸 Add Volatility Factor (scaled)
-    volatility = get_volatility(symbol)
-    if volatility:
-        score += volatility * 0.5  # Weight volatility moderately
-
-    # 🔸 News Sentiment Boost
-    if news_sentiment is not None and (
-        (trend == "UP" and news_sentiment > 0) or (trend == "DOWN" and news_sentiment < 0)
-    ):
-        score += abs(news_sentiment) * 0.3
-
-    # 🔸 Order Block Confidence
-    if detect_order_block(symbol, trend):
-        score += 0.2
-
-    # 🔸 Trend Strength Bonus
-    if strategy_feedback:
-        trend_strength = strategy_feedback.get("trend_strength", 0)
-        score += trend_strength * 0.4
+    with stage("scoring", symbol):
+        cfg = settings.current()
+        base_score = abs(tp - sl)
+        score = base_score
+
+        # 🔸 Add Volatility Factor (scaled)
+        volatility = get_volatility(symbol)
+        if volatility:
+            score += volatility * cfg.SCORE_VOLATILITY_WEIGHT  # Weight volatility moderately
+
+        # 🔸 News Sentiment Boost
+        if news_sentiment is not None and (
+            (trend == "UP" and news_sentiment > 0) or (trend == "DOWN" and news_sentiment < 0)
+        ):
+            score += abs(news_sentiment) * cfg.SCORE_SENTIMENT_WEIGHT
+
+        # 🔸 Order Block Confidence
+        if detect_order_block(symbol, trend):
+            score += cfg.SCORE_ORDER_BLOCK_BONUS
+
+        # 🔸 S/R Confluence: entry close to a well-tested level behind it
+        if SR_INDEX_ENABLED and volatility:
+            levels = get_levels(symbol, mt5.TIMEFRAME_H1)
+            behind = levels.next_below(entry_price) if trend == "UP" else levels.next_above(entry_price)
+            if behind and abs(entry_price - behind[0]) <= volatility:
+                score += cfg.SCORE_SR_BONUS * min(behind[1], 10) / 10
+
+        # 🔸 Trend Strength Bonus
+        if strategy_feedback:
+            trend_strength = strategy_feedback.get("trend_strength", 0)
+            score += trend_strength * cfg.SCORE_TREND_STRENGTH_WEIGHT
 
     decision = {
         "symbol": symbol,
@@ -93,9 +133,11 @@ def decide_trade(symbol, news_sentiment=None, strategy_feedback=None):
         "sl": sl,
         "tp": tp,
         "lot": lot_size,
-        "score": round(score, 5)
+        "score": round(score, 5),
+        "signal_time": time.time()
     }
 
+    count("signal", symbol)
     log(f"✅ Signal for {symbol} → {decision['type'].upper()} @ {entry_price} | "
         f"SL: {sl} | TP: {tp} | Score: {decision['score']}")
     return decision
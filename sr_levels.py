@@ -0,0 +1,154 @@
+"""
+Clustered support/resistance levels per (symbol, timeframe).
+
+Swing highs and lows from the structure index are bucketed into price
+bins one cluster-width wide (a fraction of the average bar range). A bin
+is a level when it holds at least SR_MIN_TOUCHES swings and more than
+its neighbours, i.e. where swings concentrate rather than merely occur.
+The level price is the mean of its swings and the swing count is its
+touch count.
+
+Levels are kept in a sorted array, so "next level above/below price" is
+a binary search. A new swing only changes its own bin and the two next
+to it, so the array is updated per bar without reclustering; the result
+is the same as a full rebuild with the same bin width. The width itself
+follows the average bar range, so once that drifts more than
+SR_WIDTH_DRIFT from the width in use, the levels are rebuilt.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+try:
+    from config import SR_CLUSTER_RANGE_FRACTION, SR_MIN_TOUCHES, SR_WIDTH_DRIFT
+    from structure_index import get_structure
+except ImportError:
+    from backend.config import SR_CLUSTER_RANGE_FRACTION, SR_MIN_TOUCHES, SR_WIDTH_DRIFT
+    from backend.structure_index import get_structure
+
+RANGE_BARS = 100  # bars averaged for the cluster width
+
+
+class LevelIndex:
+    """
+    S/R levels for one (symbol, timeframe), fed from its StructureIndex.
+    """
+
+    def __init__(self, symbol, timeframe, min_touches=SR_MIN_TOUCHES):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.min_touches = min_touches
+        self.width = 0.0
+        self._bins = {}                       # bin number -> [sum of prices, count]
+        self._keys, self._levels, self._touches = [], [], []  # level bins, sorted
+        self._generation = None
+        self._consumed = 0
+        self._lock = threading.RLock()
+
+    # --- Building ---
+    def sync(self, structure):
+        """Bring the levels up to date with `structure` (a StructureIndex)."""
+        with self._lock:
+            if structure.generation != self._generation or self._drifted(structure):
+                self._build(structure)
+            elif len(structure.swings) > self._consumed:
+                for _, _, price in structure.swings[self._consumed:]:
+                    self._insert(price)
+                self._consumed = len(structure.swings)
+
+    @staticmethod
+    def _width(structure):
+        ranges = (structure.high - structure.low)[-RANGE_BARS:]
+        return float(ranges.mean()) * SR_CLUSTER_RANGE_FRACTION if len(ranges) else 0.0
+
+    def _drifted(self, structure):
+        """True once the bin width for the latest bars differs from the one in use by more than SR_WIDTH_DRIFT."""
+        width = self._width(structure)
+        if self.width <= 0:
+            return width > 0
+        return abs(width - self.width) > SR_WIDTH_DRIFT * self.width
+
+    def _build(self, structure, width=None):
+        """Bin every swing and find the level bins in one vectorized pass (at `width`, default: current)."""
+        self._generation = structure.generation
+        self._consumed = len(structure.swings)
+        self._bins, self._keys, self._levels, self._touches = {}, [], [], []
+
+        self.width = self._width(structure) if width is None else width
+        prices = np.array([s[2] for s in structure.swings], dtype=float)
+        if not len(prices) or self.width <= 0:
+            return
+
+        bins = np.floor(prices / self.width).astype(np.int64)
+        keys, inverse, counts = np.unique(bins, return_inverse=True, return_counts=True)
+        sums = np.bincount(inverse, weights=prices)
+        self._bins = {int(k): [float(s), int(c)] for k, s, c in zip(keys, sums, counts)}
+
+        # Neighbour counts (0 where the neighbouring bin is empty)
+        left = np.where(np.concatenate(([False], np.diff(keys) == 1)), np.concatenate(([0], counts[:-1])), 0)
+        right = np.where(np.concatenate((np.diff(keys) == 1, [False])), np.concatenate((counts[1:], [0])), 0)
+        peak = (counts >= self.min_touches) & (counts > left) & (counts >= right)
+        self._keys = keys[peak].tolist()
+        self._levels = (sums[peak] / counts[peak]).tolist()
+        self._touches = counts[peak].tolist()
+
+    def _count(self, key):
+        entry = self._bins.get(key)
+        return entry[1] if entry else 0
+
+    def _is_level(self, key):
+        n = self._count(key)
+        return n >= self.min_touches and n > self._count(key - 1) and n >= self._count(key + 1)
+
+    def _insert(self, price):
+        """Add one swing and re-check the level status of its bin and both neighbours."""
+        if self.width <= 0:
+            return
+        key = int(np.floor(price / self.width))
+        entry = self._bins.setdefault(key, [0.0, 0])
+        entry[0] += price
+        entry[1] += 1
+
+        for k in (key - 1, key, key + 1):
+            i = bisect_left(self._keys, k)
+            listed = i < len(self._keys) and self._keys[i] == k
+            if listed:
+                del self._keys[i], self._levels[i], self._touches[i]
+            if self._is_level(k):
+                total, n = self._bins[k]
+                self._keys.insert(i, k)
+                self._levels.insert(i, total / n)
+                self._touches.insert(i, n)
+
+    # --- Queries ---
+    def levels(self):
+        """All levels as (price, touches), low to high."""
+        return list(zip(self._levels, self._touches))
+
+    def next_above(self, price):
+        """Nearest level strictly above `price` as (level, touches), or None."""
+        i = bisect_right(self._levels, price)
+        return (self._levels[i], self._touches[i]) if i < len(self._levels) else None
+
+    def next_below(self, price):
+        """Nearest level strictly below `price` as (level, touches), or None."""
+        i = bisect_left(self._levels, price) - 1
+        return (self._levels[i], self._touches[i]) if i >= 0 else None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_levels(symbol, timeframe):
+    """Return the (symbol, timeframe) level index, synced with its structure index."""
+    key = (symbol, timeframe)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = LevelIndex(symbol, timeframe)
+    index.sync(get_structure(symbol, timeframe))
+    return index
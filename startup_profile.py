@@ -0,0 +1,133 @@
+"""
+Startup profile: import and initialization time per module.
+
+Each target starts in a fresh interpreter under `-X importtime`, imports its
+entry module, then times its deferred initialization steps (terminal
+symbol detection, database tables). The report lists the slowest imports,
+the project modules' own import cost and each initialization step.
+
+Usage:
+    python startup_profile.py [bot|worker|app ...] [--top N]
+    python run_bot.py startup-profile [...]
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# target -> (entry module, [(step label, "module" to import or "module:function" to call), ...])
+TARGETS = {
+    "bot": ("bot_runner", [("symbol detection", "symbol_utils:get_symbols_to_trade")]),
+    "worker": ("bot_supervisor", [("bot_runner import (in the worker)", "bot_runner"),
+                                  ("symbol detection", "symbol_utils:get_symbols_to_trade")]),
+    "app": ("app", [("database tables", "app:init_db")]),
+}
+
+RESULT_MARKER = "STARTUP_PROFILE "
+
+
+def _child(target):
+    """Runs inside the profiled interpreter: import, run the init steps, print timings."""
+    module, steps = TARGETS[target]
+    result = {"import_ms": 0.0, "init": [], "error": None}
+    try:
+        started = time.perf_counter()
+        importlib.import_module(module)
+        result["import_ms"] = (time.perf_counter() - started) * 1000
+        for label, ref in steps:
+            name, _, func = ref.partition(":")
+            started = time.perf_counter()
+            loaded = importlib.import_module(name)
+            if func:
+                getattr(loaded, func)()
+            result["init"].append((label, (time.perf_counter() - started) * 1000))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    print(RESULT_MARKER + json.dumps(result), flush=True)
+
+
+def parse_importtime(stderr):
+    """-X importtime lines as [(module, self_ms, cumulative_ms, depth)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            head, cumulative_us, name = line.split("|", 2)
+            self_us = int(head.split(":")[1])
+            cumulative_us = int(cumulative_us)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), self_us / 1000, cumulative_us / 1000, depth))
+    return rows
+
+
+def project_modules():
+    return {name[:-3] for name in os.listdir(REPO_ROOT) if name.endswith(".py")}
+
+
+def profile(target, top=15):
+    """Profile one target in a fresh interpreter and print its report."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", target],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+    if result is None:
+        print(f"❌ {target}: profiler produced no result\n{proc.stderr[-2000:]}")
+        return None
+
+    rows = parse_importtime(proc.stderr)
+    own = project_modules()
+    print(f"\n🚀 {target}: import {result['import_ms']:.1f} ms, process total {wall_ms:.1f} ms")
+    if result["error"]:
+        print(f"   ⚠️ stopped early: {result['error']}")
+
+    print("   Slowest imports (cumulative / self, ms):")
+    for name, self_ms, cumulative_ms, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"     {cumulative_ms:9.1f} {self_ms:8.1f}  {'  ' * min(depth, 4)}{name}")
+
+    project = sorted(((n, s, c) for n, s, c, _ in rows if n.split(".")[0] in own or n.startswith("backend.")),
+                     key=lambda r: r[1], reverse=True)
+    print("   Project modules (self / cumulative, ms):")
+    for name, self_ms, cumulative_ms in project[:top]:
+        print(f"     {self_ms:9.1f} {cumulative_ms:8.1f}  {name}")
+
+    for label, ms in result["init"]:
+        print(f"   ⚙️ init: {label} {ms:.1f} ms")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import and initialization time per module")
+    parser.add_argument("targets", nargs="*", help=f"any of: {', '.join(TARGETS)} (default: all)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, REPO_ROOT)
+        _child(args.child)
+        return 0
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+    for target in args.targets or list(TARGETS):
+        profile(target, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
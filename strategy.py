@@ -1,6 +1,14 @@
 from .utils import log
+from .metrics import stage, count
+from .tick_store import current_tick
+import time
 import MetaTrader5 as mt5
-from backend.config import MAX_STOPLOSS_PIPS
+from backend import settings
+from backend.config import SR_INDEX_ENABLED
+from .sr_levels import get_levels
+from .filter_pipeline import Filter, FilterPipeline
+from .decision_memo import note_tick, per_bar
+from .log_coalesce import console
 from .technicals import (
     detect_order_block,
     detect_support_resistance,
@@ -9,72 +17,91 @@ from .technicals import (
     get_trend_direction
 )
 
+@per_bar(())
+def symbol_point(symbol):
+    symbol_info = mt5.symbol_info(symbol)
+    return symbol_info.point if symbol_info and symbol_info.point else 0.0001
+
 def get_sl_tp_by_smc(symbol, direction, entry_price):
     """
     Determine Stop Loss and Take Profit based on SMC zones:
     - SL: Use recent Order Block or fallback to max SL
     - TP: Use opposite Support/Resistance
     """
-    symbol_info = mt5.symbol_info(symbol)
-    point = symbol_info.point if symbol_info and symbol_info.point else 0.0001
+    point = symbol_point(symbol)
+    max_sl_pips = settings.current().MAX_STOPLOSS_PIPS
 
     # ✅ Stop Loss logic
     sl_zone = detect_order_block(symbol, direction)
     sl = sl_zone if sl_zone else (
-        entry_price - MAX_STOPLOSS_PIPS * point if direction == "UP"
-        else entry_price + MAX_STOPLOSS_PIPS * point
+        entry_price - max_sl_pips * point if direction == "UP"
+        else entry_price + max_sl_pips * point
     )
 
     # ✅ Take Profit logic
-    tp_zone = detect_support_resistance(symbol, direction)
+    if SR_INDEX_ENABLED:
+        # Next clustered level beyond entry, found by binary search
+        levels = get_levels(symbol, mt5.TIMEFRAME_H1)
+        level = levels.next_above(entry_price) if direction == "UP" else levels.next_below(entry_price)
+        tp_zone = level[0] if level else None
+    else:
+        tp_zone = detect_support_resistance(symbol, direction)
     tp = tp_zone if tp_zone else (
-        entry_price + MAX_STOPLOSS_PIPS * 2 * point if direction == "UP"
-        else entry_price - MAX_STOPLOSS_PIPS * 2 * point
+        entry_price + max_sl_pips * 2 * point if direction == "UP"
+        else entry_price - max_sl_pips * 2 * point
     )
 
     return round(sl, 5), round(tp, 5)
 
+def _not_ranging(symbol, ctx):
+    return not is_market_ranging(symbol)
+
+def _has_trend(symbol, ctx):
+    ctx["trend"] = get_trend_direction(symbol)
+    return ctx["trend"] in ("UP", "DOWN")
+
+def _sentiment_agrees(symbol, ctx):
+    sentiment, trend = ctx["news_sentiment"], ctx["trend"]
+    contradiction = (
+        (sentiment < 0 and trend == "UP") or
+        (sentiment > 0 and trend == "DOWN")
+    ) if sentiment is not None else False
+    return not contradiction
+
+def _candle_confirmed(symbol, ctx):
+    return confirm_candle_entry(symbol)
+
+def _has_tick(symbol, ctx):
+    ctx["tick"] = current_tick(symbol)
+    note_tick(symbol, ctx["tick"])  # later memo lookups key on this tick's time
+    return bool(ctx["tick"])
+
+# Declared in the original fixed order; FILTER_ADAPTIVE_ORDER reorders them per symbol
+FILTERS = FilterPipeline([
+    Filter("ranging", _not_ranging, "⚠️ {symbol} is ranging. Skipping."),
+    Filter("trend", _has_trend, "⚠️ No trend direction detected for {symbol}. Skipping."),
+    Filter("sentiment", _sentiment_agrees, "⚠️ Sentiment contradicts trend on {symbol}. Skipping.", ("trend",)),
+    Filter("candle", _candle_confirmed, "⚠️ Entry candle not confirmed for {symbol}. Skipping."),
+    Filter("tick", _has_tick, "❌ No tick data for {symbol}. Skipping."),
+])
+
 def decide_trade(symbol, news_sentiment=None, strategy_feedback=None):
     """
     Main SMC Trade Decision Engine.
     Filters structure, sentiment, and candle logic to issue precise trades.
     """
-    log(f"🔍 Analyzing {symbol} for potential setup...")
-
-    # 1️⃣ Market Structure Filter
-    if is_market_ranging(symbol):
-        log(f"⚠️ {symbol} is ranging. Skipping.")
-        return None
-
-    # 2️⃣ Trend Filter
-    trend = get_trend_direction(symbol)
-    if trend not in ["UP", "DOWN"]:
-        log(f"⚠️ No trend direction detected for {symbol}. Skipping.")
-        return None
-
-    # 3️⃣ Sentiment Filter
-    if news_sentiment is not None:
-        contradiction = (
-            (news_sentiment < 0 and trend == "UP") or 
-            (news_sentiment > 0 and trend == "DOWN")
-        )
-        if contradiction:
-            log(f"⚠️ Sentiment contradicts trend on {symbol}. Skipping.")
-            return None
-
-    # 4️⃣ Entry Candle Confirmation
-    if not confirm_candle_entry(symbol):
-        log(f"⚠️ Entry candle not confirmed for {symbol}. Skipping.")
-        return None
+    console().sampled(("scan", symbol), f"🔍 Analyzing {symbol} for potential setup...")
 
-    # 5️⃣ Tick and Order Setup
-    tick = mt5.symbol_info_tick(symbol)
-    if not tick:
-        log(f"❌ No tick data for {symbol}. Skipping.")
+    # 1️⃣-5️⃣ Structure, trend, sentiment, entry candle and tick filters
+    ctx = {"news_sentiment": news_sentiment}
+    passed, _ = FILTERS.run(symbol, ctx)
+    if not passed:
         return None
+    trend, tick = ctx["trend"], ctx["tick"]
 
     entry_price = tick.ask if trend == "UP" else tick.bid
-    sl, tp = get_sl_tp_by_smc(symbol, trend, entry_price)
+    with stage("sl_tp", symbol):
+        sl, tp = get_sl_tp_by_smc(symbol, trend, entry_price)
 
     # 🛡️ Risk Management
     lot_size = 0.01
@@ -87,8 +114,10 @@ def decide_trade(symbol, news_sentiment=None, strategy_feedback=None):
         "entry_price": entry_price,
         "sl": sl,
         "tp": tp,
-        "lot": lot_size
+        "lot": lot_size,
+        "signal_time": time.time()
     }
 
+    count("signal", symbol)
     log(f"✅ SMC Trade Signal [{symbol}] → {decision['type'].upper()} @ {entry_price} | SL: {sl} | TP: {tp}")
     return decision
@@ -1,5 +1,10 @@
 import MetaTrader5 as mt5
 
+try:
+    from structure_index import get_structure
+except ImportError:
+    from backend.structure_index import get_structure
+
 def get_candles(symbol, timeframe, count=100):
     """
     Fetch candlestick data for a symbol and timeframe.
@@ -9,57 +14,35 @@ def get_candles(symbol, timeframe, count=100):
     return rates if rates is not None else []
 
 
-def detect_structure_break(symbol, timeframe=mt5.TIMEFRAME_H1):
+def detect_structure_break(symbol, timeframe=mt5.TIMEFRAME_H1, max_age_bars=5):
     """
-    Detects:
-    - BOS_UP: Break of previous highs (bullish BOS)
-    - BOS_DOWN: Break of previous lows (bearish BOS)
-    - CHoCH: Lower high and higher low inside a range (change of character)
-    - NONE: No meaningful structure change
+    Latest structure event from the full-history structure index:
+    - BOS_UP: Close above the last swing high, continuing an up move
+    - BOS_DOWN: Close below the last swing low, continuing a down move
+    - CHoCH: First break against the previous event's direction
+    - NONE: No event within the last `max_age_bars` closed bars
     """
-    candles = get_candles(symbol, timeframe, 30)
-    if len(candles) < 5:
+    index = get_structure(symbol, timeframe)
+    if len(index.time) < 5:
         return None
 
-    highs = [candle['high'] for candle in candles]
-    lows = [candle['low'] for candle in candles]
-
-    recent_highs = highs[-5:]
-    recent_lows = lows[-5:]
-
-    if recent_highs[-1] > max(recent_highs[:-1]):
-        return "BOS_UP"
-    elif recent_lows[-1] < min(recent_lows[:-1]):
-        return "BOS_DOWN"
-    elif (
-        recent_lows[-1] > min(recent_lows[:-1]) and
-        recent_highs[-1] < max(recent_highs[:-1])
-    ):
-        return "CHoCH"
-    else:
+    event = index.last_event()
+    if not event or event["time"] < index.time[-min(max_age_bars, len(index.time))]:
         return "NONE"
+    if event["kind"] == "CHoCH":
+        return "CHoCH"
+    return f"BOS_{event['direction']}"
 
 
 def detect_mitigation_zone(symbol, direction, timeframe=mt5.TIMEFRAME_H1):
     """
-    Detect mitigation zone (unmitigated order block).
-    - For "UP": Finds last bearish candle → returns its body (low, high)
-    - For "DOWN": Finds last bullish candle → returns its body (low, high)
+    Nearest unmitigated order block to the last close, as (low, high).
+    - For "UP": demand zone at or below price
+    - For "DOWN": supply zone at or above price
     """
-    candles = get_candles(symbol, timeframe, 20)
-    if not candles:
+    index = get_structure(symbol, timeframe)
+    if not len(index.close):
         return None
 
-    if direction.upper() == "UP":
-        # Look for last bearish candle (potential demand zone)
-        for c in reversed(candles):
-            if c['close'] < c['open']:
-                return (c['low'], c['high'])
-
-    elif direction.upper() == "DOWN":
-        # Look for last bullish candle (potential supply zone)
-        for c in reversed(candles):
-            if c['close'] > c['open']:
-                return (c['low'], c['high'])
-
-    return None
+    zone = index.nearest_zone(direction.upper(), index.close[-1])
+    return (zone[0], zone[1]) if zone else None
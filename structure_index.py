@@ -0,0 +1,381 @@
+"""
+Full-history market structure index per (symbol, timeframe).
+
+Tracks:
+  - swing highs/lows (fractals: the extreme of STRUCTURE_SWING_BARS bars
+    on each side), confirmed STRUCTURE_SWING_BARS bars after the swing
+  - BOS/CHoCH events: a close through the latest swing level. An event in
+    the same direction as the previous one is a BOS, otherwise a CHoCH.
+  - order-block zones: on each event, the last opposite-colored candle
+    before the impulse. A demand zone is mitigated once a later bar trades
+    down into it; a supply zone once a later bar trades up into it.
+
+The first build runs vectorized over the whole history. After that, each
+new closed bar is applied with a constant-time step. Bars live in buffers
+with spare capacity holding the latest `history` bars, so appending is
+amortized O(1). Unmitigated zones are kept sorted (demand by top, supply by
+bottom), so nearest-zone queries and mitigation are bisect operations.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from config import STRUCTURE_SWING_BARS, STRUCTURE_HISTORY_BARS, STRUCTURE_MIN_UPDATE_SECONDS
+    from technicals import get_candles
+except ImportError:
+    from backend.config import STRUCTURE_SWING_BARS, STRUCTURE_HISTORY_BARS, STRUCTURE_MIN_UPDATE_SECONDS
+    from backend.technicals import get_candles
+
+UPDATE_BARS = 50  # bars fetched per incremental update
+
+
+class _ZoneSet:
+    """Unmitigated zones of one side, sorted by their key edge."""
+
+    def __init__(self):
+        self.keys = []
+        self.zones = []
+
+    def add(self, key, zone):
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.zones.insert(i, zone)
+
+    def __len__(self):
+        return len(self.zones)
+
+
+class StructureIndex:
+    """
+    Swings, structure events and order-block zones for one (symbol, timeframe).
+    """
+
+    def __init__(self, symbol, timeframe, swing_bars=STRUCTURE_SWING_BARS, history=STRUCTURE_HISTORY_BARS):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.k = swing_bars
+        self.history = history
+        self._buffers = None  # time, open, high, low, close with spare capacity
+        self._start = 0       # first live bar in the buffers
+        self.time = np.zeros(0, dtype=np.int64)
+        self.open = self.high = self.low = self.close = np.zeros(0)
+        self.swings = []   # (time, "HIGH"/"LOW", level)
+        self.events = []   # dicts: time, kind ("BOS"/"CHoCH"), direction, level
+        self.demand = _ZoneSet()  # keyed by zone top
+        self.supply = _ZoneSet()  # keyed by zone bottom
+        self._last_high = None    # (index, level, broken) of the latest swing high
+        self._last_low = None
+        self.generation = 0       # bumped on every full rebuild
+        self._next_update = 0.0
+        self._lock = threading.RLock()
+
+    # --- Data ---
+    @staticmethod
+    def _closed(candles):
+        """Drop the forming bar."""
+        return candles[:-1] if len(candles) else candles
+
+    def _load(self, columns, capacity=0):
+        """Copy (time, open, high, low, close) into new buffers with room to append."""
+        n = len(columns[0])
+        capacity = max(capacity, 2 * self.history, 2 * n)
+        self._buffers = (np.empty(capacity, dtype=np.int64),) + tuple(np.empty(capacity) for _ in range(4))
+        for buffer, column in zip(self._buffers, columns):
+            buffer[:n] = column
+        self._start = 0
+        self._views(n)
+
+    def _views(self, n):
+        end = self._start + n
+        self.time, self.open, self.high, self.low, self.close = (b[self._start:end] for b in self._buffers)
+
+    def _append(self, times, fresh):
+        """
+        Append bars in place. When the buffers are full, the live bars move
+        into new ones (so views handed out earlier stay intact), doubling the
+        capacity if they don't fit.
+        """
+        n, add = len(self.time), len(times)
+        if self._start + n + add > len(self._buffers[0]):
+            self._load((self.time, self.open, self.high, self.low, self.close), 2 * (n + add))
+        end = self._start + n
+        for buffer, column in zip(self._buffers, (times, fresh["open"], fresh["high"], fresh["low"], fresh["close"])):
+            buffer[end:end + add] = column
+        self._views(n + add)
+
+    def _trim(self):
+        """Drop bars older than the latest `history`, shifting the stored swing indexes."""
+        drop = len(self.time) - self.history
+        if drop <= 0:
+            return
+        self._start += drop
+        self._views(self.history)
+        for swing in (self._last_high, self._last_low):
+            if swing:
+                swing[0] = max(0, swing[0] - drop)
+
+    def build(self, candles=None):
+        """Rebuild everything from the full history in vectorized passes."""
+        if candles is None:
+            candles = self._closed(get_candles(self.symbol, self.timeframe, self.history + 1))
+        candles = candles[-self.history:] if self.history else candles[:0]
+        with self._lock:
+            self._load((candles["time"], candles["open"], candles["high"], candles["low"], candles["close"]))
+            self.swings, self.events = [], []
+            self.demand, self.supply = _ZoneSet(), _ZoneSet()
+            self._last_high = self._last_low = None
+            self._build_vectorized()
+            self.generation += 1
+
+    def update(self, force=False):
+        """Append newly closed bars. Falls back to a rebuild after a gap."""
+        now = time.time()
+        if not force and now < self._next_update:
+            return 0
+        self._next_update = now + STRUCTURE_MIN_UPDATE_SECONDS
+
+        with self._lock:
+            if not len(self.time):
+                self.build()
+                return len(self.time)
+
+            candles = self._closed(get_candles(self.symbol, self.timeframe, UPDATE_BARS + 1))
+            if len(candles) == 0:
+                return 0
+            times = np.asarray(candles["time"], dtype=np.int64)
+            new = times > self.time[-1]
+            if not new.any():
+                return 0
+            if new.all():
+                # More new bars than one update covers: rebuild from the full history
+                self.build()
+                return len(self.time)
+
+            fresh = candles[new]
+            n = len(self.time)
+            self._append(times[new], fresh)
+            for i in range(n, len(self.time)):
+                self._step(i)
+            self._trim()
+            return len(fresh)
+
+    # --- Warm start ---
+    def export_state(self):
+        """(bars, meta): time and OHLC arrays plus the derived state as plain JSON types."""
+        with self._lock:
+            bars = {"time": self.time, "ohlc": np.vstack((self.open, self.high, self.low, self.close))}
+            meta = {
+                "swing_bars": self.k,
+                "history": self.history,
+                "swings": self.swings,
+                "events": self.events,
+                "demand": self.demand.zones,
+                "supply": self.supply.zones,
+                "last_high": self._last_high,
+                "last_low": self._last_low,
+            }
+            return bars, meta
+
+    def restore_state(self, bars, meta):
+        """
+        Install exported state. The arrays may be read-only memmaps; they're
+        copied into this index's own buffers. Returns False on a settings
+        mismatch.
+        """
+        if meta["swing_bars"] != self.k or meta["history"] != self.history:
+            return False
+        with self._lock:
+            self._load((bars["time"], *bars["ohlc"]))
+            self.swings = [tuple(s) for s in meta["swings"]]
+            self.events = list(meta["events"])
+            self.demand, self.supply = _ZoneSet(), _ZoneSet()
+            for zone in map(tuple, meta["demand"]):
+                self.demand.add(zone[1], zone)
+            for zone in map(tuple, meta["supply"]):
+                self.supply.add(zone[0], zone)
+            self._last_high = meta["last_high"]
+            self._last_low = meta["last_low"]
+            self._next_update = 0.0  # fetch the bars closed since the snapshot on first use
+            self.generation += 1
+        return True
+
+    # --- Queries ---
+    def last_event(self):
+        return self.events[-1] if self.events else None
+
+    def zones(self, direction):
+        """Unmitigated zones as (low, high, ob_time, created_time): demand for "UP", supply for "DOWN"."""
+        return list((self.demand if direction == "UP" else self.supply).zones)
+
+    def nearest_zone(self, direction, price):
+        """
+        Nearest unmitigated zone to `price`: for "UP" the demand zone with the
+        highest top at or below price, for "DOWN" the supply zone with the
+        lowest bottom at or above price. O(log n).
+        """
+        with self._lock:
+            if direction == "UP":
+                i = bisect_right(self.demand.keys, price) - 1
+                return self.demand.zones[i] if i >= 0 else None
+            i = bisect_left(self.supply.keys, price)
+            return self.supply.zones[i] if i < len(self.supply) else None
+
+    # --- Shared rules ---
+    def _add_event(self, i, direction, level, swing_index):
+        previous = self.events[-1]["direction"] if self.events else None
+        kind = "BOS" if previous in (None, direction) else "CHoCH"
+        self.events.append({"time": int(self.time[i]), "kind": kind, "direction": direction, "level": level})
+
+        # Order block: last opposite candle up to the impulse's extreme
+        if direction == "UP":
+            m = swing_index + int(np.argmin(self.low[swing_index:i + 1]))
+            candles = np.nonzero(self.close[swing_index:m + 1] < self.open[swing_index:m + 1])[0]
+        else:
+            m = swing_index + int(np.argmax(self.high[swing_index:i + 1]))
+            candles = np.nonzero(self.close[swing_index:m + 1] > self.open[swing_index:m + 1])[0]
+        if not len(candles):
+            return
+        ob = swing_index + int(candles[-1])
+        # (low, high, order-block candle time, creation bar time)
+        zone = (float(self.low[ob]), float(self.high[ob]), int(self.time[ob]), int(self.time[i]))
+        if direction == "UP":
+            self.demand.add(zone[1], zone)
+        else:
+            self.supply.add(zone[0], zone)
+
+    def _mitigate(self, low, high):
+        """Remove zones the bar traded into."""
+        cut = bisect_left(self.demand.keys, low)
+        if cut < len(self.demand):
+            del self.demand.keys[cut:], self.demand.zones[cut:]
+        cut = bisect_right(self.supply.keys, high)
+        if cut:
+            del self.supply.keys[:cut], self.supply.zones[:cut]
+
+    # --- Incremental path ---
+    def _step(self, i):
+        """Apply closed bar i: confirm the swing at i-k, mitigate, then check for breaks."""
+        k = self.k
+        j = i - k
+        if j >= k:
+            if self.high[j] == self.high[j - k:i + 1].max():
+                self._last_high = [j, float(self.high[j]), False]
+                self.swings.append((int(self.time[j]), "HIGH", float(self.high[j])))
+            if self.low[j] == self.low[j - k:i + 1].min():
+                self._last_low = [j, float(self.low[j]), False]
+                self.swings.append((int(self.time[j]), "LOW", float(self.low[j])))
+
+        self._mitigate(self.low[i], self.high[i])
+
+        close = self.close[i]
+        if self._last_high and not self._last_high[2] and close > self._last_high[1]:
+            self._last_high[2] = True
+            self._add_event(i, "UP", self._last_high[1], self._last_high[0])
+        if self._last_low and not self._last_low[2] and close < self._last_low[1]:
+            self._last_low[2] = True
+            self._add_event(i, "DOWN", self._last_low[1], self._last_low[0])
+
+    # --- Vectorized full build ---
+    def _build_vectorized(self):
+        n, k = len(self.time), self.k
+        if n < 2 * k + 1:
+            for i in range(n):
+                self._step(i)
+            return
+
+        windows = 2 * k + 1
+        centers = np.arange(k, n - k)
+        pivot_high = self.high[k:n - k] == sliding_window_view(self.high, windows).max(axis=1)
+        pivot_low = self.low[k:n - k] == sliding_window_view(self.low, windows).min(axis=1)
+        high_idx, low_idx = centers[pivot_high], centers[pivot_low]
+
+        swings = [(int(self.time[j]), "HIGH", float(self.high[j])) for j in high_idx]
+        swings += [(int(self.time[j]), "LOW", float(self.low[j])) for j in low_idx]
+        swings.sort(key=lambda s: (s[0], s[1] != "HIGH"))
+        self.swings = swings
+
+        def first_breaks(idx, above):
+            """For each swing, the first bar (after confirmation) whose close breaks it."""
+            active = np.full(n, -1)
+            active[idx + k] = np.arange(len(idx))       # swing number current from its confirmation bar
+            active = np.maximum.accumulate(active)
+            has = active >= 0
+            levels = np.where(has, (self.high if above else self.low)[idx][np.maximum(active, 0)], np.nan)
+            crossed = has & ((self.close > levels) if above else (self.close < levels))
+            swing_no, first = np.unique(active[crossed], return_index=True)
+            return np.nonzero(crossed)[0][first], idx[swing_no]
+
+        up_bars, up_swings = first_breaks(high_idx, True)
+        down_bars, down_swings = first_breaks(low_idx, False)
+
+        bars = np.concatenate((up_bars, down_bars))
+        swing_of = np.concatenate((up_swings, down_swings))
+        is_down = np.concatenate((np.zeros(len(up_bars), bool), np.ones(len(down_bars), bool)))
+        order = np.lexsort((is_down, bars))
+        for e in order:
+            i, j = int(bars[e]), int(swing_of[e])
+            if is_down[e]:
+                self._add_event(i, "DOWN", float(self.low[j]), j)
+            else:
+                self._add_event(i, "UP", float(self.high[j]), j)
+
+        # Zones were added unconditionally; keep those no later bar traded into
+        future_low = np.minimum.accumulate(self.low[::-1])[::-1]
+        future_high = np.maximum.accumulate(self.high[::-1])[::-1]
+        for zones, demand in ((self.demand, True), (self.supply, False)):
+            kept = _ZoneSet()
+            for key, zone in zip(zones.keys, zones.zones):
+                after = int(np.searchsorted(self.time, zone[3])) + 1
+                if after >= n or (future_low[after] > zone[1] if demand else future_high[after] < zone[0]):
+                    kept.add(key, zone)
+            if demand:
+                self.demand = kept
+            else:
+                self.supply = kept
+
+        # Carry the state the incremental path needs
+        if len(high_idx):
+            j = int(high_idx[-1])
+            self._last_high = [j, float(self.high[j]), bool(j in set(up_swings.tolist()))]
+        if len(low_idx):
+            j = int(low_idx[-1])
+            self._last_low = [j, float(self.low[j]), bool(j in set(down_swings.tolist()))]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_structure(symbol, timeframe):
+    """Return the (symbol, timeframe) index, built on first use and updated (throttled) on each call."""
+    key = (symbol, timeframe)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = StructureIndex(symbol, timeframe)
+    index.update()
+    return index
+
+
+def all_structures():
+    """Every index built so far."""
+    with _indexes_lock:
+        return list(_indexes.values())
+
+
+def restore_structure(symbol, timeframe, bars, meta):
+    """Install a warm-start snapshot for (symbol, timeframe) unless it's already built."""
+    with _indexes_lock:
+        if (symbol, timeframe) in _indexes:
+            return False
+        index = StructureIndex(symbol, timeframe)
+        if not index.restore_state(bars, meta):
+            return False
+        _indexes[(symbol, timeframe)] = index
+    return True
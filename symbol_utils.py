@@ -1,3 +1,5 @@
+import threading
+
 import MetaTrader5 as mt5
 
 BASE_SYMBOLS = [
@@ -5,31 +7,68 @@ BASE_SYMBOLS = [
     "XAUUSD", "XAGUSD", "BTCUSD", "ETHUSD", "US30", "NAS100", "SPX500",
     "GBPJPY", "EURJPY", "AUDJPY", "NZDJPY", "CADJPY", "CHFJPY", "EURGBP"
 ]
+FALLBACK_SYMBOLS = ["EURUSD", "GBPUSD", "XAUUSD", "USDJPY"]
 
 def detect_broker_symbols():
     """
     Detects tradable, visible symbols matching the common base pairs.
     Useful for brokers with suffixes like '.m', '.r', etc.
+    Reuses an already open terminal session instead of restarting it.
     """
-    if not mt5.initialize():
+    connected = mt5.terminal_info() is not None
+    if not connected and not mt5.initialize():
         print(f"❌ MT5 initialization failed: {mt5.last_error()}")
         return []
 
-    all_symbols = mt5.symbols_get()
-    matched_symbols = []
-
-    for base in BASE_SYMBOLS:
-        for sym in all_symbols:
-            if (
-                sym.name.startswith(base)
-                and sym.visible
-                and sym.trade_mode == mt5.SYMBOL_TRADE_MODE_FULL
-            ):
-                matched_symbols.append(sym.name)
-                break  # Only pick one variation per base (e.g., 'EURUSD.m')
+    try:
+        all_symbols = mt5.symbols_get() or ()
+        matched_symbols = []
 
-    mt5.shutdown()
+        for base in BASE_SYMBOLS:
+            for sym in all_symbols:
+                if (
+                    sym.name.startswith(base)
+                    and sym.visible
+                    and sym.trade_mode == mt5.SYMBOL_TRADE_MODE_FULL
+                ):
+                    matched_symbols.append(sym.name)
+                    break  # Only pick one variation per base (e.g., 'EURUSD.m')
+    finally:
+        if not connected:
+            mt5.shutdown()
     return matched_symbols
 
-# ✅ Attempt dynamic detection, fallback if none detected
-SYMBOLS_TO_TRADE = detect_broker_symbols() or ["EURUSD", "GBPUSD", "XAUUSD", "USDJPY"]
+# ✅ Detected lazily; importing this module no longer starts the terminal
+_symbols = None
+_symbols_lock = threading.Lock()
+
+def get_symbols_to_trade():
+    """
+    Broker symbols, detected on first use rather than at import, with the
+    fallback list if none are detected.
+    """
+    global _symbols
+    if _symbols is None:
+        with _symbols_lock:
+            if _symbols is None:
+                _symbols = detect_broker_symbols() or list(FALLBACK_SYMBOLS)
+    return _symbols
+
+def resolved_symbols():
+    """Symbols detected so far, or None if detection hasn't run (doesn't trigger it)."""
+    return _symbols
+
+def restore_symbols(symbols):
+    """Use symbols from a warm-start snapshot unless detection already ran."""
+    global _symbols
+    with _symbols_lock:
+        if _symbols is not None or not symbols:
+            return False
+        _symbols = list(symbols)
+    return True
+
+def __getattr__(name):
+    # symbol_utils.SYMBOLS_TO_TRADE still works, resolved lazily
+    if name == "SYMBOLS_TO_TRADE":
+        return get_symbols_to_trade()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,33 +1,173 @@
 import MetaTrader5 as mt5
-from statistics import mean
+import numpy as np
+
+try:
+    import settings
+    from metrics import stage
+    from config import BAR_STORE_ENABLED, RESAMPLE_ENABLED, DECISION_MEMO_ENABLED, TICK_STORE_ENABLED
+    from decision_memo import per_bar, latest_tick
+    from tick_store import get_buffer as get_tick_buffer
+    from bar_store import TIMEFRAMES
+except ImportError:
+    from backend import settings
+    from backend.metrics import stage
+    from backend.config import BAR_STORE_ENABLED, RESAMPLE_ENABLED, DECISION_MEMO_ENABLED, TICK_STORE_ENABLED
+    from backend.decision_memo import per_bar, latest_tick
+    from backend.tick_store import get_buffer as get_tick_buffer
+    from backend.bar_store import TIMEFRAMES
+
+if BAR_STORE_ENABLED:
+    try:
+        from bar_store import get_bars
+    except ImportError:
+        from backend.bar_store import get_bars
+
+if RESAMPLE_ENABLED:
+    try:
+        from resampler import get_rates as get_resampled
+    except ImportError:
+        from backend.resampler import get_rates as get_resampled
 
 def get_candles(symbol, timeframe, count=50):
-    """Fetch recent OHLC candles for the given symbol and timeframe."""
-    rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
-    return rates if rates else []
+    """
+    Fetch recent OHLC candles for the given symbol and timeframe.
+    With the bar store enabled this is a zero-copy window of the local history;
+    with resampling enabled, higher timeframes come from the one base series.
+    """
+    with stage("mt5_bars", symbol):
+        rates = get_resampled(symbol, timeframe, count) if RESAMPLE_ENABLED else None
+        if rates is None:
+            if BAR_STORE_ENABLED:
+                rates = get_bars(symbol, timeframe, count)
+            else:
+                rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+    return rates if rates is not None else []
+
+# --- Closed-bar summaries, each memoized per bar with the decision memo ---
+def _tail(values, n):
+    return values[max(0, len(values) - n):] if n > 0 else values[:0]
+
+def _sum_last(bars, field, n):
+    """(sum, count) of the last `n` values of `field`."""
+    values = _tail(bars[field], n)
+    return float(np.sum(values)), len(values)
+
+def _sma_sums(bars, *periods):
+    """Close sums behind an SMA of each period (the forming bar adds the last close)."""
+    return tuple(_sum_last(bars, 'close', period - 1) for period in periods)
+
+def _range_sum(bars, period=None):
+    """(sum, count) of the high-low ranges of the last `period - 1` bars (all bars by default)."""
+    ranges = bars['high'] - bars['low']
+    ranges = ranges if period is None else _tail(ranges, period - 1)
+    return float(np.sum(ranges)), len(ranges)
+
+def _ranging_sums(bars, fast, slow):
+    return _sma_sums(bars, fast, slow) + (_range_sum(bars),)
+
+def _extreme(bars, field, n):
+    """Lowest low or highest high of the last `n - 1` bars (None without any)."""
+    values = _tail(bars[field], n - 1)
+    if not len(values):
+        return None
+    return float(values.min() if field == 'low' else values.max())
+
+def _last_bar(bars):
+    """The last closed bar (a copy) and the closed bar count."""
+    return bars[-1:].copy(), len(bars)
+
+def _mean_with(total, n, value):
+    """Mean of n summed values plus one more."""
+    return (total + value) / (n + 1)
+
+# --- Forming bar, folded from ticks between full reads ---
+_forming = {}  # (symbol, timeframe) -> (forming bar as a 1-bar array, last folded tick time_msc)
+
+def _start_forming(symbol, timeframe, bar):
+    _forming[(symbol, timeframe)] = (np.array([bar]), 0)
+
+def _forming_bar(symbol, timeframe, bar_time):
+    """
+    The bar opened at `bar_time` as first read this bar, with the bid of every
+    tick since folded into its close, high and low (all buffered ticks with the
+    tick store, else the latest one). None once a newer bar opened, so the
+    caller reads the bars again.
+    """
+    state = _forming.get((symbol, timeframe))
+    tick = latest_tick(symbol)
+    if state is None or not tick or int(state[0]['time'][0]) != bar_time:
+        return None
+    if int(tick.time) >= bar_time + TIMEFRAMES[timeframe][1]:
+        return None
+    bar, folded = state
+    if TICK_STORE_ENABLED:
+        ticks = get_tick_buffer(symbol).since(folded)
+        ticks = ticks[(ticks['time'] >= bar_time) & (ticks['time_msc'] <= tick.time_msc)]
+        bids = ticks['bid']
+    else:
+        bids = np.array([tick.bid] if tick.time_msc > folded else [])
+    if len(bids):
+        bar = bar.copy()
+        bar['close'] = bids[-1]
+        bar['high'] = max(float(bar['high'][0]), float(bids.max()))
+        bar['low'] = min(float(bar['low'][0]), float(bids.min()))
+        _forming[(symbol, timeframe)] = (bar, max(folded, int(tick.time_msc)))
+    return bar[0]
+
+@per_bar(lambda symbol, timeframe, count, summarize, *params: (timeframe,))
+def _closed_summary(symbol, timeframe, count, summarize, *params):
+    """summarize() of the closed bars as first read in the current bar, and that bar's open time."""
+    candles = get_candles(symbol, timeframe, count)
+    if len(candles) == 0:
+        return None
+    _start_forming(symbol, timeframe, candles[-1])
+    return summarize(candles[:-1], *params), int(candles[-1]['time'])
+
+def summarized_candles(symbol, timeframe, count, summarize, *params):
+    """
+    (summarize(closed bars, *params), forming bar) over the latest `count`
+    bars, or (None, None) without bars. With the decision memo, the summary
+    is computed once per bar and the forming bar is kept current from ticks,
+    so a decision reads no bars until a new one opens.
+    """
+    if DECISION_MEMO_ENABLED:
+        memo = _closed_summary(symbol, timeframe, count, summarize, *params)
+        forming = _forming_bar(symbol, timeframe, memo[1]) if memo else None
+        if forming is not None:
+            return memo[0], forming
+    candles = get_candles(symbol, timeframe, count)
+    if len(candles) == 0:
+        return None, None
+    return summarize(candles[:-1], *params), candles[-1]
+
+def get_trend_vote(symbol, timeframe):
+    """
+    One timeframe's SMA crossover vote: "UP", "DOWN" or None.
+    """
+    cfg = settings.current()
+    sums, forming = summarized_candles(symbol, timeframe, max(20, cfg.TREND_SMA_SLOW + 5),
+                                       _sma_sums, cfg.TREND_SMA_FAST, cfg.TREND_SMA_SLOW)
+    if forming is None:
+        return None
+
+    close = float(forming['close'])
+    ma_fast = _mean_with(*sums[0], close)
+    ma_slow = _mean_with(*sums[1], close)
+
+    if ma_fast > ma_slow:
+        return "UP"
+    elif ma_fast < ma_slow:
+        return "DOWN"
+    return None
 
 def get_trend_direction(symbol):
     """
     Top-down trend check: W1, D1, H4
-    - Use 5/15 SMA crossover voting
+    - Use TREND_SMA_FAST/TREND_SMA_SLOW (5/15) SMA crossover voting
     - 2 out of 3 agreement confirms trend
     """
     timeframes = [mt5.TIMEFRAME_W1, mt5.TIMEFRAME_D1, mt5.TIMEFRAME_H4]
-    trend_votes = []
-
-    for tf in timeframes:
-        candles = get_candles(symbol, tf, 20)
-        if not candles:
-            continue
-
-        closes = [c['close'] for c in candles]
-        ma_fast = mean(closes[-5:])
-        ma_slow = mean(closes[-15:])
-
-        if ma_fast > ma_slow:
-            trend_votes.append("UP")
-        elif ma_fast < ma_slow:
-            trend_votes.append("DOWN")
+    trend_votes = [get_trend_vote(symbol, tf) for tf in timeframes]
 
     if trend_votes.count("UP") >= 2:
         return "UP"
@@ -40,29 +180,30 @@ def is_market_ranging(symbol):
     Detect sideways market using MA compression on H4.
     - Range if MA distance is small relative to average candle range.
     """
-    candles = get_candles(symbol, mt5.TIMEFRAME_H4, 50)
-    if not candles:
+    cfg = settings.current()
+    sums, forming = summarized_candles(symbol, mt5.TIMEFRAME_H4, max(50, cfg.RANGE_SMA_SLOW),
+                                       _ranging_sums, cfg.RANGE_SMA_FAST, cfg.RANGE_SMA_SLOW)
+    if forming is None:
         return True
 
-    closes = [c['close'] for c in candles]
-    ma_fast = mean(closes[-10:])
-    ma_slow = mean(closes[-30:])
+    close = float(forming['close'])
+    ma_fast = _mean_with(*sums[0], close)
+    ma_slow = _mean_with(*sums[1], close)
     distance = abs(ma_fast - ma_slow)
-    avg_range = mean([c['high'] - c['low'] for c in candles])
+    avg_range = _mean_with(*sums[2], float(forming['high'] - forming['low']))
 
-    return distance < 0.25 * avg_range
+    return distance < cfg.RANGE_RATIO * avg_range
 
 def confirm_candle_entry(symbol):
     """
     Confirm entry using M15 engulfing or pin bar pattern.
-    - Looks at last 2 full candles (ignore current forming)
+    - Compares the forming candle with the last full one
     """
-    candles = get_candles(symbol, mt5.TIMEFRAME_M15, 3)
-    if len(candles) < 3:
+    summary, curr = summarized_candles(symbol, mt5.TIMEFRAME_M15, 3, _last_bar)
+    if curr is None or summary[1] < 2:
         return False
 
-    prev = candles[-2]
-    curr = candles[-1]
+    prev = summary[0][0]
 
     # Bullish Engulfing
     if (
@@ -81,7 +222,7 @@ def confirm_candle_entry(symbol):
     # Pin Bar (small body, long wick)
     body = abs(curr['close'] - curr['open'])
     wick = curr['high'] - curr['low']
-    if body < 0.25 * wick:
+    if body < settings.current().PIN_BAR_BODY_RATIO * wick:
         return True
 
     return False
@@ -91,37 +232,38 @@ def detect_order_block(symbol, direction):
     Detect recent high/low as proxy OB zone.
     - Could later use imbalance detection, CHoCH, mitigation
     """
-    candles = get_candles(symbol, mt5.TIMEFRAME_H1, 20)
-    if not candles:
+    field = 'low' if direction == "UP" else 'high'
+    extreme, forming = summarized_candles(symbol, mt5.TIMEFRAME_H1, 20, _extreme, field, 5)
+    if forming is None:
         return None
 
-    if direction == "UP":
-        return min(c['low'] for c in candles[-5:])
-    else:
-        return max(c['high'] for c in candles[-5:])
+    latest = float(forming[field])
+    if extreme is None:
+        return latest
+    return min(extreme, latest) if direction == "UP" else max(extreme, latest)
 
 def detect_support_resistance(symbol, direction):
     """
     Detect TP zone using recent S/R
     - Uses H1 last 10-bar highs/lows
     """
-    candles = get_candles(symbol, mt5.TIMEFRAME_H1, 50)
-    if not candles:
+    field = 'high' if direction == "UP" else 'low'
+    extreme, forming = summarized_candles(symbol, mt5.TIMEFRAME_H1, 50, _extreme, field, 10)
+    if forming is None:
         return None
 
-    highs = [c['high'] for c in candles]
-    lows = [c['low'] for c in candles]
-
-    return max(highs[-10:]) if direction == "UP" else min(lows[-10:])
+    latest = float(forming[field])
+    if extreme is None:
+        return latest
+    return max(extreme, latest) if direction == "UP" else min(extreme, latest)
 
 def get_volatility(symbol, period=14, timeframe=mt5.TIMEFRAME_H1):
     """
     Estimate volatility using ATR-like logic:
     - Calculates average high-low range over `period` candles
     """
-    candles = get_candles(symbol, timeframe, period + 1)
-    if len(candles) < period:
+    ranges, forming = summarized_candles(symbol, timeframe, period + 1, _range_sum, period)
+    if forming is None or ranges[1] + 1 < period:
         return 0
 
-    ranges = [c['high'] - c['low'] for c in candles[-period:]]
-    return round(mean(ranges), 5)
+    return round(_mean_with(*ranges, float(forming['high'] - forming['low'])), 5)
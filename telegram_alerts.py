@@ -1,4 +1,3 @@
-import requests
 import os
 from dotenv import load_dotenv
 
@@ -31,6 +30,7 @@ def send_telegram_message(message: str, chat_id: str = None):
     }
 
     try:
+        import requests  # deferred: most processes never send a message
         response = requests.post(url, data=payload, timeout=5)
         if not response.ok:
             print(f"⚠️ Telegram message failed: {response.status_code} {response.text}")
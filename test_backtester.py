@@ -0,0 +1,47 @@
+import numpy as np
+
+import fake_mt5
+
+
+def _universe(symbols=("EURUSD", "GBPUSD")):
+    from backtester import prepare
+    return {symbol: prepare(fake_mt5.copy_rates_from_pos(symbol, fake_mt5.TIMEFRAME_M15, 0, 5000),
+                            fake_mt5.symbol_info(symbol).point)
+            for symbol in symbols}
+
+
+def test_metrics_of_known_r_multiples():
+    from backtester import metrics
+    result = metrics(np.array([1.0, -1.0, 2.0, -1.0, -1.0]))
+    assert result["trades"] == 5
+    assert result["win_rate"] == 0.4
+    assert result["net_r"] == 0.0
+    assert result["profit_factor"] == 1.0
+    assert result["max_drawdown_r"] == 2.0
+    assert metrics(np.array([]))["trades"] == 0
+
+
+def test_simulate_is_deterministic_and_limits_positions(terminal):
+    from backtester import simulate, default_params
+    universe = _universe()
+    params = default_params()
+
+    one = simulate(universe, params, max_positions=1)
+    assert one == simulate(universe, params, max_positions=1)
+    assert one["trades"] > 0
+    assert simulate(universe, params, max_positions=2)["trades"] >= one["trades"]
+
+
+def test_shared_memory_round_trip(terminal):
+    from optimizer import share, attach
+    universe = _universe(("EURUSD",))
+    block, layout = share(universe)
+    try:
+        shared = attach(block, layout)
+        for name, array in universe["EURUSD"].items():
+            assert np.array_equal(shared["EURUSD"][name], array, equal_nan=True)
+            assert not shared["EURUSD"][name].flags.writeable
+        del shared
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,105 @@
+import fake_mt5
+
+
+def test_merge_overwrites_forming_bar_and_appends(terminal, tmp_path):
+    from bar_store import BarSeries
+    series = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 50)
+
+    assert series.merge(bars[:40]) == 40
+    forming = bars[39:40].copy()
+    forming["close"] += 0.001
+    assert series.merge(forming) == 0
+    assert series.window(1)["close"][0] == forming["close"][0]
+
+    assert series.merge(bars[39:]) == 10
+    assert series.count == 50
+    assert (series.window(50)["time"] == bars["time"]).all()
+
+
+def test_out_of_order_merge_fills_gap(terminal, tmp_path):
+    from bar_store import BarSeries
+    series = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 40)
+
+    series.merge(bars[:10])
+    series.merge(bars[20:])
+    assert series.find_gaps() == [(int(bars["time"][9]), int(bars["time"][20]))]
+
+    assert series.merge(bars[10:20]) == 10
+    assert series.find_gaps() == []
+    assert (series.window(40) == bars).all()
+
+
+def test_repair_gaps_refetches_missing_range(terminal, tmp_path):
+    from bar_store import BarSeries
+    series = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 40)
+    series.merge(bars[:10])
+    series.merge(bars[20:])
+
+    assert series.repair_gaps() == 10
+    assert (series.window(40)["time"] == bars["time"]).all()
+
+
+def test_weekend_closure_is_not_a_gap(terminal, tmp_path):
+    from bar_store import BarSeries
+    series = BarSeries("EURUSD", fake_mt5.TIMEFRAME_H1, directory=str(tmp_path))
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_H1, 0, 80)
+    # Friday 2025-07-04 21:00 UTC to Sunday 21:00 UTC
+    friday_close, sunday_open = 1751662800, 1751835600
+    series.merge(bars[(bars["time"] <= friday_close) | (bars["time"] >= sunday_open)])
+    assert series.find_gaps() == []
+
+
+def test_window_and_range_are_copies(terminal, tmp_path):
+    from bar_store import BarSeries
+    series = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 20)
+    series.merge(bars)
+
+    window = series.window(5)
+    selected = series.range(int(bars["time"][15]), int(bars["time"][19]))
+    forming = bars[-1:].copy()
+    forming["close"] += 0.001
+    series.merge(forming)
+
+    assert window["close"][-1] == bars["close"][-1]
+    assert selected["close"][-1] == bars["close"][-1]
+    assert series.window(1)["close"][0] == forming["close"][0]
+
+
+def test_sync_delta_after_restart(terminal, tmp_path):
+    from bar_store import BarSeries
+    series = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    series.sync(force=True)
+    series.flush()
+    stored = series.count
+
+    reopened = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    assert reopened.count == stored
+    terminal.advance(3 * 900)
+    assert reopened.sync(force=True) == 3
+    assert reopened.last_time == fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 1)["time"][0]
+
+
+def test_writers_sharing_files_pick_up_each_others_bars(terminal, tmp_path):
+    from bar_store import BarSeries
+    first = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    second = BarSeries("EURUSD", fake_mt5.TIMEFRAME_M15, directory=str(tmp_path))
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 50)
+
+    first.merge(bars[:40])
+    # The second writer opened before those bars existed; it must append after them, not over them
+    assert second.merge(bars[39:]) == 10
+    assert second.count == 50
+    assert first.merge(bars[-1:]) == 0
+    assert first.count == 50
+    assert (first.window(50)["time"] == bars["time"]).all()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_series_are_stored_per_broker_server(terminal, tmp_path, monkeypatch):
+    import bar_store
+    monkeypatch.setattr(bar_store, "_server_dir", None)
+    assert bar_store.server_directory(str(tmp_path)) == str(tmp_path / "Fake-Server")
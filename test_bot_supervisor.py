@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+
+class FakeProcess:
+    def __init__(self):
+        self.running = True
+        self.exitcode = None
+        self.joins = []
+        self.terminated = False
+        self.killed = False
+
+    def is_alive(self):
+        return self.running
+
+    def join(self, timeout=None):
+        self.joins.append(timeout)
+
+    def terminate(self):
+        self.terminated = True
+
+    def kill(self):
+        self.killed = True
+        self.running = False
+
+
+class FakeConn:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, command):
+        self.sent.append(command)
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    import bot_supervisor
+    monkeypatch.setattr(bot_supervisor, "log_user_event", lambda session, message: None)
+    sup = bot_supervisor.BotSupervisor(poll_interval=3600)
+    sup._running = False
+
+    def add_worker(email):
+        worker = bot_supervisor._Worker(email, None)
+        worker.process = FakeProcess()
+        worker.conn = FakeConn()
+        worker.started_at = time.time()
+        sup.workers[email] = worker
+        return worker
+
+    sup.add_worker = add_worker
+    return sup
+
+
+def test_stop_returns_without_joining_and_the_monitor_reaps(supervisor):
+    worker = supervisor.add_worker("a@x")
+
+    assert supervisor.stop("a@x", timeout=60) is True
+    assert worker.conn.sent == ["stop"]
+    assert worker.process.joins == []
+    assert supervisor.start("a@x") is False  # still stopping
+
+    now = time.time()
+    supervisor._reap(worker, now)
+    assert "a@x" in supervisor.workers
+
+    worker.process.running = False
+    worker.process.exitcode = 0
+    supervisor._reap(worker, now)
+    assert "a@x" not in supervisor.workers
+    assert not worker.process.terminated
+
+
+def test_monitor_terminates_then_kills_a_worker_ignoring_stop(supervisor):
+    worker = supervisor.add_worker("b@x")
+    supervisor.stop("b@x", timeout=10)
+    start = time.time()
+
+    supervisor._reap(worker, start + 5)
+    assert not worker.process.terminated
+
+    supervisor._reap(worker, start + 11)
+    assert worker.process.terminated and not worker.process.killed
+
+    supervisor._reap(worker, start + 17)
+    assert worker.process.killed
+
+    supervisor._reap(worker, start + 18)
+    assert "b@x" not in supervisor.workers
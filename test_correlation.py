@@ -0,0 +1,65 @@
+import numpy as np
+
+import fake_mt5
+
+SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "EURJPY"]
+
+
+def _reference(window):
+    returns = []
+    for symbol in SYMBOLS:
+        closes = fake_mt5.copy_rates_from_pos(symbol, fake_mt5.TIMEFRAME_H1, 1, window + 1)["close"]
+        returns.append(np.diff(np.log(closes)))
+    return np.corrcoef(returns)
+
+
+def test_incremental_matrix_matches_the_window(terminal):
+    from correlation import ReturnsCorrelation
+    tracker = ReturnsCorrelation(fake_mt5.TIMEFRAME_H1, window=60)
+    tracker.build(SYMBOLS)
+    assert np.allclose(tracker.matrix(), _reference(60))
+
+    # Past a full window, so the ring wraps and the sums are recomputed
+    for _ in range(75):
+        terminal.advance(3600)
+        tracker.update(force=True)
+    assert np.allclose(tracker.matrix(), _reference(60))
+
+
+def test_new_symbols_rebuild_the_tracker(terminal):
+    from correlation import ReturnsCorrelation
+    tracker = ReturnsCorrelation(fake_mt5.TIMEFRAME_H1, window=60)
+    tracker.build(SYMBOLS[:2])
+    tracker.update(SYMBOLS)
+    assert tracker.symbols == SYMBOLS
+    assert np.allclose(tracker.matrix(), _reference(60))
+
+
+class _Tracker:
+    def __init__(self, pairs):
+        self.pairs = {frozenset(pair): value for pair, value in pairs.items()}
+
+    def correlation(self, a, b):
+        return 1.0 if a == b else self.pairs.get(frozenset((a, b)), 0.0)
+
+
+def test_select_top_k_skips_correlated_exposure():
+    from correlation import select_top_k
+    tracker = _Tracker({("EURUSD", "GBPUSD"): 0.9, ("EURUSD", "USDCHF"): -0.9})
+    candidates = [(3.0, "EURUSD", 1, "eur"), (2.0, "GBPUSD", 1, "gbp"),
+                  (1.5, "USDCHF", 1, "chf"), (1.0, "USDJPY", 1, "jpy")]
+
+    # GBPUSD long adds to the EURUSD long; USDCHF long hedges it
+    assert select_top_k(candidates, 3, cap=0.7, tracker=tracker) == ["eur", "chf", "jpy"]
+    # Opposite directions: a GBPUSD short hedges a EURUSD long, a USDCHF short adds to it
+    candidates[1] = (2.0, "GBPUSD", -1, "gbp")
+    candidates[2] = (1.5, "USDCHF", -1, "chf")
+    assert select_top_k(candidates, 3, cap=0.7, tracker=tracker) == ["eur", "gbp", "jpy"]
+
+
+def test_select_top_k_counts_held_positions():
+    from correlation import select_top_k
+    tracker = _Tracker({("EURUSD", "GBPUSD"): 0.9})
+    candidates = [(3.0, "GBPUSD", 1, "gbp"), (1.0, "USDJPY", -1, "jpy")]
+    assert select_top_k(candidates, 2, held=[("EURUSD", 1)], cap=0.7, tracker=tracker) == ["jpy"]
+    assert select_top_k(candidates, 0, cap=0.7, tracker=tracker) == []
@@ -0,0 +1,122 @@
+import importlib
+
+import fake_mt5
+import numpy as np
+import pytest
+
+SYMBOL = "EURUSD"
+
+
+def _bid(t):
+    """The fake tick stream: one bid a minute."""
+    return 1.1 * (1 + 0.002 * np.sin(np.asarray(t) / 97))
+
+
+def _tick(t):
+    bid = float(_bid(t))
+    return fake_mt5.Tick(t, bid, bid + 0.00002, bid, 1, t * 1000, 6, 1.0)
+
+
+@pytest.fixture
+def technicals(terminal, monkeypatch):
+    import config
+    import decision_memo
+    import technicals
+    monkeypatch.setattr(config, "DECISION_MEMO_ENABLED", True)
+    monkeypatch.setattr(decision_memo, "DECISION_MEMO_ENABLED", True)
+    memo_on = importlib.reload(technicals)
+
+    calls = []
+
+    def get_candles(symbol, timeframe, count=50):
+        # The fake's closed bars, with a forming bar built from every tick since it opened
+        calls.append((timeframe, count))
+        bars = terminal.series(symbol, timeframe)[-count:].copy()
+        opened = int(bars["time"][-1])
+        bids = _bid(np.arange(opened, terminal.now + 1, 60))
+        bars["open"][-1], bars["close"][-1] = bids[0], bids[-1]
+        bars["high"][-1], bars["low"][-1] = bids.max(), bids.min()
+        return bars
+
+    monkeypatch.setattr(memo_on, "get_candles", get_candles)
+    monkeypatch.setattr(memo_on, "latest_tick", lambda symbol: _tick(terminal.now))
+    monkeypatch.setattr(decision_memo, "latest_tick", lambda symbol: _tick(terminal.now))
+    memo_on.calls = calls
+    yield memo_on
+    monkeypatch.undo()
+    importlib.reload(technicals)
+
+
+def _decision_inputs(t):
+    return (
+        t.get_trend_direction(SYMBOL),
+        t.is_market_ranging(SYMBOL),
+        t.confirm_candle_entry(SYMBOL),
+        t.detect_order_block(SYMBOL, "UP"),
+        t.detect_support_resistance(SYMBOL, "DOWN"),
+        t.get_volatility(SYMBOL),
+        t.get_volatility(SYMBOL, 5, fake_mt5.TIMEFRAME_M15),
+    )
+
+
+def test_memo_matches_the_unmemoized_path_and_reads_bars_only_when_one_opens(technicals, terminal, monkeypatch):
+    terminal.now -= terminal.now % 3600  # start on an H1 open
+    seen, plain_calls, memo_calls = set(), [], []
+    for minute in range(150):  # two and a half hours, one decision a minute
+        monkeypatch.setattr(technicals, "DECISION_MEMO_ENABLED", False)
+        plain = _decision_inputs(technicals)
+        plain_calls.append(len(technicals.calls))
+        technicals.calls.clear()
+
+        monkeypatch.setattr(technicals, "DECISION_MEMO_ENABLED", True)
+        memo = _decision_inputs(technicals)
+        memo_calls.append(len(technicals.calls))
+        technicals.calls.clear()
+
+        assert memo == plain, terminal.now
+        seen.add(plain)
+        terminal.advance(60)
+
+    assert len(seen) > 10  # the forming bar did change the inputs within a bar
+    assert set(plain_calls) == {9}
+    # Inside an M15 bar (and every longer one) a decision reads no bars at all
+    assert all(calls == 0 for minute, calls in enumerate(memo_calls) if minute and minute % 15)
+    assert sum(memo_calls) < sum(plain_calls) / 20
+
+
+def test_new_bar_between_memo_and_read_is_fetched_in_full(technicals, terminal, monkeypatch):
+    import decision_memo
+    terminal.now -= terminal.now % 900
+    _, first = technicals.summarized_candles(SYMBOL, fake_mt5.TIMEFRAME_M15, 10, technicals._last_bar)
+    # The memo key still says the old bar (e.g. a reused tick time), but the terminal has moved on
+    monkeypatch.setattr(decision_memo, "latest_tick", lambda symbol: _tick(terminal.now - 900))
+    terminal.advance(900)
+    technicals.calls.clear()
+    (last, _), forming = technicals.summarized_candles(SYMBOL, fake_mt5.TIMEFRAME_M15, 10, technicals._last_bar)
+    assert technicals.calls == [(fake_mt5.TIMEFRAME_M15, 10)]
+    assert forming["time"] == first["time"] + 900
+    assert last["time"][0] == first["time"]
+
+
+def test_forming_bar_folds_every_buffered_tick(technicals, monkeypatch):
+    from tick_store import TickBuffer
+    opened = 1_751_889_600  # an M15 open
+    bar = np.zeros(1, dtype=fake_mt5.RATES_DTYPE)
+    bar["time"], bar["open"], bar["high"], bar["low"], bar["close"] = opened, 1.1, 1.101, 1.099, 1.1
+    technicals._start_forming(SYMBOL, fake_mt5.TIMEFRAME_M15, bar[0])
+
+    buffer = TickBuffer(SYMBOL, capacity=16)
+    buffer.point = 0.00001
+    ticks = np.zeros(4, dtype=fake_mt5.TICKS_DTYPE)
+    ticks["time"] = opened + np.array([-5, 10, 20, 30])
+    ticks["time_msc"] = ticks["time"] * 1000
+    ticks["bid"] = [1.2, 1.105, 1.098, 1.1002]
+    ticks["ask"] = ticks["bid"] + 0.00002
+    buffer.append(ticks)
+    monkeypatch.setattr(technicals, "TICK_STORE_ENABLED", True)
+    monkeypatch.setattr(technicals, "get_tick_buffer", lambda symbol: buffer)
+    monkeypatch.setattr(technicals, "latest_tick", lambda symbol: buffer.latest())
+
+    forming = technicals._forming_bar(SYMBOL, fake_mt5.TIMEFRAME_M15, opened)
+    # The tick from before the bar opened is left out; the ones in between still count
+    assert (forming["open"], forming["high"], forming["low"], forming["close"]) == (1.1, 1.105, 1.098, 1.1002)
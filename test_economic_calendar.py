@@ -0,0 +1,121 @@
+import io
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+CPI = datetime(2026, 10, 20, 12, 30, tzinfo=timezone.utc).timestamp()
+
+
+def _ics(*events):
+    body = "".join(f"BEGIN:VEVENT\n{e}\nEND:VEVENT\n" for e in events)
+    return io.StringIO(f"BEGIN:VCALENDAR\nVERSION:2.0\n{body}END:VCALENDAR\n")
+
+
+def test_ics_local_times_use_their_tzid():
+    from economic_calendar import _read_ics
+    events = _read_ics(_ics(
+        "DTSTART;TZID=America/New_York:20261020T083000\nSUMMARY:USD: CPI\nX-IMPACT:high",
+        'DTSTART;VALUE=DATE-TIME;TZID="Europe/London":20261020T133000\nSUMMARY:USD: CPI (London)\nX-IMPACT:high',
+        "DTSTART;TZID=America/New_York:20261020T123000Z\nSUMMARY:USD: CPI (UTC)\nX-IMPACT:high",
+        "DTSTART:20261020T123000\nSUMMARY:USD: CPI (floating)\nX-IMPACT:high",
+    ))
+    assert [e["time"] for e in events] == [CPI] * 4
+
+
+def test_ics_events_in_an_unknown_zone_are_skipped(monkeypatch):
+    import economic_calendar
+    logged = []
+    monkeypatch.setattr(economic_calendar, "log", logged.append)
+    events = economic_calendar._read_ics(_ics(
+        "DTSTART;TZID=Eastern Standard Time:20261020T083000\nSUMMARY:USD: CPI\nX-IMPACT:high",
+        "DTSTART:20261020T123000Z\nSUMMARY:USD: Retail Sales\nX-IMPACT:high",
+    ))
+    assert [e["title"] for e in events] == ["USD: Retail Sales"]
+    assert "Eastern Standard Time" in logged[0]
+
+
+def test_ics_field_fallbacks_and_folded_lines():
+    from economic_calendar import _read_ics
+    events = _read_ics(_ics(
+        "DTSTART:20261020T123000Z\nSUMMARY:Non-Farm\n  Payrolls\nCATEGORIES:USD,Employment\nPRIORITY:1",
+        "DTSTART:20261021T090000Z\nSUMMARY:EUR: German Ifo\nPRIORITY:5",
+        "DTSTART:20261022T090000Z\nSUMMARY:Speech with no currency",
+    ))
+    assert [(e["currency"], e["impact"], e["title"]) for e in events] == [
+        ("USD", "high", "Non-Farm Payrolls"),
+        ("EUR", "medium", "EUR: German Ifo"),
+    ]
+
+
+def test_csv_and_json_feeds():
+    from economic_calendar import _read_csv, _read_json
+    csv_events = _read_csv(io.StringIO(
+        "time,currency,impact,title\n"
+        "2026-10-20T12:30:00Z,usd,High,CPI\n"
+        "2026-10-20T08:30:00-04:00,USD,high,CPI (offset)\n"
+        "2026-10-20T12:30:00,USD,high,CPI (naive)\n"
+    ))
+    json_events = _read_json(io.StringIO(json.dumps({"events": [
+        {"time": CPI, "currency": "USD", "impact": "high", "title": "CPI"},
+    ]})))
+    assert [e["time"] for e in csv_events + json_events] == [CPI] * 4
+    assert csv_events[0]["currency"] == "USD" and csv_events[0]["impact"] == "high"
+
+
+def test_blackout_windows_merge_per_currency():
+    from economic_calendar import BlackoutIndex
+    index = BlackoutIndex([
+        {"time": CPI, "currency": "USD", "impact": "high", "title": "CPI"},
+        {"time": CPI + 1200, "currency": "USD", "impact": "high", "title": "Fed"},
+        {"time": CPI, "currency": "JPY", "impact": "low", "title": "Minor"},
+    ], impacts=("high",), before=600, after=900)
+
+    assert index.events == 2
+    assert index.window("USD", CPI - 600) == (CPI - 600, CPI + 2100, "CPI, Fed")
+    assert index.window("USD", CPI - 601) is None
+    assert index.window("USD", CPI + 2100) is None
+    assert index.blackout("EURUSD.m", CPI + 2000)[2] == "CPI, Fed"
+    assert index.blackout("US30", CPI) is not None
+    assert index.blackout("EURJPY", CPI) is None
+
+
+def test_reload_only_on_change_and_keeps_the_old_index_on_errors(tmp_path):
+    from economic_calendar import EconomicCalendar
+    path = tmp_path / "calendar.csv"
+    path.write_text("time,currency,impact,title\n2026-10-20T12:30:00Z,USD,high,CPI\n")
+    calendar = EconomicCalendar(path=str(path), url="")
+    assert calendar.reload() and not calendar.reload()
+    assert calendar.blackout("EURUSD", CPI)
+
+    path.write_text("time,currency\nnot a time,USD\n")
+    assert not calendar.reload(force=True)
+    assert calendar.blackout("EURUSD", CPI)
+
+
+def test_first_download_runs_off_the_caller_thread(monkeypatch, tmp_path):
+    import economic_calendar
+    path = tmp_path / "calendar.csv"
+    release = threading.Event()
+
+    def download(self):
+        release.wait(5)
+        path.write_text("time,currency,impact,title\n2026-10-20T12:30:00Z,USD,high,CPI\n")
+
+    monkeypatch.setattr(economic_calendar, "_calendar", None)
+    monkeypatch.setattr(economic_calendar.EconomicCalendar, "download", download)
+    monkeypatch.setattr(economic_calendar, "EconomicCalendar",
+                        lambda cls=economic_calendar.EconomicCalendar: cls(path=str(path), url="https://feed"))
+
+    started = time.perf_counter()
+    assert not economic_calendar.in_blackout("EURUSD", CPI)
+    assert time.perf_counter() - started < 1
+
+    release.set()
+    calendar = economic_calendar.get_economic_calendar()
+    deadline = time.time() + 5
+    while calendar.loaded_at is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert economic_calendar.in_blackout("EURUSD", CPI)
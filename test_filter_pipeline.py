@@ -0,0 +1,86 @@
+import contextlib
+import random
+
+import pytest
+
+
+@pytest.fixture
+def pipeline_module(monkeypatch):
+    import filter_pipeline
+    stages, counts = [], []
+
+    @contextlib.contextmanager
+    def stage(name, symbol=None):
+        stages.append(name)
+        yield
+
+    monkeypatch.setattr(filter_pipeline, "stage", stage)
+    monkeypatch.setattr(filter_pipeline, "count", lambda name, symbol=None: counts.append(name))
+    filter_pipeline.stages, filter_pipeline.counts = stages, counts
+    return filter_pipeline
+
+
+def _filters(Filter, outcomes, ran):
+    def check(name):
+        def run(symbol, ctx):
+            ran.append(name)
+            if name == "trend":
+                ctx["trend"] = True
+            if name == "sentiment":
+                assert ctx.get("trend")  # its requirement ran first
+            return outcomes[(symbol, name)]
+        return run
+    names = ["ranging", "trend", "sentiment", "candle", "tick"]
+    return [Filter(name, check(name), None, ("trend",) if name == "sentiment" else ()) for name in names]
+
+
+def test_adaptive_order_never_changes_the_decision(pipeline_module):
+    Filter, FilterPipeline = pipeline_module.Filter, pipeline_module.FilterPipeline
+    rng = random.Random(7)
+    symbols = ["EURUSD", "GBPUSD", "USDJPY"]
+    reject_odds = {"ranging": 0.5, "trend": 0.3, "sentiment": 0.2, "candle": 0.7, "tick": 0.05}
+    ran = []
+    outcomes = {}
+    fixed = FilterPipeline(_filters(Filter, outcomes, ran), adaptive=False)
+    adaptive = FilterPipeline(_filters(Filter, outcomes, ran), adaptive=True, explore_every=5)
+
+    orders = set()
+    for _ in range(200):
+        for symbol in symbols:
+            for name, odds in reject_odds.items():
+                outcomes[(symbol, name)] = rng.random() >= odds
+            assert fixed.run(symbol, {})[0] == adaptive.run(symbol, {})[0]
+            orders.add(tuple(f.name for f in adaptive.order(symbol)))
+    assert len(orders) > 1  # the adaptive pipeline did reorder
+
+
+def test_order_ranks_by_cost_per_rejection_and_keeps_requirements(pipeline_module):
+    pipeline = pipeline_module.FilterPipeline(_filters(pipeline_module.Filter, {}, []), adaptive=True)
+    stats = pipeline._symbol_stats("EURUSD")
+    for name, cost, rate in [("ranging", 1.0, 0.5), ("trend", 5.0, 0.1), ("sentiment", 0.1, 0.9),
+                             ("candle", 0.2, 0.4), ("tick", 0.01, 0.0)]:
+        stats[name].runs, stats[name].cost, stats[name].reject_rate = 1, cost, rate
+    # tick: 1.0, candle: 0.5, ranging: 2.0, trend: 50; sentiment (0.11) has to wait for trend
+    assert [f.name for f in pipeline.order("EURUSD")] == ["candle", "tick", "ranging", "trend", "sentiment"]
+
+
+def test_first_rejection_is_counted_and_exploration_runs_the_rest(pipeline_module):
+    ran = []
+    outcomes = {("EURUSD", name): name != "trend" for name in ["ranging", "trend", "sentiment", "candle", "tick"]}
+    pipeline = pipeline_module.FilterPipeline(_filters(pipeline_module.Filter, outcomes, ran),
+                                              adaptive=True, explore_every=2)
+    assert pipeline.run("EURUSD", {}) == (False, "trend")
+    assert ran == ["ranging", "trend"]
+
+    ran.clear()
+    assert pipeline.run("EURUSD", {}) == (False, "trend")
+    assert set(ran) == {"ranging", "trend", "candle", "tick"}  # sentiment is skipped: trend failed
+    assert pipeline_module.counts == ["reject_trend", "reject_trend"]
+
+
+def test_stage_name_can_differ_from_the_filter_name(pipeline_module):
+    Filter, FilterPipeline = pipeline_module.Filter, pipeline_module.FilterPipeline
+    pipeline = FilterPipeline([Filter("news", lambda symbol, ctx: False, None, stage="news_event")], adaptive=False)
+    assert pipeline.run("EURUSD", {}) == (False, "news")
+    assert pipeline_module.stages == ["news_event"]
+    assert pipeline_module.counts == ["reject_news"]
@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def coalescer():
+    from log_coalesce import Coalescer
+    emitted = []
+    c = Coalescer(emitted.append, enabled=True, summary_seconds=900, sample_every=3)
+    c.emitted = emitted
+    return c
+
+
+def test_disabled_emits_everything():
+    from log_coalesce import Coalescer
+    emitted = []
+    c = Coalescer(emitted.append, enabled=False)
+    c.changed("k", 1, "a")
+    c.changed("k", 1, "a")
+    c.repeated("b")
+    c.repeated("b")
+    c.sampled("k", "c")
+    assert emitted == ["a", "a", "b", "b", "c"]
+
+
+def test_changed_folds_by_key_and_keeps_the_latest_text(coalescer):
+    for cycle in range(200):
+        coalescer.changed(("scan", "EURUSD"), "BUY", f"📡 Signal for EURUSD: {{'entry': {11000 + cycle}}}")
+    coalescer.changed(("scan", "EURUSD"), None, "⏳ No valid setup for EURUSD")
+    assert coalescer.emitted == ["📡 Signal for EURUSD: {'entry': 11000}", "⏳ No valid setup for EURUSD"]
+    assert len(coalescer._folded) == 1
+
+    coalescer.flush()
+    summary = coalescer.emitted[-1]
+    assert summary.count("📡") == 1
+    assert "{'entry': 11199} ×199" in summary
+
+
+def test_repeated_once_per_window(coalescer):
+    for _ in range(5):
+        coalescer.repeated("🔁 Scan complete.")
+        coalescer.repeated("🌙 All markets closed.")
+    assert coalescer.emitted == ["🔁 Scan complete.", "🌙 All markets closed."]
+    coalescer.flush()
+    assert "🔁 Scan complete. ×4" in coalescer.emitted[-1]
+    coalescer.repeated("🔁 Scan complete.")
+    assert coalescer.emitted[-1] == "🔁 Scan complete."
+
+
+def test_sampled_emits_one_in_n(coalescer):
+    for i in range(7):
+        coalescer.sampled(("scan", "EURUSD"), f"🔍 Scanning EURUSD #{i}")
+    assert coalescer.emitted == ["🔍 Scanning EURUSD #0 (1 in 3 sampled)", "🔍 Scanning EURUSD #3 (1 in 3 sampled)",
+                                 "🔍 Scanning EURUSD #6 (1 in 3 sampled)"]
+    coalescer.flush()
+    assert "🔍 Scanning EURUSD #5 ×4" in coalescer.emitted[-1]
+
+
+def test_summary_is_emitted_when_the_window_ends_and_reset_forgets_outcomes(coalescer):
+    coalescer.changed("k", 1, "first")
+    coalescer.changed("k", 1, "again")
+    coalescer._window_start -= 900
+    coalescer.changed("k", 1, "again")
+    assert coalescer.emitted[-1].startswith("🧾 Repeated in the last") and "again ×2" in coalescer.emitted[-1]
+
+    coalescer.reset()
+    coalescer.changed("k", 1, "after reset")
+    assert coalescer.emitted[-1] == "after reset"
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+BASE = 1792497600  # 2026-10-20 00:00 UTC
+ALICE, BOB = "alice@example.com", "bob@example.com"
+
+
+def _line(user, i, text):
+    return f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(BASE + i * 60))}] ({user}): {text}\n"
+
+
+@pytest.fixture
+def logs(tmp_path):
+    import log_index
+    import log_store
+
+    def log_for(user):
+        name = log_store.safe_name(user)
+        return log_store.SegmentedLog(name, str(tmp_path / f"{name}.log"), segment_dir=str(tmp_path),
+                                      max_bytes=1 << 30, max_seconds=0)
+
+    index = log_index.LogIndex(path=str(tmp_path / "index.sqlite"), log_dir=str(tmp_path))
+    return index, {ALICE: log_for(ALICE), BOB: log_for(BOB)}
+
+
+def _messages(index, user):
+    return [r["message"] for r in reversed(index.search(user=user, limit=200))]
+
+
+def test_indexes_segments_and_active_file_once_in_order(logs):
+    index, user_logs = logs
+    alice = user_logs[ALICE]
+    lines = [f"📡 Signal for EURUSD: {i}" for i in range(30)]
+    for i, text in enumerate(lines):
+        alice.append(_line(ALICE, i, text))
+        if i in (9, 19):
+            alice.rotate()
+
+    assert index.index_all() == 30
+    assert index.index_all() == 0
+    assert _messages(index, ALICE) == lines
+
+
+def test_rotation_during_a_pass_keeps_offsets_with_their_file(logs, monkeypatch):
+    import log_index
+    index, user_logs = logs
+    alice = user_logs[ALICE]
+    for i in range(5):
+        alice.append(_line(ALICE, i, f"before {i}"))
+    index.index_all()
+    alice.append(_line(ALICE, 5, "tail of the old file"))
+
+    real_segments = log_index.segments
+    calls = []
+
+    def segments_then_rotate(name, segment_dir):
+        listing = real_segments(name, segment_dir)
+        if not calls:  # the file rotates right after the pass lists the segments
+            calls.append(name)
+            alice.rotate()
+            alice.append(_line(ALICE, 6, "first in the new file"))
+        return listing
+
+    monkeypatch.setattr(log_index, "segments", segments_then_rotate)
+    index.index_log("alice_example_com")
+    monkeypatch.setattr(log_index, "segments", real_segments)
+    index.index_log("alice_example_com")
+
+    assert _messages(index, ALICE) == [f"before {i}" for i in range(5)] + [
+        "tail of the old file", "first in the new file"]
+
+
+def test_catch_up_only_indexes_a_small_tail(logs):
+    index, user_logs = logs
+    alice = user_logs[ALICE]
+    alice.append(_line(ALICE, 0, "history"))
+    assert index.catch_up(ALICE) == 0  # never indexed: backfill is the background indexer's job
+    assert index.search(user=ALICE) == []
+
+    index.index_all()
+    alice.append(_line(ALICE, 1, "small tail"))
+    assert index.catch_up(ALICE) == 1
+
+    alice.append(_line(ALICE, 2, "x" * 500))
+    assert index.catch_up(ALICE, max_bytes=100) == 0
+    alice.rotate()
+    assert index.catch_up(ALICE) == 0  # unindexed segment
+    assert index.index_all() == 1
+
+
+def test_catch_up_never_waits_for_another_indexer(logs):
+    index, user_logs = logs
+    user_logs[ALICE].append(_line(ALICE, 0, "history"))
+    index.index_all()
+    user_logs[ALICE].append(_line(ALICE, 1, "new"))
+
+    acquired = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with index._lock:
+            acquired.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    acquired.wait(5)
+    started = time.perf_counter()
+    try:
+        assert index.catch_up(ALICE) == 0
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_text_search_is_ranked_and_confined_to_the_user(logs):
+    index, user_logs = logs
+    for i in range(50):
+        user_logs[ALICE].append(_line(ALICE, i, f"📡 Signal for EURUSD: buy {i}"))
+    user_logs[BOB].append(_line(BOB, 0, "❌ Failed to place trade on GBPUSD: buy buy"))
+    user_logs[BOB].append(_line(BOB, 1, "📡 Signal for GBPUSD: buy"))
+    user_logs[BOB].append(_line(BOB, 2, "✅ Trade placed GBPUSD sell"))
+    index.index_all()
+
+    results = index.search("buy", user=BOB)
+    assert [r["message"] for r in results] == ["❌ Failed to place trade on GBPUSD: buy buy",
+                                               "📡 Signal for GBPUSD: buy"]
+    assert results[0]["event"] == "trade_failed" and results[0]["symbol"] == "GBPUSD"
+    assert len(index.search("buy", user=ALICE, limit=100)) == 50
+    assert [r["message"] for r in index.search("buy", user=ALICE, since=BASE + 45 * 60)] == [
+        f"📡 Signal for EURUSD: buy {i}" for i in (49, 48, 47, 46, 45)]
+    assert index.search("buy", user="nobody@example.com") == []
+    assert [r["message"] for r in index.search(user=BOB, event="signal")] == ["📡 Signal for GBPUSD: buy"]
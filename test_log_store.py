@@ -0,0 +1,70 @@
+import os
+import time
+
+import pytest
+
+BASE = 1792497600  # 2026-10-20 00:00 UTC
+
+
+def _line(ts, text):
+    return f"[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))}] (tester): {text}\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    import log_store
+
+    def make(**kwargs):
+        kwargs.setdefault("max_seconds", 0)
+        return log_store.SegmentedLog("tester", str(tmp_path / "tester.log"), segment_dir=str(tmp_path), **kwargs)
+    log_store.make = make
+    return log_store
+
+
+def test_rotation_keeps_every_line_in_order_across_compressed_segments(store, tmp_path):
+    log = store.make(max_bytes=400)
+    lines = [_line(BASE + i * 60, f"event {i}") for i in range(40)]
+    for line in lines:
+        log.append(line)
+
+    closed = store.segments("tester", str(tmp_path))
+    assert len(closed) >= 3
+    assert [ns for ns, _ in closed] == sorted(ns for ns, _ in closed)
+    assert list(log.read_lines()) == lines
+
+    assert store.maintain(str(tmp_path)) == (len(closed), 0)
+    assert all(path.endswith(".gz") for _, path in store.segments("tester", str(tmp_path)))
+    assert list(log.read_lines()) == lines
+
+
+def test_time_range_keeps_continuation_lines_with_their_message(store):
+    log = store.make(max_bytes=1 << 20)
+    expected = []
+    for i in range(10):
+        entry = _line(BASE + i * 60, f"error {i}") + "Traceback (most recent call last):\n  File \"x.py\"\n"
+        log.append(entry)
+        if 3 <= i <= 6:
+            expected.append(entry)
+
+    got = "".join(log.read_lines(since=BASE + 180, until=BASE + 360))
+    assert got == "".join(expected)
+
+
+def test_retention_drops_oldest_segments_past_age_or_size(store, tmp_path):
+    now = time.time()
+    for age_days, size in [(10, 600_000), (5, 600_000), (1, 600_000)]:
+        closed_ns = int((now - age_days * 86400) * 1e9)
+        with open(tmp_path / f"tester.{closed_ns:019d}.log.gz", "wb") as f:
+            f.write(b"x" * size)
+
+    assert store.apply_retention("tester", {"days": 7, "max_mb": 0}, str(tmp_path), now) == 1
+    assert store.apply_retention("tester", {"days": 0, "max_mb": 1}, str(tmp_path), now) == 1
+    remaining = store.segments("tester", str(tmp_path))
+    assert len(remaining) == 1 and os.path.getsize(remaining[0][1]) == 600_000
+    assert store.apply_retention("tester", {}, str(tmp_path), now) == 0
+
+
+def test_retention_policy_per_user_over_the_default(store):
+    policies = {"*": {"days": 30, "max_mb": 100}, "vip@example.com": {"days": 365}}
+    assert store.retention_for("vip_example_com", policies) == {"days": 365, "max_mb": 100}
+    assert store.retention_for("other_example_com", policies) == {"days": 30, "max_mb": 100}
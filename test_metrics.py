@@ -0,0 +1,42 @@
+def test_stage_records_histogram_and_counter():
+    import metrics
+    metrics.reset()
+    metrics.enable()
+    metrics.set_user("tester@example.com")
+
+    with metrics.stage("trend", "EURUSD"):
+        pass
+    metrics.count("signal", "EURUSD")
+
+    text = metrics.render()
+    assert 'sentinel_stage_seconds_count{stage="trend",user="tester@example.com",symbol="EURUSD"} 1' in text
+    assert 'sentinel_events_total{event="signal",user="tester@example.com",symbol="EURUSD"} 1' in text
+    metrics.disable()
+    metrics.reset()
+
+def test_disabled_hooks_record_nothing():
+    import metrics
+    metrics.reset()
+    metrics.disable()
+
+    with metrics.stage("trend", "EURUSD"):
+        pass
+    metrics.count("signal", "EURUSD")
+
+    assert "EURUSD" not in metrics.render()
+
+def test_summarize_renders_summary():
+    import metrics
+    metrics.reset()
+    metrics.enable()
+    metrics.set_user("tester@example.com")
+
+    metrics.summarize("order_slippage_points", 1.5, "EURUSD")
+    metrics.summarize("order_slippage_points", -0.5, "EURUSD")
+
+    text = metrics.render()
+    assert "# TYPE sentinel_order_slippage_points summary" in text
+    assert 'sentinel_order_slippage_points_sum{user="tester@example.com",symbol="EURUSD"} 1.000000' in text
+    assert 'sentinel_order_slippage_points_count{user="tester@example.com",symbol="EURUSD"} 2' in text
+    metrics.disable()
+    metrics.reset()
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def heartbeat_module(terminal, monkeypatch):
+    import mt5_heartbeat
+    events = []
+    monkeypatch.setattr(mt5_heartbeat, "log_user_event", lambda session, message: events.append(message))
+    monkeypatch.setattr(mt5_heartbeat, "_jittered", lambda delay: delay)
+    mt5_heartbeat.events = events
+    return mt5_heartbeat
+
+
+def test_reconnect_backoff_doubles_up_to_the_cap_and_resets(heartbeat_module, monkeypatch):
+    from config import RECONNECT_BACKOFF_INITIAL, RECONNECT_BACKOFF_MAX
+    attempts = []
+    server = {"up": False}
+
+    def connect():
+        attempts.append(1)
+        return server["up"]
+
+    heartbeat = heartbeat_module.Heartbeat("tester", connect=connect)
+    terminal_info = heartbeat_module.mt5.terminal_info
+    monkeypatch.setattr(heartbeat_module.mt5, "terminal_info", lambda: terminal_info() if server["up"] else None)
+
+    delays = []
+    for _ in range(10):
+        heartbeat.check()
+        delays.append(round(heartbeat._reconnect_at - heartbeat.state().checked_at, 3))
+        heartbeat._reconnect_at = 0.0  # due again
+    assert delays[:3] == [RECONNECT_BACKOFF_INITIAL, 2 * RECONNECT_BACKOFF_INITIAL, 4 * RECONNECT_BACKOFF_INITIAL]
+    assert max(delays) == RECONNECT_BACKOFF_MAX
+    assert len(attempts) == 10
+    assert not heartbeat.healthy() and heartbeat.state().failures == 10
+
+    server["up"] = True
+    heartbeat.check()
+    assert heartbeat.healthy()
+    assert heartbeat._reconnect_backoff == RECONNECT_BACKOFF_INITIAL
+    assert "restored" in heartbeat_module.events[-1]
+
+
+def test_state_goes_stale(heartbeat_module):
+    heartbeat = heartbeat_module.Heartbeat("tester", stale_after=30)
+    heartbeat.check()
+    assert heartbeat.healthy()
+    heartbeat._state = heartbeat._state._replace(checked_at=heartbeat._state.checked_at - 31)
+    assert not heartbeat.healthy()
+
+
+def test_exited_loop_is_restarted_after_backoff_until_stopped(heartbeat_module):
+    heartbeat = heartbeat_module.Heartbeat("tester")
+    started = []
+
+    def spawn():
+        t = threading.Thread(target=lambda: None)
+        t.start()
+        t.join()
+        started.append(t)
+        return t
+
+    heartbeat.supervise(spawn)
+    heartbeat._supervise_loop()
+    assert heartbeat.restarting() and len(started) == 1
+
+    heartbeat._restart_at = 0.0
+    heartbeat._supervise_loop()
+    assert heartbeat.restarts == 1 and len(started) == 2
+    assert heartbeat._restart_backoff > heartbeat_module.WORKER_RESTART_BACKOFF_INITIAL
+
+    heartbeat._supervise_loop()
+    heartbeat.stop()
+    heartbeat._supervise_loop()
+    assert not heartbeat.restarting() and len(started) == 2
@@ -0,0 +1,64 @@
+import threading
+
+import fake_mt5
+
+
+def _order(**extra):
+    return dict({"symbol": "EURUSD", "order_type": "buy", "lot": 0.01, "price": None, "sl": 0.0, "tp": 0.0}, **extra)
+
+
+def _response(retcode, request):
+    return fake_mt5.OrderSendResult(retcode, 0, 0, 0.0, 0.0, 0.0, 0.0, "", 1, request)
+
+
+def test_requotes_are_retried_at_a_fresh_price(terminal, monkeypatch):
+    import order_executor
+    monkeypatch.setattr(order_executor, "ORDER_RETRY_DELAY_SECONDS", 0)
+    replies = [fake_mt5.TRADE_RETCODE_REQUOTE, fake_mt5.TRADE_RETCODE_PRICE_CHANGED]
+
+    def order_send(request):
+        if replies:
+            return _response(replies.pop(0), request)
+        return fake_mt5.order_send(request)
+
+    monkeypatch.setattr(order_executor.mt5, "order_send", order_send)
+    result = order_executor.OrderExecutor("retry").place(_order())
+
+    assert result["ok"] and result["attempts"] == 3
+    assert len(terminal.positions) == 1
+
+
+def test_rejection_is_not_retried(terminal, monkeypatch):
+    import order_executor
+    sent = []
+    monkeypatch.setattr(order_executor.mt5, "order_send",
+                        lambda request: sent.append(request) or _response(fake_mt5.TRADE_RETCODE_REJECT, request))
+
+    result = order_executor.OrderExecutor("reject").place(_order())
+    assert not result["ok"] and result["retcode"] == fake_mt5.TRADE_RETCODE_REJECT
+    assert len(sent) == 1
+
+
+def test_timeout_withdraws_queued_order_but_waits_for_one_in_flight(terminal, monkeypatch):
+    import order_executor
+    started, release = threading.Event(), threading.Event()
+
+    def order_send(request):
+        started.set()
+        release.wait(5)
+        return fake_mt5.order_send(request)
+
+    monkeypatch.setattr(order_executor.mt5, "order_send", order_send)
+    executor = order_executor.OrderExecutor("timeout")
+    results = {}
+    first = threading.Thread(target=lambda: results.setdefault("first", executor.place(_order(), timeout=0.05)))
+    first.start()
+    assert started.wait(5)
+
+    queued = executor.place(_order(symbol="GBPUSD"), timeout=0.05)
+    assert not queued["ok"] and "queued" in queued["comment"]
+
+    release.set()
+    first.join(5)
+    assert results["first"]["ok"]
+    assert [p.symbol for p in terminal.positions.values()] == ["EURUSD"]
@@ -0,0 +1,45 @@
+import fake_mt5
+
+
+def _position(terminal, symbol, entry, order_type=fake_mt5.ORDER_TYPE_BUY, sl=0.0):
+    from config import MAGIC_NUMBER
+    ticket = terminal.open_position({"symbol": symbol, "type": order_type, "volume": 0.1,
+                                     "price": entry, "sl": sl, "magic": MAGIC_NUMBER})
+    return ticket
+
+
+def test_buy_is_valued_at_the_bid(terminal):
+    from position_manager import PositionManager
+    from positions_snapshot import take_snapshot
+    tick = fake_mt5.symbol_info_tick("EURUSD")
+    # 1% in profit at the ask, not yet at the bid
+    _position(terminal, "EURUSD", round((tick.bid + tick.ask) / 2 / 1.01, 5))
+
+    assert PositionManager().run(take_snapshot()) == (0, 0)
+
+
+def test_trailing_moves_sl_to_the_level_behind_price(terminal):
+    from position_manager import PositionManager
+    from positions_snapshot import take_snapshot
+    tick = fake_mt5.symbol_info_tick("EURUSD")
+    entry = round(tick.bid / 1.02, 5)
+    ticket = _position(terminal, "EURUSD", entry)
+
+    class Levels:
+        def next_below(self, price):
+            return (round(entry + (price - entry) / 2, 5), 4)
+
+    assert PositionManager().run(take_snapshot(), {"EURUSD": Levels()}) == (1, 0)
+    assert terminal.positions[ticket].sl == round(entry + (tick.bid - entry) / 2, 5)
+
+
+def test_scale_ins_use_free_trade_slots_only(terminal, overrides):
+    from position_manager import PositionManager
+    from positions_snapshot import take_snapshot
+    overrides(SCALE_IN_ENABLED=True, MAX_TRADES_AT_ONCE=3)
+    for symbol in ("EURUSD", "GBPUSD"):
+        entry = round(fake_mt5.symbol_info_tick(symbol).bid / 1.02, 5)
+        _position(terminal, symbol, entry, sl=entry)
+
+    assert PositionManager().run(take_snapshot()) == (0, 1)
+    assert len(terminal.positions) == 3
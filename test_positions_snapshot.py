@@ -0,0 +1,29 @@
+import fake_mt5
+
+
+def _open(terminal, symbol):
+    terminal.open_position({"symbol": symbol, "type": fake_mt5.ORDER_TYPE_BUY, "volume": 0.01, "price": 1.1})
+
+
+def test_snapshot_indexes_positions(terminal):
+    from positions_snapshot import take_snapshot, current_snapshot
+    _open(terminal, "EURUSD")
+    _open(terminal, "EURUSD")
+
+    snapshot = take_snapshot()
+    assert current_snapshot() is snapshot
+    assert len(snapshot) == 2
+    assert snapshot.has_symbol("EURUSD") and not snapshot.has_symbol("GBPUSD")
+    assert len(snapshot.for_symbol("EURUSD")) == 2
+
+
+def test_snapshot_ends_with_the_cycle(terminal):
+    from positions_snapshot import take_snapshot, current_snapshot, clear_snapshot
+    snapshot = take_snapshot()
+    clear_snapshot()
+    assert current_snapshot() is None
+
+    snapshot = take_snapshot()
+    snapshot.fetched_at -= 31
+    assert current_snapshot() is None
+    assert current_snapshot(max_age=60) is snapshot
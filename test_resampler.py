@@ -0,0 +1,81 @@
+import numpy as np
+
+import fake_mt5
+
+
+def _by_hand(base, seconds):
+    """Reference aggregation with a plain loop."""
+    rows = {}
+    for bar in base:
+        start = int(bar["time"]) // seconds * seconds
+        if start not in rows:
+            rows[start] = [bar["open"], bar["high"], bar["low"], bar["close"], int(bar["tick_volume"])]
+        else:
+            row = rows[start]
+            row[1], row[2] = max(row[1], bar["high"]), min(row[2], bar["low"])
+            row[3] = bar["close"]
+            row[4] += int(bar["tick_volume"])
+    return [(t, *row) for t, row in sorted(rows.items())]
+
+
+def test_aggregate_matches_a_plain_loop(terminal):
+    from resampler import aggregate
+    base = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 1000)
+    bars = aggregate(base, 3600)
+    got = [(int(b["time"]), b["open"], b["high"], b["low"], b["close"], int(b["tick_volume"])) for b in bars]
+    assert got == _by_hand(base, 3600)
+
+
+def test_daily_and_weekly_buckets(terminal):
+    from resampler import bucket_starts
+    monday_noon = fake_mt5.DEFAULT_NOW
+    assert bucket_starts([monday_noon], 86400)[0] == monday_noon - 12 * 3600
+    assert bucket_starts([monday_noon], 86400, day_offset=2 * 3600)[0] == monday_noon - 10 * 3600
+    # W1 opens on Sunday 00:00
+    assert bucket_starts([monday_noon], 604800)[0] == monday_noon - 36 * 3600
+
+
+def test_incremental_refresh_matches_full_aggregation(terminal):
+    from resampler import SymbolResampler, aggregate
+    resampler = SymbolResampler("EURUSD", fake_mt5.TIMEFRAME_M15, base_bars=2000)
+    resampler.rates(fake_mt5.TIMEFRAME_H1, 100)
+
+    for _ in range(12):
+        terminal.advance(10 * 60)
+        resampler.refresh(force=True)
+        incremental = resampler.rates(fake_mt5.TIMEFRAME_H1, 300)
+
+    full = aggregate(resampler.base, 3600)
+    assert (incremental == full[-300:]).all()
+    assert incremental["time"][-1] == terminal.now // 3600 * 3600
+
+
+def test_first_partial_bucket_is_dropped(terminal):
+    from resampler import SymbolResampler
+    resampler = SymbolResampler("EURUSD", fake_mt5.TIMEFRAME_M15, base_bars=1001)
+    bars = resampler.rates(fake_mt5.TIMEFRAME_H1, 1000)
+    first = int(bars["time"][0])
+    assert (resampler.base["time"] >= first).sum() == (len(bars) - 1) * 4 + 1
+
+
+def test_base_series_covers_the_structure_history():
+    from config import RESAMPLE_BASE_BARS, STRUCTURE_HISTORY_BARS
+    from resampler import SymbolResampler
+    fake_mt5.install(fake_mt5.FakeTerminal(symbols=["EURUSD"], history=RESAMPLE_BASE_BARS))
+    resampler = SymbolResampler("EURUSD", fake_mt5.TIMEFRAME_M15)
+
+    bars = resampler.rates(fake_mt5.TIMEFRAME_H1, STRUCTURE_HISTORY_BARS + 1)
+    assert len(bars) == STRUCTURE_HISTORY_BARS + 1
+    assert (np.diff(bars["time"]) == 3600).all()
+
+
+def test_requests_beyond_the_base_series_fall_back(terminal):
+    import resampler
+    short = resampler.get_resampler("USDJPY")
+    short.refresh(force=True)
+    capacity = short.capacity(fake_mt5.TIMEFRAME_H1)
+    assert capacity == len(short.base) // 4 - 1
+
+    assert len(resampler.get_rates("USDJPY", fake_mt5.TIMEFRAME_H1, capacity)) == capacity
+    assert resampler.get_rates("USDJPY", fake_mt5.TIMEFRAME_H1, capacity + 1) is None
+    assert resampler.get_rates("USDJPY", fake_mt5.TIMEFRAME_M1, 10) is None
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+
+def _write(tmp_path, values):
+    path = tmp_path / "overrides.json"
+    path.write_text(json.dumps(values))
+    return str(path)
+
+
+@pytest.fixture
+def restore(tmp_path):
+    import settings
+    yield settings
+    settings.reload(str(tmp_path / "none.json"))
+
+
+def test_reload_swaps_in_a_new_frozen_snapshot(tmp_path, restore):
+    settings = restore
+    before = settings.current()
+    assert settings.reload(_write(tmp_path, {"MAX_TRADES_AT_ONCE": 3, "SYMBOL_SESSIONS": {"US30": ["London"]}}))
+
+    snapshot = settings.current()
+    assert snapshot.version == before.version + 1
+    assert snapshot.MAX_TRADES_AT_ONCE == 3
+    assert snapshot.SYMBOL_SESSIONS["US30"] == ("London",)
+    assert before.MAX_TRADES_AT_ONCE == 1
+    with pytest.raises(AttributeError):
+        snapshot.MAX_TRADES_AT_ONCE = 5
+    with pytest.raises(TypeError):
+        snapshot.RISK_TIERS[0]["risk_percent"] = 1
+
+
+@pytest.mark.parametrize("values, error", [
+    ({"NO_SUCH_SETTING": 1}, "Unknown settings"),
+    ({"MAX_TRADES_AT_ONCE": "3"}, "Wrong type"),
+    ({"MAX_TRADES_AT_ONCE": 2.5}, "Wrong type"),
+    ({"SECRET_KEY": "x"}, "Secrets"),
+    ({"TELEGRAM_BOT_TOKEN": "x"}, "Secrets"),
+    ({"MAGIC_NUMBER": 7}, "Only read at startup.*MAGIC_NUMBER"),
+    ({"LOG_DIR": "elsewhere", "SHARED_SIGNALS": True}, "Only read at startup.*LOG_DIR, SHARED_SIGNALS"),
+    ({"RISK_TIERS": [{"balance_max": 100}]}, "Invalid RISK_TIERS"),
+    ({"RISK_TIERS": [{"balance_max": 1000, "risk_percent": 0.02}, {"balance_max": 100, "risk_percent": 0.1}]},
+     "Invalid RISK_TIERS"),
+    ({"RISK_TIERS": [{"balance_max": 100, "risk_percent": 2}]}, "Invalid RISK_TIERS"),
+    ({"TRADING_SESSIONS": {"London": {"start": 7}}}, "Invalid TRADING_SESSIONS"),
+    ({"MARKET_HOLIDAYS": {"25/12/2026": ["*"]}}, "Invalid MARKET_HOLIDAYS"),
+    ({"LOG_RETENTION": {"*": {"days": -1}}}, "Invalid LOG_RETENTION"),
+])
+def test_invalid_overrides_are_rejected_whole(tmp_path, restore, values, error):
+    settings = restore
+    path = _write(tmp_path, dict(values, MAX_SPREAD_PIPS=5))
+    with pytest.raises(ValueError, match=error):
+        settings.load_overrides(path)
+
+    before = settings.current()
+    assert not settings.reload(path)
+    assert settings.current() is before
+    assert settings.current().MAX_SPREAD_PIPS == 3
+
+
+def test_secrets_are_not_in_snapshots():
+    import settings
+    assert settings.current().get("SECRET_KEY") is None
+    assert settings.current().get("METRICS_TOKEN") is None
+    assert settings.current().get("ADMIN_PASSWORD") is None
+
+
+def test_reloadable_settings_exist_in_config():
+    import settings
+    assert settings.RELOADABLE <= set(settings.DEFAULTS)
+    assert set(settings.STRUCTURE_CHECKS) <= settings.RELOADABLE
@@ -0,0 +1,17 @@
+def test_latest_only_returns_the_current_bars_signal(terminal, monkeypatch):
+    import signal_hub
+    calls = []
+    monkeypatch.setattr(signal_hub, "decide_trade", lambda symbol: calls.append(symbol) or ("buy", symbol))
+
+    hub = signal_hub.SignalHub(bar_seconds=300)
+    hub.subscribe("a@x", ["EURUSD"])
+    assert hub.refresh() == 1
+    assert hub.latest("EURUSD") == ("buy", "EURUSD")
+
+    # The hub hasn't run on the new bar yet, even though its entry is recent
+    terminal.advance(300)
+    assert hub.latest("EURUSD") is None
+
+    assert hub.refresh() == 1
+    assert hub.latest("EURUSD") == ("buy", "EURUSD")
+    assert calls == ["EURUSD", "EURUSD"]
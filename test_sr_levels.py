@@ -0,0 +1,63 @@
+import numpy as np
+
+import fake_mt5
+
+
+def _structure(bars, built):
+    import structure_index
+    structure = structure_index.StructureIndex("EURUSD", fake_mt5.TIMEFRAME_M15, history=len(bars))
+    structure.build(bars[:built])
+    return structure
+
+
+def test_incremental_levels_match_a_rebuild_at_the_same_width(terminal, monkeypatch):
+    import structure_index
+    from sr_levels import LevelIndex
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 3001)
+    structure = _structure(bars, 2000)
+    levels = LevelIndex("EURUSD", fake_mt5.TIMEFRAME_M15, min_touches=2)
+    levels.sync(structure)
+
+    for end in range(2021, 3002, 20):
+        monkeypatch.setattr(structure_index, "get_candles",
+                            lambda symbol, timeframe, count, end=end: bars[max(0, end - count):end])
+        structure.update(force=True)
+        levels.sync(structure)
+
+        rebuilt = LevelIndex("EURUSD", fake_mt5.TIMEFRAME_M15, min_touches=2)
+        rebuilt._build(structure, width=levels.width)
+        assert levels.levels() == rebuilt.levels()
+    assert levels.levels()
+
+
+def test_width_drift_triggers_a_rebuild(terminal, monkeypatch):
+    from sr_levels import LevelIndex, RANGE_BARS
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 1000)
+    structure = _structure(bars, 1000)
+    levels = LevelIndex("EURUSD", fake_mt5.TIMEFRAME_M15)
+    levels.sync(structure)
+    width = levels.width
+
+    structure.high = structure.high.copy()
+    structure.high[-RANGE_BARS:] += 0.1 * (structure.high - structure.low)[-RANGE_BARS:]
+    levels.sync(structure)
+    assert levels.width == width
+
+    structure.high[-RANGE_BARS:] += (structure.high - structure.low)[-RANGE_BARS:]
+    levels.sync(structure)
+    assert np.isclose(levels.width, LevelIndex._width(structure))
+    assert levels.width > 1.5 * width
+
+
+def test_next_level_lookups(terminal, monkeypatch):
+    from sr_levels import LevelIndex
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_M15, 0, 3000)
+    levels = LevelIndex("EURUSD", fake_mt5.TIMEFRAME_M15, min_touches=2)
+    levels.sync(_structure(bars, 3000))
+    prices = [price for price, _ in levels.levels()]
+    assert prices == sorted(prices) and len(prices) >= 2
+
+    middle = (prices[0] + prices[1]) / 2
+    assert levels.next_above(middle)[0] == prices[1]
+    assert levels.next_below(middle)[0] == prices[0]
+    assert levels.next_above(prices[-1]) is None
@@ -0,0 +1,33 @@
+import importlib
+import sys
+
+
+def test_importing_symbol_utils_does_not_touch_the_terminal(terminal, monkeypatch):
+    monkeypatch.delitem(sys.modules, "symbol_utils", raising=False)
+    symbol_utils = importlib.import_module("symbol_utils")
+    assert terminal.calls == {}
+    assert symbol_utils.resolved_symbols() is None
+
+    assert symbol_utils.SYMBOLS_TO_TRADE == ["EURUSD", "GBPUSD", "USDJPY", "EURJPY"]
+    assert terminal.calls["symbols_get"] == 1
+    symbol_utils.get_symbols_to_trade()
+    assert terminal.calls["symbols_get"] == 1
+
+
+def test_warm_start_symbols_skip_detection(terminal, monkeypatch):
+    monkeypatch.delitem(sys.modules, "symbol_utils", raising=False)
+    symbol_utils = importlib.import_module("symbol_utils")
+    assert symbol_utils.restore_symbols(["EURUSD"])
+    assert symbol_utils.get_symbols_to_trade() == ["EURUSD"]
+    assert "symbols_get" not in terminal.calls
+
+
+def test_parse_importtime():
+    from startup_profile import parse_importtime
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   numpy.core",
+        "import time:      2500 |       2620 | numpy",
+        "something else",
+    ])
+    assert parse_importtime(stderr) == [("numpy.core", 0.12, 0.12, 1), ("numpy", 2.5, 2.62, 0)]
@@ -0,0 +1,77 @@
+import fake_mt5
+
+
+def _state(index):
+    return index.swings, index.events, index.demand.zones, index.supply.zones, index._last_high, index._last_low
+
+
+def test_incremental_updates_match_a_full_rebuild(terminal, monkeypatch):
+    import structure_index
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_H1, 0, 1201)
+
+    full = structure_index.StructureIndex("EURUSD", fake_mt5.TIMEFRAME_H1, history=1200)
+    full.build(bars[:-1])
+
+    incremental = structure_index.StructureIndex("EURUSD", fake_mt5.TIMEFRAME_H1, history=1200)
+    incremental.build(bars[:700])
+    for end in list(range(717, 1201, 17)) + [1201]:
+        # bars[end - 1] plays the forming bar
+        monkeypatch.setattr(structure_index, "get_candles",
+                            lambda symbol, timeframe, count, end=end: bars[max(0, end - count):end])
+        incremental.update(force=True)
+
+    assert len(incremental.time) == 1200
+    assert _state(incremental) == _state(full)
+    assert full.events and full.demand.zones
+
+
+def test_vectorized_build_matches_stepping_bar_by_bar(terminal):
+    from structure_index import StructureIndex
+    bars = fake_mt5.copy_rates_from_pos("GBPUSD", fake_mt5.TIMEFRAME_M15, 0, 800)
+
+    built = StructureIndex("GBPUSD", fake_mt5.TIMEFRAME_M15)
+    built.build(bars)
+
+    stepped = StructureIndex("GBPUSD", fake_mt5.TIMEFRAME_M15)
+    stepped.build(bars[:0])
+    stepped.time, stepped.open, stepped.high, stepped.low, stepped.close = (
+        bars["time"], bars["open"], bars["high"], bars["low"], bars["close"])
+    for i in range(len(bars)):
+        stepped._step(i)
+
+    assert _state(stepped) == _state(built)
+
+
+def test_update_after_a_gap_rebuilds(terminal, monkeypatch):
+    import structure_index
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_H1, 0, 400)
+    index = structure_index.StructureIndex("EURUSD", fake_mt5.TIMEFRAME_H1, history=300)
+    index.build(bars[:100])
+    generation = index.generation
+
+    monkeypatch.setattr(structure_index, "get_candles", lambda symbol, timeframe, count: bars[-count:])
+    index.update(force=True)
+    assert index.generation == generation + 1
+    assert index.time[-1] == bars["time"][-2]
+
+
+def test_updates_keep_only_the_latest_history_bars(terminal, monkeypatch):
+    import structure_index
+    bars = fake_mt5.copy_rates_from_pos("EURUSD", fake_mt5.TIMEFRAME_H1, 0, 2001)
+    index = structure_index.StructureIndex("EURUSD", fake_mt5.TIMEFRAME_H1, history=300)
+    index.build(bars[:300])
+
+    reallocations, buffers = 0, index._buffers
+    for end in range(311, 2002, 10):
+        monkeypatch.setattr(structure_index, "get_candles",
+                            lambda symbol, timeframe, count, end=end: bars[max(0, end - count):end])
+        index.update(force=True)
+        reallocations += index._buffers is not buffers
+        buffers = index._buffers
+        assert len(index.time) == 300
+        assert (index.time == bars["time"][end - 301:end - 1]).all()
+        assert (index.close == bars["close"][end - 301:end - 1]).all()
+
+    # Buffers hold twice the history, so one copy per ~30 appends of 10 bars
+    assert reallocations <= 6
+    assert index._last_high[0] < 300 and index._last_low[0] < 300
@@ -0,0 +1,86 @@
+import numpy as np
+
+import fake_mt5
+
+
+def _ticks(spreads, start_msc=1_000_000):
+    ticks = np.zeros(len(spreads), dtype=fake_mt5.TICKS_DTYPE)
+    ticks["time_msc"] = start_msc + np.arange(len(spreads)) * 100
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["bid"] = 1.1
+    ticks["ask"] = 1.1 + np.asarray(spreads) * 0.00001
+    return ticks
+
+
+def _buffer(capacity):
+    from tick_store import TickBuffer
+    buffer = TickBuffer("EURUSD", capacity=capacity)
+    buffer.point = 0.00001
+    return buffer
+
+
+def _expected(spreads, q):
+    ordered = np.sort(spreads)
+    return int(ordered[max(1, int(np.ceil(q / 100 * len(ordered)))) - 1])
+
+
+def test_percentiles_match_sorted_spreads():
+    spreads = np.random.default_rng(1).integers(0, 40, 500)
+    buffer = _buffer(1000)
+    buffer.append(_ticks(spreads))
+
+    for q in (1, 50, 90, 95, 100):
+        assert buffer.spread_percentile(q) == _expected(spreads, q)
+    stats = buffer.stats()
+    assert stats["median"] == _expected(spreads, 50)
+    assert stats["current"] == spreads[-1]
+    assert stats["ticks"] == 500
+
+
+def test_evicted_ticks_leave_the_histogram():
+    spreads = np.random.default_rng(2).integers(0, 40, 700)
+    buffer = _buffer(256)
+    for start in range(0, 700, 100):
+        buffer.append(_ticks(spreads[start:start + 100], 1_000_000 + start * 100))
+
+    kept = spreads[-256:]
+    assert buffer.size == 256
+    assert buffer.spread_percentile(50) == _expected(kept, 50)
+    assert buffer.spread_percentile(95) == _expected(kept, 95)
+    assert (buffer.ticks()["time_msc"] == _ticks(spreads)["time_msc"][-256:]).all()
+
+
+def test_stale_and_invalid_ticks_are_skipped():
+    buffer = _buffer(100)
+    assert buffer.append(_ticks([2, 2, 2])) == 3
+    # Older ticks, and an identical copy of the last one, are already stored
+    assert buffer.append(_ticks([5, 5, 2])) == 0
+
+    invalid = _ticks([3, 3], start_msc=2_000_000)
+    invalid["bid"][0] = 0
+    assert buffer.append(invalid) == 1
+    assert buffer.latest().time_msc == 2_000_100
+
+
+def test_sync_is_incremental(terminal):
+    from tick_store import TickBuffer
+    buffer = TickBuffer("EURUSD", capacity=5000)
+    first = buffer.sync(force=True)
+    assert first > 0
+
+    terminal.advance(30)
+    assert buffer.sync(force=True) == 30
+    assert buffer.latest().time == terminal.now
+
+
+def test_ticks_sharing_the_last_millisecond_are_kept_once():
+    buffer = _buffer(100)
+    first = _ticks([2, 2, 3])
+    first["time_msc"][2] = first["time_msc"][1]
+    assert buffer.append(first[:2]) == 2
+
+    # Refetching from the last millisecond brings back the stored tick plus a new one at the same time
+    assert buffer.append(first[1:]) == 1
+    assert buffer.append(first) == 0
+    assert buffer.size == 3
+    assert buffer.stats()["current"] == 3
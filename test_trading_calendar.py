@@ -0,0 +1,91 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+SESSIONS = {"London": {"start": 7, "end": 16}, "Asia": {"start": 23, "end": 6}}
+MONDAY = int(datetime(2026, 12, 21, tzinfo=timezone.utc).timestamp())  # Christmas is that Friday
+CHRISTMAS = MONDAY + 4 * 86400
+
+
+def _calendar(**kwargs):
+    from trading_calendar import TradingCalendar
+    kwargs.setdefault("holidays", {})
+    return TradingCalendar(sessions=SESSIONS, symbol_sessions={"US30": ["London"]}, crypto=["BTCUSD"],
+                           allow_weekend_crypto=True, **kwargs)
+
+
+def _expected(symbol, ts, holidays=()):
+    moment = datetime.fromtimestamp(ts, timezone.utc)
+    crypto = symbol == "BTCUSD"
+    if moment.weekday() >= 5:
+        return crypto
+    if moment.date().isoformat() in holidays and not crypto:
+        return False
+    hour = moment.hour
+    london = 7 <= hour < 16
+    return london if symbol == "US30" else london or hour >= 23 or hour < 6
+
+
+@pytest.mark.parametrize("symbol", ["EURUSD", "US30", "BTCUSD"])
+def test_bitmap_matches_the_session_rules_every_hour(symbol):
+    calendar = _calendar(holidays={"2026-12-25": ["*"]})
+    for ts in range(MONDAY, MONDAY + 14 * 86400, 1800):
+        assert calendar.is_open(symbol, ts) == _expected(symbol, ts, {"2026-12-25"}), (symbol, ts)
+    assert len(calendar.week(symbol)) == 168
+
+
+def test_prefix_holiday_closes_only_matching_symbols():
+    calendar = _calendar(holidays={"2026-12-25": ["US30"]})
+    ten_am = CHRISTMAS + 10 * 3600
+    assert not calendar.is_open("US30", ten_am)
+    assert calendar.is_open("EURUSD", ten_am)
+    assert calendar.open_symbols(["US30", "EURUSD", "BTCUSD"], ten_am) == ["EURUSD", "BTCUSD"]
+
+
+def test_holidays_load_from_the_data_file(monkeypatch, tmp_path):
+    import trading_calendar
+    path = tmp_path / "holidays.json"
+    path.write_text(json.dumps({"2026-12-25": ["*"]}))
+    assert trading_calendar.load_holidays(str(path)) == {"2026-12-25": ["*"]}
+    assert trading_calendar.load_holidays(str(tmp_path / "missing.json")) == {}
+
+    monkeypatch.setattr(trading_calendar, "load_holidays", lambda: {"2026-12-25": ["*"]})
+    calendar = _calendar(holidays=None)
+    assert not calendar.is_open("EURUSD", CHRISTMAS + 10 * 3600)
+    assert calendar.is_open("EURUSD", CHRISTMAS - 86400 + 10 * 3600)
+
+
+@pytest.mark.parametrize("content", ['{"25/12/2026": ["*"]}', '{"2026-12-25": "*"}', "[1, 2]", "not json"])
+def test_invalid_holiday_file_is_ignored(tmp_path, content):
+    import trading_calendar
+    path = tmp_path / "holidays.json"
+    path.write_text(content)
+    assert trading_calendar.load_holidays(str(path)) == {}
+
+
+def test_sessions_and_holidays_follow_settings_reloads(monkeypatch, overrides):
+    import trading_calendar
+    monkeypatch.setattr(trading_calendar, "load_holidays", lambda: {})
+    calendar = trading_calendar.TradingCalendar(crypto=["BTCUSD"])
+    three_am = MONDAY + 3 * 3600
+    assert calendar.is_open("EURUSD", three_am)  # default Asia session
+
+    overrides(TRADING_SESSIONS={"London": {"start": 7, "end": 16}},
+              MARKET_HOLIDAYS={"2026-12-25": ["*"]})
+    assert not calendar.is_open("EURUSD", three_am)
+    assert calendar.is_open("EURUSD", MONDAY + 10 * 3600)
+    assert not calendar.is_open("EURUSD", CHRISTMAS + 10 * 3600)
+    assert not calendar.in_sessions(three_am)
+
+    overrides(SYMBOL_SESSIONS={"EUR": ["London"]})
+    assert calendar.is_open("EURUSD", CHRISTMAS + 10 * 3600)
+    assert not calendar.is_open("EURUSD", three_am)
+    assert calendar.is_open("GBPUSD", three_am)
+
+
+def test_shipped_holiday_file_is_valid():
+    import trading_calendar
+    holidays = trading_calendar.load_holidays(os.path.join(os.path.dirname(__file__), "data", "market_holidays.json"))
+    assert holidays and all(prefixes == ["*"] for prefixes in holidays.values())
@@ -0,0 +1,70 @@
+import fake_mt5
+import pytest
+
+IDENTITY = {"server": "Demo-Server", "login": 1001}
+
+
+def _state(index):
+    return index.swings, index.events, index.demand.zones, index.supply.zones, index._last_high, index._last_low
+
+
+@pytest.fixture
+def caches(terminal, monkeypatch):
+    import structure_index
+    import symbol_utils
+    monkeypatch.setattr(structure_index, "_indexes", {})
+    monkeypatch.setattr(symbol_utils, "_symbols", None)
+    return structure_index, symbol_utils
+
+
+def test_snapshot_round_trip_restores_the_same_state(caches, monkeypatch, tmp_path):
+    import warm_start
+    structure_index, symbol_utils = caches
+    symbols = symbol_utils.get_symbols_to_trade()
+    original = structure_index.get_structure("EURUSD", fake_mt5.TIMEFRAME_H1)
+    assert len(original.time)
+
+    assert warm_start.save(IDENTITY, root=str(tmp_path))
+    monkeypatch.setattr(structure_index, "_indexes", {})
+    monkeypatch.setattr(symbol_utils, "_symbols", None)
+
+    restored = warm_start.restore(IDENTITY, root=str(tmp_path))
+    assert restored["symbols"] == 1 and restored["structure"] == 1
+    assert symbol_utils.resolved_symbols() == symbols
+    index = structure_index.all_structures()[0]
+    assert (index.symbol, index.timeframe) == ("EURUSD", fake_mt5.TIMEFRAME_H1)
+    assert list(index.time) == list(original.time)
+    assert _state(index) == _state(original)
+
+
+def test_snapshot_is_rejected_for_another_account_or_when_too_old(caches, tmp_path):
+    import warm_start
+    caches[0].get_structure("EURUSD", fake_mt5.TIMEFRAME_H1)
+    warm_start.save(IDENTITY, root=str(tmp_path))
+
+    assert warm_start.load_manifest(IDENTITY, root=str(tmp_path))[0] is not None
+    other = dict(IDENTITY, login=1002)
+    assert warm_start.load_manifest(other, root=str(tmp_path)) == (None, "no snapshot")
+    manifest, reason = warm_start.load_manifest(IDENTITY, root=str(tmp_path), max_age=-1)
+    assert manifest is None and "old" in reason
+
+
+def test_second_account_in_the_process_turns_snapshots_off(monkeypatch):
+    import warm_start
+    restored = []
+    monkeypatch.setattr(warm_start, "WARM_START_ENABLED", True)
+    monkeypatch.setattr(warm_start, "_identity", None)
+    monkeypatch.setattr(warm_start, "_shared", False)
+    monkeypatch.setattr(warm_start, "restore", lambda identity: restored.append(identity) or {})
+    monkeypatch.setattr(warm_start, "_save_periodically", lambda interval: None)
+    account = fake_mt5.account_info()
+
+    warm_start.resume(account)
+    warm_start.resume(account)
+    assert restored == [warm_start.identity_of(account)]
+    assert not warm_start._shared
+
+    other = account._replace(login=account.login + 1)
+    assert warm_start.resume(other) is None
+    assert restored == [warm_start.identity_of(account)]
+    assert warm_start.save() is None and warm_start.save_on_shutdown() is None
@@ -0,0 +1,273 @@
+"""
+Per-symbol tick ring buffers with rolling spread statistics.
+
+Ticks are pulled incrementally from MT5 (copy_ticks_range for the initial
+lookback, then copy_ticks_from after the last stored tick) into fixed-size
+NumPy ring buffers, so memory stays bounded however long the bot runs.
+
+A histogram of spreads (in points) is updated as ticks enter and leave the
+buffer. Spread median/percentiles, tick rate and the latest tick are
+computed once per ingest, so readers (spread filter, entry pricing,
+trailing stops) get them in O(1).
+"""
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import MetaTrader5 as mt5
+
+try:
+    from config import (
+        TICK_STORE_ENABLED,
+        TICK_BUFFER_SIZE,
+        TICK_LOOKBACK_SECONDS,
+        TICK_RATE_WINDOW_SECONDS,
+        TICK_STORE_MIN_SYNC_SECONDS,
+    )
+except ImportError:
+    from backend.config import (
+        TICK_STORE_ENABLED,
+        TICK_BUFFER_SIZE,
+        TICK_LOOKBACK_SECONDS,
+        TICK_RATE_WINDOW_SECONDS,
+        TICK_STORE_MIN_SYNC_SECONDS,
+    )
+
+# Same layout as the structured arrays MT5's copy_ticks_* functions return
+TICKS_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+    ("volume", "<u8"), ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8"),
+])
+
+# Same fields as the tick MT5's symbol_info_tick returns
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+
+SPREAD_BINS = 2048     # spreads of SPREAD_BINS - 1 points or more share the last bin
+FETCH_BATCH = 10000    # ticks per copy_ticks_from call
+MAX_FETCH_BATCHES = 5  # per sync, so a burst cannot stall a scan cycle
+
+
+class TickBuffer:
+    """
+    Ring buffer of the latest ticks for one symbol plus rolling spread stats.
+    """
+
+    def __init__(self, symbol, capacity=TICK_BUFFER_SIZE):
+        self.symbol = symbol
+        self.capacity = capacity
+        self.point = None
+        self.size = 0
+        self.last_msc = 0
+        self._last_keys = set()  # (bid, ask, flags) of the stored ticks at last_msc
+        self.last_sync = 0.0
+        self._ticks = np.zeros(capacity, dtype=TICKS_DTYPE)
+        self._spreads = np.zeros(capacity, dtype=np.int64)
+        self._head = 0  # next write position
+        self._hist = np.zeros(SPREAD_BINS, dtype=np.int64)
+        self._cumulative = None
+        self._latest = None
+        self._stats = None
+        self._lock = threading.RLock()
+
+    # --- Ingest ---
+    def _spread_points(self, ticks):
+        spreads = np.rint((ticks["ask"] - ticks["bid"]) / self.point).astype(np.int64)
+        return np.clip(spreads, 0, SPREAD_BINS - 1)
+
+    @staticmethod
+    def _keys(ticks):
+        return set(zip(ticks["bid"].tolist(), ticks["ask"].tolist(), ticks["flags"].tolist()))
+
+    def _unseen(self, ticks):
+        """
+        Ticks not stored yet. Several ticks can share a millisecond, and
+        copy_ticks_from re-sends the last stored one's, so ticks at last_msc
+        are kept unless an identical one (bid, ask, flags) is already stored.
+        """
+        keep = ticks["time_msc"] > self.last_msc
+        for i in np.nonzero(ticks["time_msc"] == self.last_msc)[0]:
+            key = (float(ticks["bid"][i]), float(ticks["ask"][i]), int(ticks["flags"][i]))
+            if key not in self._last_keys:
+                self._last_keys.add(key)
+                keep[i] = True
+        return ticks[keep]
+
+    def append(self, ticks):
+        """Append ticks not already stored. Returns the number added."""
+        if ticks is None or len(ticks) == 0:
+            return 0
+        ticks = np.asarray(ticks).astype(TICKS_DTYPE, copy=False)
+        ticks = ticks[(ticks["bid"] > 0) & (ticks["ask"] > 0)]
+
+        with self._lock:
+            ticks = self._unseen(ticks)
+            added = len(ticks)
+            if not added:
+                return 0
+
+            if added >= self.capacity:
+                ticks = ticks[-self.capacity:]
+                self._hist[:] = 0
+                self._head = 0
+                self.size = 0
+
+            spreads = self._spread_points(ticks)
+            n = len(ticks)
+
+            # Evict the oldest ticks the new ones overwrite
+            overflow = self.size + n - self.capacity
+            if overflow > 0:
+                start = (self._head - self.size) % self.capacity
+                evicted = np.take(self._spreads, np.arange(start, start + overflow), mode="wrap")
+                self._hist -= np.bincount(evicted, minlength=SPREAD_BINS)
+
+            positions = np.arange(self._head, self._head + n) % self.capacity
+            self._ticks[positions] = ticks
+            self._spreads[positions] = spreads
+            self._hist += np.bincount(spreads, minlength=SPREAD_BINS)
+            self._head = (self._head + n) % self.capacity
+            self.size = min(self.capacity, self.size + n)
+            last = int(ticks["time_msc"][-1])
+            if last != self.last_msc:
+                self.last_msc = last
+                self._last_keys = self._keys(ticks[ticks["time_msc"] == last])
+            self._latest = Tick(*ticks[-1].tolist())
+            self._update_stats(int(spreads[-1]))
+        return added
+
+    def _segments(self):
+        """The buffer's time-ordered parts: (older, newer) views, no copy."""
+        start = (self._head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return (self._ticks[start:start + self.size],)
+        return self._ticks[start:], self._ticks[:self._head]
+
+    def _update_stats(self, current):
+        self._cumulative = np.cumsum(self._hist)
+        segments = self._segments()
+
+        # Ticks per second over the rate window (or over the buffer's span if shorter)
+        cutoff = self.last_msc - TICK_RATE_WINDOW_SECONDS * 1000
+        oldest = int(segments[0]["time_msc"][0])
+        if oldest > cutoff:
+            span = max((self.last_msc - oldest) / 1000, 1.0)
+            rate = self.size / span
+        else:
+            recent = sum(len(s) - int(np.searchsorted(s["time_msc"], cutoff, side="left")) for s in segments)
+            rate = recent / TICK_RATE_WINDOW_SECONDS
+
+        bins = np.arange(SPREAD_BINS)
+        self._stats = {
+            "current": current,
+            "median": self.spread_percentile(50),
+            "p90": self.spread_percentile(90),
+            "p95": self.spread_percentile(95),
+            "mean": float(self._hist @ bins) / self.size,
+            "tick_rate": round(rate, 3),
+            "ticks": self.size,
+        }
+
+    def spread_percentile(self, q):
+        """Spread in points at percentile q (0-100) over the buffered ticks."""
+        if not self.size:
+            return None
+        rank = max(1, int(np.ceil(q / 100 * self.size)))
+        return int(np.searchsorted(self._cumulative, rank, side="left"))
+
+    # --- Sync ---
+    def sync(self, force=False):
+        """
+        Pull new ticks from MT5. The first sync (or one after a long pause)
+        loads TICK_LOOKBACK_SECONDS of history; later syncs fetch only ticks
+        after the last stored one. Returns the number of ticks added.
+        """
+        now = time.time()
+        if not force and now - self.last_sync < TICK_STORE_MIN_SYNC_SECONDS:
+            return 0
+
+        with self._lock:
+            stale = now - self.last_sync > TICK_LOOKBACK_SECONDS
+            self.last_sync = now
+
+            if self.point is None:
+                info = mt5.symbol_info(self.symbol)
+                if not info or not info.point:
+                    return 0
+                self.point = info.point
+
+            if not self.size or stale:
+                tick = mt5.symbol_info_tick(self.symbol)
+                if not tick:
+                    return 0
+                ticks = mt5.copy_ticks_range(self.symbol, tick.time - TICK_LOOKBACK_SECONDS,
+                                             tick.time + 1, mt5.COPY_TICKS_INFO)
+                return self.append(ticks)
+
+            added = 0
+            for _ in range(MAX_FETCH_BATCHES):
+                ticks = mt5.copy_ticks_from(self.symbol, self.last_msc // 1000, FETCH_BATCH, mt5.COPY_TICKS_INFO)
+                if ticks is None or len(ticks) == 0:
+                    break
+                added += self.append(ticks)
+                if len(ticks) < FETCH_BATCH:
+                    break
+            return added
+
+    # --- Reads ---
+    def latest(self):
+        """The newest buffered tick, shaped like symbol_info_tick's result."""
+        return self._latest
+
+    def stats(self):
+        """Rolling spread stats in points plus tick rate, or None before any ticks."""
+        return self._stats
+
+    def ticks(self):
+        """Buffered ticks, oldest first (a copy)."""
+        with self._lock:
+            return np.concatenate(self._segments()) if self.size else self._ticks[:0].copy()
+
+    def since(self, msc):
+        """Buffered ticks after `msc` (time_msc), oldest first (a copy)."""
+        with self._lock:
+            if not self.size or msc >= self.last_msc:
+                return self._ticks[:0].copy()
+            parts = [s[int(np.searchsorted(s["time_msc"], msc, side="right")):] for s in self._segments()]
+            return np.concatenate(parts)
+
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+
+
+def get_buffer(symbol):
+    """Return the shared TickBuffer for `symbol`, creating it on first use."""
+    buffer = _buffers.get(symbol)
+    if buffer is None:
+        with _buffers_lock:
+            buffer = _buffers.get(symbol)
+            if buffer is None:
+                buffer = _buffers[symbol] = TickBuffer(symbol)
+    return buffer
+
+
+def current_tick(symbol):
+    """
+    Latest tick for `symbol`: from the tick buffer when the tick store is
+    enabled, otherwise (or if the buffer has nothing) from symbol_info_tick.
+    """
+    if TICK_STORE_ENABLED:
+        buffer = get_buffer(symbol)
+        buffer.sync()
+        tick = buffer.latest()
+        if tick is not None:
+            return tick
+    return mt5.symbol_info_tick(symbol)
+
+
+def spread_stats(symbol):
+    """Rolling spread stats for `symbol` (see TickBuffer.stats), syncing first."""
+    buffer = get_buffer(symbol)
+    buffer.sync()
+    return buffer.stats()
@@ -1,9 +1,19 @@
 import MetaTrader5 as mt5
-from backend.config import MAX_SPREAD_PIPS  # Set this in config, e.g., MAX_SPREAD_PIPS = 3
+
+try:
+    import settings  # MAX_SPREAD_PIPS is read from the live settings snapshot
+    from config import TICK_STORE_ENABLED
+    from tick_store import spread_stats
+except ImportError:
+    from backend import settings
+    from backend.config import TICK_STORE_ENABLED
+    from backend.tick_store import spread_stats
 
 def is_spread_acceptable(symbol, max_spread_pips=None):
     """
     Check if the spread for the given symbol is within the acceptable limit.
+    With the tick store enabled, the rolling median spread is used instead
+    of a single tick snapshot.
 
     Args:
         symbol (str): The trading symbol, e.g., 'EURUSD'
@@ -12,7 +22,12 @@ def is_spread_acceptable(symbol, max_spread_pips=None):
     Returns:
         bool: True if spread is acceptable, False otherwise
     """
-    max_spread_pips = max_spread_pips or MAX_SPREAD_PIPS
+    max_spread_pips = max_spread_pips or settings.current().MAX_SPREAD_PIPS
+
+    if TICK_STORE_ENABLED:
+        stats = spread_stats(symbol)
+        if stats:
+            return stats["median"] <= max_spread_pips
 
     # Fetch current market data
     tick = mt5.symbol_info_tick(symbol)
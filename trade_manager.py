@@ -1,10 +1,15 @@
 import MetaTrader5 as mt5
 from utils import log
-from config import MAX_LOT_SIZE, RISK_SMALL_ACCOUNT, RISK_LARGE_ACCOUNT
+from tick_store import current_tick
+from positions_snapshot import PositionsSnapshot, refresh_after_order
+from order_executor import get_executor
+import settings
 
 
 def get_open_position(symbol, positions):
     """Return the open position for the symbol, if any."""
+    if isinstance(positions, PositionsSnapshot):
+        return positions.first(symbol)
     return next((pos for pos in positions if pos.symbol == symbol), None)
 
 
@@ -15,11 +20,12 @@ def calculate_lot_size(account_balance):
     For small accounts (< $100), it returns a fixed 0.01.
     For large accounts (>= $200), it uses percentage-based risk.
     """
+    cfg = settings.current()
     if account_balance < 100:
         return 0.01
     elif account_balance >= 200:
-        risk = RISK_LARGE_ACCOUNT
-        lot = round(min((risk * account_balance) / 1000, MAX_LOT_SIZE), 2)
+        risk = cfg.RISK_LARGE_ACCOUNT
+        lot = round(min((risk * account_balance) / 1000, cfg.MAX_LOT_SIZE), 2)
         return lot
     return 0.01  # fallback minimum
 
@@ -30,14 +36,14 @@ def scale_in_position(mt5_manager, position):
     capped by MAX_LOT_SIZE.
     """
     current_volume = position.volume
-    new_volume = min(current_volume * 1.5, MAX_LOT_SIZE)
+    new_volume = min(current_volume * 1.5, settings.current().MAX_LOT_SIZE)
     add_volume = round(new_volume - current_volume, 2)
 
     if add_volume <= 0:
         log(f"🟡 No room to scale in further on {position.symbol}")
         return
 
-    tick = mt5.symbol_info_tick(position.symbol)
+    tick = current_tick(position.symbol)
     if not tick:
         log(f"❌ Tick fetch failed for {position.symbol}")
         return
@@ -70,7 +76,7 @@ def manage_trailing_stop(position, entry_price, strategy_sr):
     - For BUY: trail SL once price reaches +1%
     - For SELL: trail SL once price drops -1%
     """
-    tick = mt5.symbol_info_tick(position.symbol)
+    tick = current_tick(position.symbol)
     if not tick:
         log(f"⚠️ No tick data for {position.symbol}, cannot trail SL.")
         return
@@ -88,7 +94,10 @@ def manage_trailing_stop(position, entry_price, strategy_sr):
 def update_stop_loss(position, new_sl):
     """
     Update the stop loss for a given MT5 position.
+    Skipped when the SL would not change.
     """
+    if new_sl == position.sl:
+        return
     request = {
         "action": mt5.TRADE_ACTION_SLTP,
         "position": position.ticket,
@@ -103,42 +112,36 @@ def update_stop_loss(position, new_sl):
     result = mt5.order_send(request)
     if result.retcode == mt5.TRADE_RETCODE_DONE:
         log(f"✅ SL updated for {position.symbol} → SL = {new_sl}")
+        refresh_after_order()
     else:
         log(f"❌ SL update failed on {position.symbol} → code {result.retcode} ({result.comment})")
 
 
-def place_order(symbol, lot, order_type, price, sl, tp):
+def place_order(symbol, lot, order_type, price, sl, tp, account=None, signal_time=None):
     """
-    Sends a trade order to MT5 with the given parameters.
+    Sends a trade order to MT5 with the given parameters through the
+    account's order executor (cached filling mode, requote retries).
     """
-    order_type_map = {
-        "buy": mt5.ORDER_TYPE_BUY,
-        "sell": mt5.ORDER_TYPE_SELL,
-    }
-
-    if order_type not in order_type_map:
+    if order_type not in ("buy", "sell"):
         log(f"❌ Invalid order_type: {order_type}")
         return False
 
-    request = {
-        "action": mt5.TRADE_ACTION_DEAL,
+    result = get_executor(account).place({
         "symbol": symbol,
-        "volume": lot,
-        "type": order_type_map[order_type],
+        "order_type": order_type,
+        "lot": lot,
         "price": price,
         "sl": sl,
         "tp": tp,
-        "deviation": 10,
         "magic": 123456,
         "comment": "SentinelFXBot",
-        "type_time": mt5.ORDER_TIME_GTC,
-        "type_filling": mt5.ORDER_FILLING_IOC,
-    }
-
-    result = mt5.order_send(request)
-    if result.retcode == mt5.TRADE_RETCODE_DONE:
-        log(f"✅ Order placed: {order_type.upper()} {symbol} at {price}, SL={sl}, TP={tp}")
+        "signal_time": signal_time,
+    })
+    if result["ok"]:
+        log(f"✅ Order placed: {order_type.upper()} {symbol} at {result['price']}, SL={sl}, TP={tp} "
+            f"(slippage {result['slippage_points']} pts, attempts {result['attempts']})")
+        refresh_after_order()
         return True
     else:
-        log(f"❌ Order failed: code={result.retcode}, comment={result.comment}")
+        log(f"❌ Order failed: code={result['retcode']}, comment={result['comment']}")
         return False
@@ -0,0 +1,211 @@
+"""
+Precomputed weekly trading calendar per symbol.
+
+Each symbol gets a 168-byte bitmap, one byte per UTC hour of the week
+(Monday 00:00 = 0), built from TRADING_SESSIONS (or the symbol's
+SYMBOL_SESSIONS), the weekend crypto rule and the market holidays
+(MARKET_HOLIDAYS_FILE, plus MARKET_HOLIDAYS). Sessions and holidays come
+from the settings snapshot, and the bitmaps are rebuilt when a reload
+changes it. is_open() is then an index into the bitmap plus a set lookup
+for holidays, so the scan loop can drop closed markets before any
+terminal or HTTP call.
+
+The MT5 Python API doesn't expose the broker's per-symbol session
+schedule, so the broker side is the symbol's trade mode: refresh_broker()
+marks symbols whose trading is disabled or close-only as closed.
+"""
+import json
+import threading
+import time
+from datetime import date
+
+try:
+    from config import (
+        CRYPTO_SYMBOLS,
+        ALLOW_WEEKEND_CRYPTO,
+        MARKET_HOLIDAYS_FILE,
+    )
+except ImportError:
+    from backend.config import (
+        CRYPTO_SYMBOLS,
+        ALLOW_WEEKEND_CRYPTO,
+        MARKET_HOLIDAYS_FILE,
+    )
+
+HOURS_PER_WEEK = 168
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def session_hours(sessions):
+    """24 flags: whether each UTC hour falls in any of `sessions` (end exclusive, may cross midnight)."""
+    hours = [False] * 24
+    for session in sessions:
+        start, end = session["start"], session["end"]
+        for hour in range(24):
+            if (start <= hour < end) if start < end else (hour >= start or hour < end):
+                hours[hour] = True
+    return hours
+
+
+def hour_of_week(ts):
+    """UTC hour of the week for a Unix timestamp, Monday 00:00 = 0 (1970-01-01 was a Thursday)."""
+    ts = int(ts)
+    return ((ts // 86400 + 3) % 7) * 24 + ts % 86400 // 3600
+
+
+def load_holidays(path=MARKET_HOLIDAYS_FILE):
+    """Holidays from a JSON file ({"YYYY-MM-DD": [prefixes]}), or {} if it's missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            holidays = json.load(f)
+        for day, prefixes in holidays.items():
+            date.fromisoformat(day)
+            if not isinstance(prefixes, list) or not all(isinstance(p, str) for p in prefixes):
+                raise ValueError(f"{day}: expected a list of symbol prefixes")
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError) as e:
+        try:  # deferred: utils imports this module
+            from utils import log
+        except ImportError:
+            from backend.utils import log
+        log(f"⚠️ Ignoring market holidays in {path}: {e}")
+        return {}
+    return holidays
+
+
+def _settings():
+    # deferred: settings imports utils, which imports this module
+    try:
+        import settings
+    except ImportError:
+        from backend import settings
+    return settings.current()
+
+
+def _matches(symbol, prefixes):
+    symbol = symbol.upper()
+    return any(symbol.startswith(p.upper()) for p in prefixes)
+
+
+class TradingCalendar:
+    """
+    Weekly open/closed bitmaps, built lazily per symbol and then read-only.
+
+    sessions, symbol_sessions and holidays left as None follow the settings
+    snapshot (holidays: MARKET_HOLIDAYS_FILE plus MARKET_HOLIDAYS).
+    """
+
+    def __init__(self, sessions=None, symbol_sessions=None, crypto=CRYPTO_SYMBOLS,
+                 allow_weekend_crypto=ALLOW_WEEKEND_CRYPTO, holidays=None):
+        self._fixed = (sessions, symbol_sessions, holidays)
+        self._follows = None in self._fixed
+        self._version = None       # settings version the bitmaps were built for
+        self.crypto = crypto
+        self.allow_weekend_crypto = allow_weekend_crypto
+        self._symbols = {}         # symbol -> (168-byte bitmap, frozenset of closed day numbers)
+        self._broker_closed = frozenset()
+        self._lock = threading.Lock()
+        self._sync()
+
+    def _sync(self):
+        """Pick up sessions and holidays from a new settings snapshot, dropping the built bitmaps."""
+        snapshot = _settings() if self._follows else None
+        version = snapshot.version if snapshot else 0
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            sessions, symbol_sessions, holidays = self._fixed
+            if snapshot:
+                sessions = snapshot.TRADING_SESSIONS if sessions is None else sessions
+                symbol_sessions = snapshot.SYMBOL_SESSIONS if symbol_sessions is None else symbol_sessions
+                holidays = {**load_holidays(), **snapshot.MARKET_HOLIDAYS} if holidays is None else holidays
+            self.sessions = sessions
+            self.symbol_sessions = symbol_sessions
+            # day number (days since 1970-01-01) -> prefixes closed that day
+            self.holidays = {date.fromisoformat(d).toordinal() - EPOCH_ORDINAL: tuple(p)
+                             for d, p in holidays.items()}
+            self._hours = tuple(session_hours(sessions.values()))
+            self._symbols = {}
+            self._version = version
+
+    def is_crypto(self, symbol):
+        return _matches(symbol, self.crypto)
+
+    def _build(self, symbol):
+        crypto = self.is_crypto(symbol)
+        names = next((v for k, v in self.symbol_sessions.items() if symbol.upper().startswith(k.upper())), None)
+        sessions = [self.sessions[n] for n in names] if names is not None else self.sessions.values()
+        hours = session_hours(sessions)
+
+        week = bytearray(HOURS_PER_WEEK)
+        for day in range(7):
+            weekend = day >= 5
+            for hour in range(24):
+                week[day * 24 + hour] = (crypto and self.allow_weekend_crypto) if weekend else hours[hour]
+        closed_days = frozenset(
+            day for day, prefixes in self.holidays.items()
+            if ("*" in prefixes and not crypto) or _matches(symbol, [p for p in prefixes if p != "*"])
+        )
+        return bytes(week), closed_days
+
+    def _entry(self, symbol):
+        self._sync()
+        entry = self._symbols.get(symbol)
+        if entry is None:
+            with self._lock:
+                entry = self._symbols[symbol] = self._build(symbol)
+        return entry
+
+    def week(self, symbol):
+        """The symbol's 168-byte bitmap (1 = open)."""
+        return self._entry(symbol)[0]
+
+    def is_open(self, symbol, now=None):
+        """Whether `symbol` trades at `now` (Unix time, default: now). O(1)."""
+        ts = int(time.time() if now is None else now)
+        week, closed_days = self._entry(symbol)
+        return bool(week[hour_of_week(ts)]) and ts // 86400 not in closed_days and symbol not in self._broker_closed
+
+    def in_sessions(self, now=None):
+        """Whether `now` (Unix time, default: now) falls in any of the trading sessions."""
+        self._sync()
+        return self._hours[int(time.time() if now is None else now) % 86400 // 3600]
+
+    def open_symbols(self, symbols, now=None):
+        """The subset of `symbols` open at `now`, in order."""
+        now = int(time.time() if now is None else now)
+        return [s for s in symbols if self.is_open(s, now)]
+
+    def refresh_broker(self, symbols):
+        """Mark symbols the broker has disabled or set to close-only. Returns the closed ones."""
+        import MetaTrader5 as mt5  # only this refresh talks to the terminal
+
+        closed = set()
+        for symbol in symbols:
+            info = mt5.symbol_info(symbol)
+            if info is not None and info.trade_mode in (mt5.SYMBOL_TRADE_MODE_DISABLED,
+                                                        mt5.SYMBOL_TRADE_MODE_CLOSEONLY):
+                closed.add(symbol)
+        self._broker_closed = frozenset(closed)
+        return closed
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar():
+    """Return the process-wide calendar, creating it on first use."""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = TradingCalendar()
+    return _calendar
+
+
+def is_open(symbol, now=None):
+    return get_calendar().is_open(symbol, now)
@@ -1,5 +1,6 @@
 import datetime
-from config import CRYPTO_SYMBOLS, ALLOW_WEEKEND_CRYPTO, TRADING_SESSIONS
+from config import CRYPTO_SYMBOLS, ALLOW_WEEKEND_CRYPTO
+from trading_calendar import get_calendar, is_open
 
 
 def is_weekend():
@@ -16,10 +17,9 @@ def should_trade(symbol: str) -> bool:
     Decide if a symbol is tradable now based on:
     - Weekend rule for crypto
     - Active forex sessions for fiat pairs
+    Reads the precomputed weekly calendar (which also covers holidays).
     """
-    if is_weekend():
-        return is_crypto(symbol) and ALLOW_WEEKEND_CRYPTO
-    return in_trade_sessions()
+    return is_open(symbol)
 
 def current_gmt_time():
     """Return current UTC time"""
@@ -27,20 +27,7 @@ def current_gmt_time():
 
 def in_trade_sessions() -> bool:
     """Check if current time falls within any configured session"""
-    now = datetime.datetime.utcnow()
-    hour = now.hour
-
-    for session in TRADING_SESSIONS.values():
-        start = session['start']
-        end = session['end']
-        if start < end:
-            if start <= hour < end:
-                return True
-        else:
-            # Handles sessions crossing midnight (e.g., 22–5)
-            if hour >= start or hour < end:
-                return True
-    return False
+    return get_calendar().in_sessions()
 
 def log(message: str):
     """Standardized logging to console with UTC timestamp"""
@@ -0,0 +1,268 @@
+"""
+Warm-restart snapshots of the bot's runtime caches.
+
+On a clean stop, and every WARM_START_SAVE_SECONDS while running, the bot
+writes its caches to WARM_START_DIR/<server>_<login>/:
+
+  - the resolved broker symbols
+  - each market structure index: bars as .npy arrays (memory-mapped on
+    restore, not read into memory) plus swings, events and zones as JSON
+  - the correlation tracker's ring buffer and running sums (.npy)
+  - the news sentiment cache
+
+Each save goes into a new generation directory; manifest.json is replaced
+last, atomically, so a crash mid-save leaves the previous snapshot intact.
+On start, resume() checks the manifest's format, account/server identity
+and age before loading anything. Indexes then fetch only the bars closed
+since the snapshot (or rebuild if too many were missed), and news entries
+past their cache lifetime are dropped.
+
+Bar history needs nothing here: the bar store is already on disk.
+
+The caches are process-wide, so a snapshot is only taken while every
+session in the process is on the same account. That's always the case in
+process mode (one worker per account). In thread mode, once a second
+account starts in the same process the caches hold data for both, and
+snapshots stop for the rest of that process rather than filing one
+account's caches under another's directory.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+try:
+    from config import (
+        WARM_START_ENABLED,
+        WARM_START_DIR,
+        WARM_START_SAVE_SECONDS,
+        WARM_START_MAX_AGE_SECONDS,
+        WARM_START_KEEP,
+    )
+    from utils import log
+    import structure_index
+    import correlation
+    import symbol_utils
+except ImportError:
+    from backend.config import (
+        WARM_START_ENABLED,
+        WARM_START_DIR,
+        WARM_START_SAVE_SECONDS,
+        WARM_START_MAX_AGE_SECONDS,
+        WARM_START_KEEP,
+    )
+    from backend.utils import log
+    from backend import structure_index, correlation, symbol_utils
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+_identity = None  # the one account this process's caches belong to
+_shared = False   # set once a second account runs in the same process
+_save_lock = threading.Lock()
+_saver = None
+
+
+def identity_of(account_info):
+    """The broker identity a snapshot belongs to."""
+    return {"server": str(account_info.server), "login": int(account_info.login)}
+
+
+def account_dir(identity, root=WARM_START_DIR):
+    safe = "".join(c if c.isalnum() or c in "-." else "_" for c in identity["server"])
+    return os.path.join(root, f"{safe}_{identity['login']}")
+
+
+def _news():
+    # news_sentiment imports backend.config, so it may not load in a flat checkout; skip its cache then
+    try:
+        import news_sentiment
+    except ImportError:
+        try:
+            from backend import news_sentiment
+        except ImportError:
+            return None
+    return news_sentiment
+
+
+# --- Saving ---
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def save(identity=None, root=WARM_START_DIR):
+    """Write a new snapshot generation. Returns its directory, or None if there's nothing to save."""
+    if identity is None:
+        if _shared:
+            return None
+        identity = _identity
+    if identity is None:
+        return None
+    base = account_dir(identity, root)
+    with _save_lock:
+        started = time.perf_counter()
+        os.makedirs(base, exist_ok=True)
+        name = f"gen-{time.time_ns()}"
+        target = os.path.join(base, name)
+        os.makedirs(os.path.join(target, "structure"))
+        components = {}
+
+        symbols = symbol_utils.resolved_symbols()
+        if symbols:
+            components["symbols"] = list(symbols)
+
+        structures = []
+        for index in structure_index.all_structures():
+            bars, meta = index.export_state()
+            if not len(bars["time"]):
+                continue
+            stem = f"{index.symbol}_{index.timeframe}"
+            for key, array in bars.items():
+                np.save(os.path.join(target, "structure", f"{stem}.{key}.npy"), array)
+            _write_json(os.path.join(target, "structure", f"{stem}.json"), meta)
+            structures.append({"symbol": index.symbol, "timeframe": index.timeframe, "file": stem})
+        components["structure"] = structures
+
+        tracker = correlation.current_tracker()
+        if tracker is not None and tracker.symbols:
+            arrays, meta = tracker.export_state()
+            for key, array in arrays.items():
+                np.save(os.path.join(target, f"correlation.{key}.npy"), array)
+            components["correlation"] = meta
+
+        news = _news()
+        if news is not None:
+            components["news"] = news.export_cache()
+
+        manifest = {
+            "format": FORMAT_VERSION,
+            "created_at": time.time(),
+            "identity": identity,
+            "generation": name,
+            "components": components,
+        }
+        tmp = os.path.join(base, MANIFEST + ".tmp")
+        _write_json(tmp, manifest)
+        os.replace(tmp, os.path.join(base, MANIFEST))
+        _prune(base, keep=WARM_START_KEEP)
+
+    log(f"💾 Warm-start snapshot saved: {len(structures)} structure indexes "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return target
+
+
+def _prune(base, keep):
+    generations = sorted(d for d in os.listdir(base) if d.startswith("gen-"))
+    for old in generations[:-keep]:
+        # A generation still memory-mapped can't be removed on Windows; retry on the next save
+        shutil.rmtree(os.path.join(base, old), ignore_errors=True)
+
+
+# --- Restoring ---
+def load_manifest(identity, root=WARM_START_DIR, max_age=WARM_START_MAX_AGE_SECONDS):
+    """The snapshot manifest for `identity`, or None with the reason it can't be used."""
+    path = os.path.join(account_dir(identity, root), MANIFEST)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None, "no snapshot"
+    except (OSError, ValueError) as e:
+        return None, f"unreadable manifest: {e}"
+    if manifest.get("format") != FORMAT_VERSION:
+        return None, f"format {manifest.get('format')} (expected {FORMAT_VERSION})"
+    if manifest.get("identity") != identity:
+        return None, f"snapshot belongs to {manifest.get('identity')}"
+    age = time.time() - manifest.get("created_at", 0)
+    if age > max_age:
+        return None, f"snapshot is {age / 3600:.1f}h old"
+    return manifest, None
+
+
+def restore(identity, root=WARM_START_DIR):
+    """Load the snapshot for `identity` into the caches. Returns {component: count}, or None if cold."""
+    manifest, reason = load_manifest(identity, root)
+    if manifest is None:
+        log(f"🧊 Cold start: {reason}")
+        return None
+
+    started = time.perf_counter()
+    target = os.path.join(account_dir(identity, root), manifest["generation"])
+    components = manifest["components"]
+    restored = {}
+    try:
+        restored["symbols"] = int(symbol_utils.restore_symbols(components.get("symbols")))
+
+        count = 0
+        for entry in components.get("structure", []):
+            stem = os.path.join(target, "structure", entry["file"])
+            bars = {key: np.load(f"{stem}.{key}.npy", mmap_mode="r") for key in ("time", "ohlc")}
+            with open(f"{stem}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            count += structure_index.restore_structure(entry["symbol"], entry["timeframe"], bars, meta)
+        restored["structure"] = count
+
+        if "correlation" in components:
+            arrays = {key: np.load(os.path.join(target, f"correlation.{key}.npy"), mmap_mode="r")
+                      for key in ("ring", "sum", "cross", "last_close")}
+            restored["correlation"] = int(correlation.restore_tracker(arrays, components["correlation"]))
+
+        news = _news()
+        if news is not None and "news" in components:
+            restored["news"] = news.restore_cache(components["news"])
+    except (OSError, ValueError, KeyError) as e:
+        log(f"⚠️ Warm-start snapshot incomplete, the rest starts cold: {e}")
+
+    log(f"🔥 Warm start from {manifest['generation']} "
+        f"({time.time() - manifest['created_at']:.0f}s old) in {(time.perf_counter() - started) * 1000:.0f} ms: {restored}")
+    return restored
+
+
+# --- Bot integration ---
+def _save_periodically(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            save()
+        except Exception as e:
+            log(f"⚠️ Warm-start snapshot failed: {e}")
+
+
+def resume(account_info):
+    """
+    Restore the snapshot for this account once per process and start the
+    periodic saver. No-op unless WARM_START_ENABLED. A different account
+    resuming in the same process turns snapshots off (see the module docstring).
+    """
+    global _identity, _shared, _saver
+    if not WARM_START_ENABLED or account_info is None:
+        return None
+    identity = identity_of(account_info)
+    with _save_lock:
+        if _identity is not None:
+            if identity != _identity and not _shared:
+                _shared = True
+                log(f"🧊 Warm-start snapshots off: accounts {_identity['login']} and {identity['login']} "
+                    f"share this process's caches")
+            return None
+        _identity = identity
+    restored = restore(identity)
+    _saver = threading.Thread(target=_save_periodically, args=(WARM_START_SAVE_SECONDS,),
+                              name="warm-start-saver", daemon=True)
+    _saver.start()
+    return restored
+
+
+def save_on_shutdown():
+    """Final snapshot on a clean stop (no-op unless resume() ran)."""
+    if not WARM_START_ENABLED or _identity is None or _shared:
+        return None
+    try:
+        return save()
+    except Exception as e:
+        log(f"⚠️ Warm-start snapshot failed: {e}")
+        return None